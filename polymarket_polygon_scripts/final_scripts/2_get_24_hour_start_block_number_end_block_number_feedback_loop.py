@@ -1,8 +1,12 @@
-import requests
 import json
-import time
 import datetime
 import sys
+from rpc_client import get_client
+from block_cache import BlockTimestampCache
+from block_range import save_block_range
+from block_search import AVG_BLOCK_TIME, BlockNotFound, BlockResolver
+from block_index import AnchorIndex
+from event_registry import get_registry
 
 # CLI argument
 # if len(sys.argv) != 2:
@@ -30,183 +34,47 @@ except ValueError:
     print("Invalid date format. Use DD-MM-YYYY (e.g. 01-03-2025)")
     sys.exit(1)
 
-# Calculating the target block according to the input
-#    Current date referring to the last stamped block
-current_date = datetime.datetime.fromtimestamp(current_polygon_block_unix, tz=datetime.timezone.utc)
-days_difference = (current_date - target_date).days
-lower_bound_start = current_polygon_block_number - 81143 * days_difference
-
 # Calculating the 24 hour end unix timestamp
 target_end_24hr_date_unix = target_unix + 86400  # 86400 seconds in 24 hours
 
 # Our Polymarket Polygon RPC endpoint connection data
 RPC_URL = "https://polygon-rpc.com"
 CONTRACT_ADDRESS = "0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E"
-FILL_ORDER_TOPIC = "0xc4109843e91b0e58c301f796291ac4de7cbcf77d8dff9ab6466e420e4a8cb28c"
-
-# get the target block timestamps 
-def get_block_timestamps(block_number):
-    block_payload = {
-        "jsonrpc": "2.0",
-        "method": "eth_getBlockByNumber",
-        "params": [hex(block_number)],
-        "id": 1
-    }
-
-    try:
-        time.sleep(0.2)
-        response = requests.post(RPC_URL, json=block_payload)
-        result = response.json().get("result")
-        if result is None:
-            print(f"Block number {block_number} not found.")
-            return 0
-        return int(result["timestamp"], 16)
-    except Exception as e:
-        print(f"Error fetching block {block_number} timestamp: {e}")
-        return 0
-
-# Binary search to find the target block number by timestamp
-def find_block_before_timestamp(target_ts, low_block, high_block):
-    while low_block <= high_block:
-        mid = (low_block + high_block) // 2
-        ts = get_block_timestamps(mid)
-
-        if ts == 0:
-            break  # skip if block fetch failed
-
-        if ts < target_ts:
-            low_block = mid + 1
-        elif ts > target_ts:
-            high_block = mid - 1
-        else:
-            return mid  # exact match
-
-    return high_block  # closest block before target
-
-
-# Estimate lower bound and validate
-estimated_start = current_polygon_block_number - int(43000 * days_difference)
-search_low = max(0, estimated_start - 1000)
-
-guessed_block = find_block_before_timestamp(target_unix, search_low, current_polygon_block_number)
-
-
-# Initial guess
-guessed_block = find_block_before_timestamp(target_unix, search_low, current_polygon_block_number)
-seconds_off = guessed_ts - target_unix
-blocks_off = max(1, abs(seconds_off // avg_block_time))  # Always move at least 1
-
-# Inputs
-guess_block = guessed_block  # use output of binary search
-avg_block_time = 2  # or calculate dynamically
-guess_seconds = get_block_timestamps(guess_block)
-
-# Loop until you find a block whose timestamp crosses target
-found = False
-max_attempts = 50  # prevent infinite loops
-attempts = 0
-
-while not found and attempts < max_attempts:
-    seconds_diff = target_unix - guess_seconds
-    estimated_blocks_to_move = seconds_diff // avg_block_time
-
-    if estimated_blocks_to_move == 0:
-        estimated_blocks_to_move = 1 if seconds_diff > 0 else -1
-
-    next_block = guess_block + estimated_blocks_to_move
-    next_seconds = get_block_timestamps(next_block)
-
-    print(f"🔍 Guess block {guess_block} → {guess_seconds} | Next block {next_block} → {next_seconds}")
-
-    if (guess_seconds < target_unix < next_seconds) or (guess_seconds > target_unix > next_seconds):
-        # We've crossed the target
-        guess_block = next_block
-        guess_seconds = next_seconds
-        found = True
-    elif guess_seconds == target_unix:
-        found = True
-    else:
-        # Update guess and continue
-        guess_block = next_block
-        guess_seconds = next_seconds
-
-    attempts += 1
-
-print(f"✅ Final aligned block: {guess_block} → Timestamp: {guess_seconds}")
-
-# Final result
-start_block = guessed_block
-print(f"✅ Found aligned start block: {start_block} @ {guessed_ts}")
-
-
-# Binary search to find the target block number by timestamp
-def get_block_timestamp(block_number):
-    # Replace this with actual timestamp fetching logic
-    return dummy_blockchain[block_number]  # placeholder
-
-# Inputs
-guess_block = 15
-target_seconds = int(input("Enter target_seconds: "))
-avg_block_time = 2  # average seconds per block
-
-# Initial timestamp
-guess_seconds = get_block_timestamp(guess_block)
-
-# Start loop
-while True:
-    print(f"🔍 Guess block {guess_block} → Timestamp {guess_seconds}")
-
-    seconds_diff = target_seconds - guess_seconds
-    estimated_blocks_to_move = round(seconds_diff / avg_block_time)
-
-    # Ensure at least one block movement
-    if estimated_blocks_to_move == 0:
-        estimated_blocks_to_move = 1 if seconds_diff > 0 else -1
-
-    # Move to new block
-    next_block = guess_block + estimated_blocks_to_move
-    next_seconds = get_block_timestamp(next_block)
-
-    # Check for convergence condition: target_seconds is between current and next
-    if (guess_seconds < target_seconds < next_seconds) or \
-       (guess_seconds > target_seconds > next_seconds):
-        # We've passed over the target; next_block is the first one over target
-        guess_block = next_block
-        guess_seconds = next_seconds
-        break_condition_met = True
-    elif guess_seconds == target_seconds:
-        break_condition_met = True
-    else:
-        # Not yet there, keep going
-        guess_block = next_block
-        guess_seconds = next_seconds
-        break_condition_met = False
-
-    # Stop only when we've converged
-    if break_condition_met:
-        print(f"✅ Final block: {guess_block} → Timestamp: {guess_seconds}")
-        # loop ends naturally here
-        break
-
-start_block = find_block_before_timestamp(target_unix, lower_bound_start, current_polygon_block_number)
-end_block = find_block_after_timestamp(target_end_24hr_date_unix, start_block, current_polygon_block_number)
-
-start_ts = get_block_timestamps(start_block)
-end_ts = get_block_timestamps(end_block)
-
-# Continue safely
-end_block = find_block_after_timestamp(target_unix + 86400, start_block, current_polygon_block_number)
+FILL_ORDER_TOPIC = get_registry().topic("OrderFilled")
+
+client = get_client(RPC_URL)
+# Persistent block -> timestamp cache, only misses cost a header fetch
+timestamp_cache = BlockTimestampCache(client=client)
+timestamp_cache.set_head(current_polygon_block_number)
+
+# Anchor every 1000 blocks between (a generous estimate of) the target and the saved head
+#    Only anchors missing from earlier runs are fetched; lookups are a local bisect
+anchor_index = AnchorIndex(cache=timestamp_cache)
+estimated_start = current_polygon_block_number - int((current_polygon_block_unix - target_unix) / AVG_BLOCK_TIME * 1.25)
+anchor_index.extend(estimated_start, current_polygon_block_number)
+print(f"Anchor index: {len(anchor_index)} anchors ({anchor_index.fetched} fetched this run)")
+
+# Interpolation search from the anchor bracket (block_search.py) instead of binary search with
+#    hardcoded blocks/day; converges on the exact first block at or after each timestamp
+resolver = BlockResolver(timestamp_cache, head=(current_polygon_block_number, current_polygon_block_unix),
+                         index=anchor_index)
+
+try:
+    block_range = resolver.window(target_unix, target_end_24hr_date_unix)
+except BlockNotFound as e:
+    print(f"❌ Could not resolve the 24 hour window: {e}")
+    sys.exit(1)
 
+start_block = block_range.start_block
+end_block = block_range.end_block
+print(f"✅ Found aligned start block: {start_block} @ {block_range.start_timestamp}")
+print(f"✅ Found aligned end block: {end_block} @ {block_range.end_timestamp}")
 
 print("Start block:", start_block)
 print("End block:", end_block)
+print(f"Header fetches: {resolver.probes} in {resolver.round_trips} round trips")
+print("RPC rate:", client.limiter.report())
+print("Block timestamp cache:", timestamp_cache.report())
 
-# Save all block numbers in the 24-hour range to a JSON file
-block_numbers = list(range(start_block, end_block + 1))
-
-with open("block_numbers_target_range_24_hr_value_target.json", "w") as f:
-    json.dump({
-        "start_block": start_block,
-        "end_block": end_block,
-        "block_numbers": block_numbers
-    }, f, indent=2)
+# Save the 24-hour range descriptor (start/end blocks + timestamps, not every block number)
+save_block_range(block_range)
@@ -43,9 +43,8 @@ def throttled_post(payload):
 # === Load block range ===
 open("block_numbers_target_range_24_hr_value_target.json", "r") as f:
     data = json.load(f)
-    block_numbers = data["block_numbers"]
-    start_block = block_numbers[0]
-    end_block = block_numbers[-1]
+    start_block = data["start_block"]
+    end_block = data["end_block"]
 print(f"📦 Block range loaded: {start_block} → {end_block}")
 
 # === Query Fill Orders ===
@@ -1,25 +1,28 @@
-import requests
 import json
-import time
-from web3 import Web3
 from datetime import datetime
-from web3.middleware import geth_poa_middleware
-from eth_utils import keccak
-from eth_abi.abi import decode
+from fill_decoder import decode_fills
+from fill_store import AddressTable, FillStore, InternTable
+from fill_writer import NdjsonWriter
+from market_breakdown import TOP_N, MarketBreakdown, save_breakdown
+from rpc_client import get_client
+from log_store import LogStore
+from event_router import FEE_CHARGED, ORDER_CANCELLED, ORDER_FILLED, ORDERS_MATCHED, REGISTRY, TOKEN_REGISTERED, EventRouter, fetch_events
+from fill_summary import FillSummary, save_summary
+from block_range import load_block_range
+from block_cache import CONFIRMATIONS, BlockTimestampCache
 
 # ✅ Load ABI
 with open("contractABI.json") as f:
     abi = json.load(f)
 print(f"✅ Loaded ABI with {len(abi)} entries.")
 
-contract_address = "0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E"
-web3 = Web3(Web3.HTTPProvider("https://polygon-rpc.com"))
-contract = web3.eth.contract(address=contract_address, abi=abi)
+# Event ABI straight from the file: no web3 import, Web3 instance or contract object needed
+#    (importing web3 costs more than a small window's whole run). topic0s come from the
+#    event registry, which caches them per ABI content hash (event_registry.py)
+print(next(entry for entry in abi if entry.get("type") == "event" and entry.get("name") == "OrderFilled"))
 
-print(contract.events.OrderFilled().abi)
-
-event_signature = "OrderFilled(bytes32,address,address,uint256,uint256,uint256,uint256,uint256)"
-event_hash = keccak(text=event_signature).hex()
+event_signature = REGISTRY.get(ORDER_FILLED).signature
+event_hash = ORDER_FILLED
 print("🔑 Keccak for 'OrderFilled':", (event_hash))
 
 # just liked it looked clean
@@ -31,152 +34,120 @@ API_KEY = "PCKRG6E9ACP1U1D6DHWYUX8C27V3HU5B79"
 CHAIN_ID = "137"
 ETHERSCAN_URL = "https://api.etherscan.io/api"
 POLYGON_RPC = "https://polygon-rpc.com"
-FILL_ORDER_TOPIC = "0xd0a08e8c493f9c94f29311604c9de1b4e8c8d4c06bd0c789af57f2d65bfec0f6"
+FILL_ORDER_TOPIC = ORDER_FILLED
 CONTRACT_ADDRESS = "0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E"
 
-# ✅ Web3 init
-w3 = Web3(Web3.HTTPProvider(POLYGON_RPC))
-w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-
 print("🚀 Starting 24 hr trade volume insight script...")
 
 # === INPUT ===
 polygon_contract_address = input("Input contract address (default: 0x4bFb...): ") or CONTRACT_ADDRESS
 fill_order_topic = input("Input FILL_ORDER_TOPIC (default: 0xd0a0...): ") or FILL_ORDER_TOPIC
 
-# === RPC throttling ===
-def throttled_post(payload):
-    time.sleep(0.4)
-    return requests.post(POLYGON_RPC, json=payload)
+# === RPC client ===
+#    Shared keep-alive client, paced by the endpoint's adaptive token bucket (rate_limiter.py)
+client = get_client(POLYGON_RPC)
 
 try:
     # === Load block range ===
-    with open("block_numbers_target_range_24_hr_value_target.json", "r") as f:
-        data = json.load(f)
-        block_numbers = data["block_numbers"]
-        start_block = block_numbers[0]
-        end_block = block_numbers[-1]
+    block_range = load_block_range()
+    start_block = block_range.start_block
+    end_block = block_range.end_block
     print(f"📦 Block range loaded: {start_block} → {end_block}")
 
     # === Timestamps ===
-    start_ts = w3.eth.get_block(start_block)["timestamp"]
-    end_ts = w3.eth.get_block(end_block)["timestamp"]
+    #    Taken from the range descriptor when the block search already resolved them
+    start_ts = block_range.start_timestamp
+    end_ts = block_range.end_timestamp
+    if start_ts is None or end_ts is None:
+        boundary_ts = BlockTimestampCache(client=client).block_timestamps([start_block, end_block])
+        start_ts = boundary_ts[start_block]
+        end_ts = boundary_ts[end_block]
     print(f"🕒 Start block timestamp: {start_ts} ({datetime.utcfromtimestamp(start_ts)})")
     print(f"🕒 End block timestamp:   {end_ts} ({datetime.utcfromtimestamp(end_ts)})")
 
     # ✅ Use this for file naming
     DATE = start_ts
+    FILE_PREFIX = f"polymarket_24h_{datetime.utcfromtimestamp(DATE).strftime('%Y-%m-%d')}"
 
     # === Log query loop ===
+    #    WORKERS chunk requests in flight, chunks come back in block order (log_fetcher.py)
+    #    Ranges fetched by earlier runs are served from the local log store (log_store.py)
+    #    Decoded fills are streamed to NDJSON as chunks complete (fill_writer.py), nothing is kept in memory
+    #    All exchange events come back in the same eth_getLogs calls (one OR-list topic0 filter, event_router.py):
+    #    OrderFilled is handled below, FeeCharged amounts are summed, the rest are counted
     BLOCK_STEP = 2000
-    all_logs = []
-    decoded_fills = []  # ✅ Initialize decoded fills list
-    total_fill = 0
-
-    for from_block in range(start_block, end_block + 1, BLOCK_STEP):
-        to_block = min(from_block + BLOCK_STEP - 1, end_block)
-        print(f"🔄 Querying block range: {from_block} → {to_block}")
-
-        response = throttled_post({
-            "jsonrpc": "2.0",
-            "method": "eth_getLogs",
-            "params": [{
-                "fromBlock": hex(from_block),
-                "toBlock": hex(to_block),
-                "address": polygon_contract_address,
-                "topics": [FILL_ORDER_TOPIC]
-            }],
-            "id": 1
-        })
-        try: 
-            result = response.json()
-
-        except Exception as e:
-            print("❌ Failed to parse JSON response:")
-            print(response.text)
-            print(f"Reason: {e}")
-            continue  
-
-        if "result" in result:
-            logs = result["result"]
-            all_logs.extend(logs)
-            #print("🔍 First raw log entry:")
-            #print(json.dumps(all_logs[0], indent=2))
-
-            with open(f"polymarket_24h_{datetime.utcfromtimestamp(DATE).strftime('%Y-%m-%d')}_tradefills_log.json", "w") as f:
-                json.dump(all_logs[0], f, indent=2)
-            print("✅ Saved logs to file at first log success.")
-                
-            for log in logs: 
-                if log["data"] == "0x9":
-                    print("MMMAlformed log ")
-                    print(json.dumps(log, indent=2))
-                    continue
-                
-                if not log.get("data", "").startswith("0x") or len(log["data"]) < 10:
-                    print("MALLLformed log (data too short or mising):")
-                    print(json.dumps(log, indent=2))
-                    continue
-
-                try:
-                    data_hex = log['data'][2:] #striping the hash down
-                    data_bytes = bytes.fromhex(data_hex)
-
-                    # Decode  the unindexed fields (otherwise known as data), must match the order of the emitted paramaters/args as within the ABI
-                    # (bytes32,address,address,uint256,uint256,uint256,uint256,uint256)
-                    # bytes32 = not data field, it is a topics field, because it is indexed. 
-                    # We are only decoding the values that are not in topics. They are data fields i.e log['data']
-                    decoded = decode(
-                        ['uint256', 'uint256', 'uint256', 'uint256', 'uint256'],
-                        data_bytes
-                    )
-
-                except Exception as e:
-                    print("Failed to decode log ['data], skipping.")
-                    print(f"Reason: {e}")
-                    print(json.dumps(log, indent=2))
-                    continue
-                
-                makerAssetId, takerAssetId, makerAmountFilled, takerAmountFilled, fee = decoded
-                
-                total_fill += takerAmountFilled
-
-                decoded_fills.append({
-                    "orderhash": log['topics'][1],
-                    "maker": Web3.to_checksum_address("0x" + log['topics'][2][-40]),
-                    "taker": Web3.to_checksum_address("0x" + log['topics'][3][-40]),
-                    "makerAssetId": makerAssetId,
-                    "takerAssetId": takerAssetId,
-                    "makerAmountFilled": makerAmountFilled, 
-                    "takerAmountFilled": takerAmountFilled, 
-                    "fee": fee, 
-                    "txHash": log['transactionHash'],
-                    "blockNumber": int(log['blockNumber'], 16)
-                })
-
-        else:
-            print(f"⚠️ RPC error in block range {from_block}–{to_block}: {result.get('error', {}).get('message')}")
+    WORKERS = 4
+    total_logs = 0
+    first_log = None
+    breakdown = MarketBreakdown()  # per-token / per-side totals, filled in the same pass
+    store = LogStore()
+    store_stats = {}
+
+    # Same summary file and schema as backfill.py / pipeline.py (fill_summary.py)
+    summary = FillSummary(start_block, end_block, topics=[fill_order_topic, FEE_CHARGED])
+
+    # Interned addresses (checksum computed once per address) and token ids, shared by every chunk
+    addresses = AddressTable()
+    tokens = InternTable()
+
+    router = EventRouter({FEE_CHARGED: summary.add_fee_charged, ORDERS_MATCHED: None, ORDER_CANCELLED: None,
+                          TOKEN_REGISTERED: None})
+    router.register(fill_order_topic)
+    final_block = client.block_number() - CONFIRMATIONS  # newer blocks may still reorg, don't store them
+
+    with NdjsonWriter(f"{FILE_PREFIX}_tradefills_log.ndjson") as fills_out:
+        for chunk, routed in fetch_events(router, polygon_contract_address, start_block, end_block, client=client,
+                                          store=store, final_block=final_block, block_step=BLOCK_STEP,
+                                          workers=WORKERS, stats=store_stats):
+            from_block, to_block = chunk.from_block, chunk.to_block
+            print(f"🔄 Queried block range: {from_block} → {to_block}")
+
+            logs = routed.get(fill_order_topic.lower(), [])
+            total_logs += len(logs)
+
+            if first_log is None and logs:
+                first_log = logs[0]
+                with open(f"{FILE_PREFIX}_tradefills_log.json", "w") as f:
+                    json.dump(first_log, f, indent=2)
+                print("✅ Saved first raw log to file.")
+
+            # Decode the whole chunk at once (fill_decoder.py): the unindexed fields (otherwise known as data)
+            # (bytes32,address,address,uint256,uint256,uint256,uint256,uint256)
+            # bytes32/address = not data fields, they are topics fields, because they are indexed.
+            # We are only decoding the 5 uint256 values that are not in topics, i.e log['data']
+            batch = decode_fills(logs)
+
+            for log in batch.malformed:
+                print("MALLLformed log (data too short or mising):")
+                print(json.dumps(log, indent=2))
+
+            summary.add_fills(batch)
+            breakdown.add_batch(batch)
+
+            # Compact columns for the chunk (fill_store.py), written out as NDJSON records
+            fills = FillStore(addresses, tokens)
+            fills.add_batch(batch)
+            fills_out.write_many(fills.rows())
 
     # === Save files ===
-    #print(f"💾 Saving {len(decoded_fills)} decoded fills to JSON file...")
-    #with open(f"polymarket_24h_{datetime.utcfromtimestamp(DATE).strftime('%Y-%m-%d')}_tradefills_log.json", "w") as f:
-    #    json.dump(all_logs, f, indent=2)
-
+    print(f"💾 Saved {fills_out.count} decoded fills to {fills_out.path} ({len(addresses)} distinct traders, "
+          f"{len(tokens)} asset ids)")
 
-    with open(f"polymarket_24h_{datetime.utcfromtimestamp(DATE).strftime('%Y-%m-%d')}_summary_tradefills_log.json", "w") as f:
-        json.dump({
-            "start_block": start_block,
-            "end_block": end_block,
-            "total_fill": total_fill
-        }, f, indent=2)
+    for topic0, count in router.counts.items():
+        summary.count(topic0, count)
+    save_summary(summary, f"{FILE_PREFIX}_summary_tradefills_log.json")
 
+    save_breakdown(breakdown, f"{FILE_PREFIX}_markets_tradefills_log.json")
+    print(f"📊 Per-market breakdown: {len(breakdown.markets)} markets, top {min(len(breakdown.markets), TOP_N)} saved")
 
     # === Decode and summarize ===
-    print(f"✅ Retrieved total logs: {len(all_logs)}")
+    print(f"✅ Retrieved total logs: {total_logs}")
+    print(f"📨 Events by type: {router.report()}")
+    print(f"🗄️ Blocks served from log store: {store_stats['stored_blocks']}, fetched over RPC: {store_stats['fetched_blocks']}")
 
-    if all_logs:
+    if first_log is not None:
         print("🔍 First raw log entry:")
-        print(json.dumps(all_logs[0], indent=2))
+        print(json.dumps(first_log, indent=2))
         
     else:
         print("⚠️ No logs found.")
@@ -184,4 +155,5 @@ try:
 except Exception as e:
     print(f"❌ Error querying logs: {e}")
 
+print(f"⏱️ RPC rate: {client.limiter.report()}")
 print("✅ Script completed successfully!")
@@ -1,8 +1,9 @@
 import requests
-import json
-import time
 import datetime
 import sys
+from block_cache import get_cache
+from block_search import BlockNotFound, BlockResolver
+from block_range import BlockRange, save_block_range
 
 print("🚀 Starting block search script...")
 
@@ -48,20 +49,9 @@ def find_blocks():
     
     def get_block_timestamp(block_number):
         """Get the actual timestamp of a block"""
-        # Use RPC call instead
-        rpc_payload = {
-            "jsonrpc": "2.0",
-            "method": "eth_getBlockByNumber",
-            "params": [hex(block_number), False],
-            "id": 1
-        }
-        
+        # Use RPC call instead, through the persistent block timestamp cache
         try:
-            response = requests.post("https://polygon-rpc.com", json=rpc_payload, timeout=10)
-            result = response.json().get("result")
-            if result and result.get("timestamp"):
-                return int(result["timestamp"], 16)
-            return None
+            return get_cache().block_timestamp(block_number)
         except Exception as e:
             print(f"❌ Error getting block {block_number} timestamp: {e}")
             return None
@@ -113,41 +103,50 @@ def find_blocks():
                     if end_ts > target_end_24hr_date_unix:
                         print(f"⚠️ Warning: End block is after target end date!")
                 
-                return start_block, end_block
+                return start_block, end_block, start_ts, end_ts
             else:
                 print(f"❌ End block API call failed: {data.get('message', 'Unknown error')}")
         else:
             print(f"❌ Start block API call failed: {data.get('message', 'Unknown error')}")
         
-        return None, None
+        return None, None, None, None
         
     except Exception as e:
         print(f"❌ Error with Etherscan API: {e}")
-        return None, None
+        return None, None, None, None
+
+# Known head before any block is looked up, so blocks near it are served but not persisted
+head = get_cache().client.head()
+get_cache().set_head(head[0])
 
 # Find the blocks
 print("\n🔍 Finding blocks using Etherscan API...")
-start_block, end_block = find_blocks()
+start_block, end_block, start_ts, end_ts = find_blocks()
 
 if start_block is None or end_block is None:
-    print("❌ Could not find valid blocks")
-    sys.exit(1)
+    # No API key / Etherscan down: resolve both boundaries over plain RPC instead
+    print("🔍 Falling back to RPC interpolation search...")
+    try:
+        resolver = BlockResolver(get_cache(), head=head)
+        window = resolver.window(target_unix, target_end_24hr_date_unix)
+        start_block, end_block = window.start_block, window.end_block
+        start_ts, end_ts = window.start_timestamp, window.end_timestamp
+        print(f"✅ Found blocks with {resolver.probes} header fetches in {resolver.round_trips} round trips")
+    except BlockNotFound as e:
+        print(f"❌ Could not find valid blocks: {e}")
+        sys.exit(1)
 
 print("\n📊 Final Results:")
 print("Start block:", start_block)
 print("End block:", end_block)
 print(f"Total blocks in range: {end_block - start_block + 1}")
+print(f"Block timestamp cache: {get_cache().report()}")
 
-# Save all block numbers in the 24-hour range to a JSON file
-block_numbers = list(range(start_block, end_block + 1))
+# Save the 24-hour range descriptor (start/end blocks + timestamps, not every block number)
+block_range = BlockRange(start_block, end_block, start_ts, end_ts, chain_id=int(chainid))
 
-print(f"💾 Saving {len(block_numbers)} block numbers to JSON file...")
-with open("block_numbers_target_range_24_hr_value_target.json", "w") as f:
-    json.dump({
-        "start_block": start_block,
-        "end_block": end_block,
-        "block_numbers": block_numbers
-    }, f, indent=2)
+print(f"💾 Saving block range descriptor for {len(block_range)} blocks to JSON file...")
+save_block_range(block_range)
 
 print("✅ Script completed successfully!")
 
@@ -1,26 +1,25 @@
-import json
-import requests 
-import sys
-import time
+from rpc_client import get_client
+from block_range import load_block_range
+from event_registry import get_registry
 
 print("🚀 Starting 24 hr trade volume insight script...")
 
 # Load block range from existing file
-with open("block_numbers_target_range_24_hr_value_target.json", "r") as f:
-    data = json.load(f)
-    block_numbers = data["block_numbers"]
-    start_block = block_numbers[0]
-    end_block = block_numbers[-1]
+block_range = load_block_range()
+start_block = block_range.start_block
+end_block = block_range.end_block
 
 print(f"📦 Block range loaded: {start_block} → {end_block}")
 
 # User input for contract and topic
 polygon_contract_address = input("Input contract address (default: 0x4bFb...): ") or "0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E"
-fill_order_topic = input("Input FILL_ORDER_TOPIC (default: 0xc410...): ") or "0xd0a08e8c493f9c94f29311604c9de1b4e8c8d4c06bd0c789af57f2d65bfec0f6"
+fill_order_topic = input("Input FILL_ORDER_TOPIC (default: 0xd0a0...): ") or get_registry().topic("OrderFilled")
+
+client = get_client()
 
 def throttled_post(payload):
-    time.sleep(0.4)
-    return requests.post("https://polygon-rpc.com", json=payload)
+    # Paced by the endpoint's adaptive token bucket instead of a fixed sleep
+    return client.batch_raw([(payload["method"], payload["params"])])[0]
 
 print("🔍 Querying logs from Polygon RPC...")
 
@@ -37,7 +36,7 @@ try:
         "id": 1
     })
 
-    logs = response.json().get("result", [])
+    logs = response.get("result", [])
     print(f"✅ Retrieved {len(logs)} FillOrder logs")
 
     for log in logs:
@@ -46,6 +45,7 @@ try:
 
     print("\n📊 Summary:")
     print(f"Total FillOrder logs in 24h block range: {len(logs)}")
+    print(f"⏱️ RPC rate: {client.limiter.report()}")
     print("✅ Script completed successfully!")
 
 except Exception as e:
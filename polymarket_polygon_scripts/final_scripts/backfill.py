@@ -0,0 +1,160 @@
+import argparse
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+
+from block_cache import CONFIRMATIONS, BlockTimestampCache
+from block_index import AnchorIndex
+from block_range import BlockRange
+from block_search import BlockNotFound, BlockResolver
+from event_router import FEE_CHARGED, ORDER_FILLED, EventRouter, fetch_events
+from fill_decoder import decode_fills
+from fill_summary import FillSummary, save_summary
+from log_fetcher import BLOCK_STEP, WORKERS
+from log_store import LogStore
+from rpc_client import POLYGON_RPC, get_client
+
+# Multi-day backfill: per-day OrderFilled volume summaries for a whole date range in one run.
+#    Day N's end block is day N+1's start block - 1, so D days only need D+1 boundary blocks, and
+#    those are resolved together (BlockResolver.first_blocks_at_or_after: every search's probes
+#    share one batched POST per round). The union block range is then fetched once with the
+#    concurrent, store-backed fetcher, and each chunk's fills are split across days by block
+#    number while they stream past. OrderFilled and FeeCharged come back in the same eth_getLogs
+#    calls (event_router.py). Writes the same per-day summary file as 2_get_24_hr_ctf-open_trades.py
+#    (fill_summary.py). pipeline.py runs its windows through the same resolve and backfill code.
+#    Usage: python3 backfill.py 2025-07-01 2025-07-31
+
+CONTRACT_ADDRESS = "0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E"
+FILL_ORDER_TOPIC = ORDER_FILLED
+TOPICS = (ORDER_FILLED, FEE_CHARGED)
+
+
+def day_starts(first_date, last_date):
+    """UTC midnights from first_date through the day after last_date (D+1 timestamps)"""
+    day = datetime.strptime(first_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    end = datetime.strptime(last_date, "%Y-%m-%d").replace(tzinfo=timezone.utc) + timedelta(days=1)
+    starts = []
+    while day <= end:
+        starts.append(int(day.timestamp()))
+        day += timedelta(days=1)
+    return starts
+
+
+def resolve_boundaries(resolver, timestamps):
+    """{timestamp: first block at or after it}, all searches sharing batched POSTs
+
+    If any timestamp can't be resolved (after the head), falls back to one search per timestamp
+    so only that one is missing from the result.
+    """
+    try:
+        return resolver.first_blocks_at_or_after(timestamps)
+    except BlockNotFound:
+        blocks = {}
+        for target_ts in sorted(set(timestamps)):
+            try:
+                blocks[target_ts] = resolver.first_block_at_or_after(target_ts)
+            except BlockNotFound as e:
+                print(f"⚠️ {e}", file=sys.stderr)
+        return blocks
+
+
+def resolve_days(resolver, first_date, last_date):
+    """One BlockRange per day, from D+1 shared boundaries resolved in one pass"""
+    timestamps = day_starts(first_date, last_date)
+    blocks = resolver.first_blocks_at_or_after(timestamps)
+    boundaries = [blocks[ts] for ts in timestamps]
+    return [
+        BlockRange(boundaries[i], boundaries[i + 1] - 1, timestamps[i], timestamps[i + 1])
+        for i in range(len(timestamps) - 1)
+    ]
+
+
+def day_slices(log_blocks, days, day_start_blocks):
+    """(day index, start, stop) for every day with logs in a block-ordered list of log blocks"""
+    if not log_blocks:
+        return []
+    first_day = max(0, bisect_right(day_start_blocks, log_blocks[0]) - 1)
+    last_day = bisect_right(day_start_blocks, log_blocks[-1]) - 1
+    slices = []
+    for i in range(first_day, last_day + 1):
+        start = bisect_left(log_blocks, days[i].start_block)
+        stop = bisect_right(log_blocks, days[i].end_block)
+        if stop > start:
+            slices.append((i, start, stop))
+    return slices
+
+
+def backfill(days, address=CONTRACT_ADDRESS, topics=TOPICS, client=None, store=None, final_block=None,
+             block_step=BLOCK_STEP, workers=WORKERS, stats=None, on_fills=None):
+    """Fetch the union of the days' block ranges once; returns one FillSummary per day
+
+    `days` are BlockRanges in block order that don't overlap. `on_fills(i, batch, start, stop)`,
+    if given, is called with day i's rows [start, stop) of every decoded OrderFilled batch.
+    """
+    client = client or get_client()
+    store = store or LogStore()
+    topics = [t.lower() for t in topics]
+    summaries = [FillSummary(day.start_block, day.end_block, topics) for day in days]
+    day_start_blocks = [day.start_block for day in days]
+    if final_block is None:
+        final_block = client.block_number() - CONFIRMATIONS
+    router = EventRouter({topic: None for topic in topics})
+
+    for chunk, routed in fetch_events(router, address, days[0].start_block, days[-1].end_block, client=client,
+                                      store=store, final_block=final_block, block_step=block_step,
+                                      workers=workers, stats=stats):
+        # Logs are in block order, so each day's logs of an event are one contiguous slice
+        for topic0, logs in routed.items():
+            if topic0 == ORDER_FILLED:
+                batch = decode_fills(logs)
+                logs = batch.logs
+            log_blocks = [int(log["blockNumber"], 16) for log in logs]
+            for i, start, stop in day_slices(log_blocks, days, day_start_blocks):
+                summaries[i].count(topic0, stop - start)
+                if topic0 == ORDER_FILLED:
+                    summaries[i].add_fills(batch, start, stop)
+                    if on_fills is not None:
+                        on_fills(i, batch, start, stop)
+                elif topic0 == FEE_CHARGED:
+                    summaries[i].add_fee_charged(logs[start:stop])
+    return summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-day OrderFilled volume and fees for a date range")
+    parser.add_argument("first_date", help="YYYY-MM-DD (UTC)")
+    parser.add_argument("last_date", help="YYYY-MM-DD (UTC), inclusive")
+    parser.add_argument("--rpc", default=POLYGON_RPC)
+    parser.add_argument("--address", default=CONTRACT_ADDRESS)
+    parser.add_argument("--topic", action="append", default=None,
+                        help="topic0 to collect (repeatable); default OrderFilled and FeeCharged")
+    args = parser.parse_args()
+
+    client = get_client(args.rpc)
+    cache = BlockTimestampCache(client=client)
+    # Known head before anything is resolved, so blocks near it are served but not persisted
+    head = client.head()
+    cache.set_head(head[0])
+    # Anchors from (an estimate of) the first day's start up to the confirmed head
+    index = AnchorIndex(cache=cache)
+    index.extend_back_to(day_starts(args.first_date, args.first_date)[0], head)
+    resolver = BlockResolver(cache, head=head, index=index)
+
+    print(f"🚀 Backfilling {args.first_date} → {args.last_date}...")
+    days = resolve_days(resolver, args.first_date, args.last_date)
+    print(f"📦 {len(days)} days, blocks {days[0].start_block} → {days[-1].end_block} "
+          f"({resolver.probes} header fetches in {resolver.round_trips} round trips, "
+          f"{index.fetched} anchors fetched)")
+
+    stats = {}
+    summaries = backfill(days, args.address, args.topic or TOPICS, client=client, stats=stats)
+
+    for day, summary in zip(days, summaries):
+        date = datetime.fromtimestamp(day.start_timestamp, timezone.utc).strftime("%Y-%m-%d")
+        save_summary(summary, f"polymarket_24h_{date}_summary_tradefills_log.json")
+        print(f"📊 {date}: {summary.fills} fills, total_fill {summary.total_fill}, "
+              f"fees charged {summary.total_fee_charged}")
+
+    print(f"🗄️ Blocks served from log store: {stats['stored_blocks']}, fetched over RPC: {stats['fetched_blocks']}")
+    print(f"⏱️ RPC rate: {client.limiter.report()}")
+    print(f"💾 {cache.report()}")
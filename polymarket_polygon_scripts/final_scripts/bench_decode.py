@@ -0,0 +1,135 @@
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from fill_decoder import FILL_FIELDS, decode_fills
+from log_buffer import LogPage
+
+# Benchmark: per-log eth_abi decode (what 2_get_24_hr_ctf-open_trades.py used to do) against
+# the batch decoder in fill_decoder.py, on synthetic logs cloned from the saved sample fill.
+#    A second table compares per-log hex slicing (data[2:], bytes.fromhex, raw[a:b] and
+#    topics[i][-40:] for maker/taker as ints) with the LogPage buffer (log_buffer.py): one unhexlify per
+#    page and memoryview slices, reporting throughput and tracemalloc allocations per 100k logs,
+#    once for the whole decode and once for just unhexlifying the page (the part LogPage changes).
+#    Usage: python3 bench_decode.py [number_of_logs]
+
+N_LOGS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+SAMPLE_LOG_FILE = "polymarket_24h_2025-07-15_tradefills_log.json"
+
+
+def make_logs(n):
+    with open(SAMPLE_LOG_FILE, "r") as f:
+        sample = json.load(f)
+    rng = random.Random(7)
+    logs = []
+    for i in range(n):
+        words = [
+            0 if i % 2 else rng.getrandbits(256),   # one side is USDC (asset id 0), the other a token id
+            rng.getrandbits(256) if i % 2 else 0,
+            rng.randrange(10 ** 9),
+            rng.randrange(10 ** 9),
+            rng.randrange(10 ** 4)
+        ]
+        log = dict(sample)
+        log["data"] = "0x" + "".join(f"{word:064x}" for word in words)
+        logs.append(log)
+    return logs
+
+
+def bench(label, fn, logs):
+    start = time.perf_counter()
+    total = fn(logs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.3f}s  {len(logs) / elapsed:12,.0f} logs/s  total_fill={total}")
+    return elapsed
+
+
+def per_log_slices(logs):
+    rows = []
+    for log in logs:
+        raw = bytes.fromhex(log["data"][2:])
+        words = [int.from_bytes(raw[i * 32:(i + 1) * 32], "big") for i in range(len(FILL_FIELDS))]
+        rows.append((words, int(log["topics"][2][-40:], 16), int(log["topics"][3][-40:], 16)))
+    return rows
+
+
+def page_views(logs):
+    page = LogPage(logs, n_words=len(FILL_FIELDS), topics=(2, 3))
+    columns = [page.word_column(i) for i in range(len(FILL_FIELDS))]
+    return columns, page.address_int_column(2), page.address_int_column(3)
+
+
+def per_log_bytes(logs):
+    return [(bytes.fromhex(log["data"][2:]), bytes.fromhex(log["topics"][2][2:]), bytes.fromhex(log["topics"][3][2:]))
+            for log in logs]
+
+
+def page_buffer(logs):
+    return LogPage(logs, n_words=len(FILL_FIELDS), topics=(2, 3))
+
+
+def bench_allocations(label, fn, logs):
+    # Timed without tracing, then traced once for the allocation profile
+    start = time.perf_counter()
+    fn(logs)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = fn(logs)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    diff = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in diff)
+    size = sum(stat.size_diff for stat in diff)
+    scale = 100000 / len(logs)
+    print(f"{label:<28} {elapsed * scale * 1000:8.1f} ms/100k  {blocks * scale:12,.0f} live allocs/100k  "
+          f"{size * scale / 1e6:8.1f} MB live/100k  {peak * scale / 1e6:8.1f} MB peak/100k")
+    del result
+    return elapsed
+
+
+def per_log_eth_abi(logs):
+    from eth_abi.abi import decode
+    total_fill = 0
+    for log in logs:
+        decoded = decode(['uint256', 'uint256', 'uint256', 'uint256', 'uint256'], bytes.fromhex(log['data'][2:]))
+        total_fill += decoded[3]
+    return total_fill
+
+
+def batch_numpy(logs):
+    return decode_fills(logs).total("taker_amount_filled")
+
+
+def batch_python(logs):
+    return decode_fills(logs, use_numpy=False).total("taker_amount_filled")
+
+
+if __name__ == "__main__":
+    print(f"🧪 Decoding {N_LOGS:,} synthetic OrderFilled logs")
+    logs = make_logs(N_LOGS)
+    results = {}
+    try:
+        results["per-log eth_abi.decode"] = bench("per-log eth_abi.decode", per_log_eth_abi, logs)
+    except ImportError:
+        print("⚠️ eth_abi not installed, skipping the per-log baseline")
+    results["batch (pure Python)"] = bench("batch (pure Python)", batch_python, logs)
+    results["batch (NumPy)"] = bench("batch (NumPy)", batch_numpy, logs)
+
+    baseline = results.get("per-log eth_abi.decode")
+    if baseline:
+        for label, elapsed in results.items():
+            print(f"📊 {label}: {baseline / elapsed:.1f}x vs per-log decode")
+
+    print("🧪 Data words + maker/taker per 100k logs")
+    sliced = bench_allocations("per-log hex slices", per_log_slices, logs)
+    viewed = bench_allocations("LogPage memoryviews", page_views, logs)
+    print(f"📊 LogPage memoryviews: {sliced / viewed:.1f}x vs per-log hex slices")
+
+    print("🧪 Unhexlify only, per 100k logs")
+    per_log = bench_allocations("per-log bytes.fromhex", per_log_bytes, logs)
+    paged = bench_allocations("LogPage buffer", page_buffer, logs)
+    print(f"📊 LogPage buffer: {per_log / paged:.1f}x vs per-log bytes.fromhex")
@@ -0,0 +1,90 @@
+import random
+import sys
+import time
+import tracemalloc
+
+from bench_decode import make_logs
+from eth_hex import to_checksum_address
+from fill_decoder import decode_fills
+from fill_store import FillStore
+
+# Benchmark: decoded fills kept as one dict per fill with checksum addresses computed per row
+# (the old decoded_fills list) against the columnar FillStore with interned, memoized addresses.
+#    Makers/takers are drawn from a pool of repeating addresses, like real market makers, and
+#    asset ids from a pool of outcome tokens. Memory is what the result keeps alive once the raw
+#    logs are gone (tracemalloc), so the dicts pay for the hash strings they hold on to.
+#    Usage: python3 bench_fill_store.py [number_of_logs] [distinct_addresses]
+
+N_LOGS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+N_ADDRESSES = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+N_TOKENS = 500
+
+
+def make_fill_logs(n, n_addresses):
+    rng = random.Random(11)
+    pool = ["0x" + "0" * 24 + f"{rng.getrandbits(160):040x}" for _ in range(n_addresses)]
+    token_pool = [rng.getrandbits(256) for _ in range(N_TOKENS)]
+    logs = make_logs(n)
+    for i, log in enumerate(logs):
+        token = rng.choice(token_pool)
+        words = [0, token, rng.randrange(10 ** 9), rng.randrange(10 ** 9), rng.randrange(10 ** 4)]
+        if i % 2:
+            words[0], words[1] = token, 0
+        log["data"] = "0x" + "".join(f"{word:064x}" for word in words)
+        topics = list(log["topics"])
+        topics[1] = "0x" + f"{rng.getrandbits(256):064x}"
+        # A few addresses take most of the fills
+        topics[2] = pool[min(int(rng.expovariate(1 / 50)), n_addresses - 1)]
+        topics[3] = pool[rng.randrange(n_addresses)]
+        log["topics"] = topics
+        log["transactionHash"] = "0x" + f"{rng.getrandbits(256):064x}"
+        log["blockNumber"] = hex(74000000 + i // 5)
+    return logs
+
+
+def list_of_dicts(batch):
+    return [{
+        "orderhash": log["topics"][1],
+        "maker": to_checksum_address(log["topics"][2]),
+        "taker": to_checksum_address(log["topics"][3]),
+        "makerAssetId": maker_asset,
+        "takerAssetId": taker_asset,
+        "makerAmountFilled": maker_amount,
+        "takerAmountFilled": taker_amount,
+        "fee": fee,
+        "txHash": log["transactionHash"],
+        "blockNumber": int(log["blockNumber"], 16)
+    } for log, maker_asset, taker_asset, maker_amount, taker_amount, fee in batch.rows()]
+
+
+def fill_store(batch):
+    store = FillStore()
+    store.add_batch(batch)
+    return store
+
+
+def measure(label, fn):
+    tracemalloc.start()
+    batch = decode_fills(make_fill_logs(N_LOGS, N_ADDRESSES))
+    started = time.perf_counter()
+    result = fn(batch)
+    elapsed = time.perf_counter() - started
+    del batch
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34} build {elapsed:7.3f}s  {size / N_LOGS:8.1f} bytes/fill kept", file=sys.stderr)
+    return result, elapsed, size
+
+
+if __name__ == "__main__":
+    print(f"🧪 {N_LOGS:,} fills over {N_ADDRESSES:,} distinct addresses", file=sys.stderr)
+    dicts, dict_time, dict_size = measure("list of dicts (per-row checksum)", list_of_dicts)
+    del dicts
+    store, store_time, store_size = measure("FillStore (interned, memoized)", fill_store)
+
+    started = time.perf_counter()
+    rows = sum(1 for _ in store.rows())
+    print(f"{'FillStore rows() formatting':<34} {time.perf_counter() - started:7.3f}s for {rows:,} rows "
+          f"({len(store.addresses):,} checksums computed)", file=sys.stderr)
+    print(f"📊 {dict_size / store_size:.1f}x less memory per fill, {dict_time / store_time:.1f}x faster to build "
+          f"(columns alone: {store.nbytes() / len(store):.0f} bytes/fill)", file=sys.stderr)
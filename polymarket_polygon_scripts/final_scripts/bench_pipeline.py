@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+from block_cache import BlockTimestampCache
+from block_index import AnchorIndex
+from block_search import BlockResolver
+from fake_polygon_rpc import CONTRACT_ADDRESS, FILL_ORDER_TOPIC, FILLS_PER_BLOCK, FakeChain, FakePolygonRpc
+from fill_decoder import decode_fills
+from log_fetcher import BLOCK_STEP, WORKERS, fetch_logs
+from market_breakdown import MarketBreakdown
+from rate_limiter import TokenBucket
+from rpc_client import RpcClient
+
+# End-to-end benchmark of a 24h run, stage by stage, against the local fake node (fake_polygon_rpc.py).
+#    Stages mirror the scripts:
+#      head               script 1: eth_blockNumber + latest block
+#      boundaries_etherscan   2_get_blocks_24h.py: two getblocknobytime lookups + timestamp checks
+#      boundaries_rpc     RPC interpolation search from the head (the Etherscan fallback)
+#      boundaries_indexed the feedback-loop script: anchor index from the estimate to the head + search
+#      fetch              concurrent eth_getLogs over the window
+#      decode             batch OrderFilled decode
+#      aggregate          total_fill + per-market breakdown
+#    Each stage reports wall time, RPC calls and POSTs/GETs seen by the node, bytes both ways, the
+#    memory the stage allocated (tracemalloc: peak during the stage and what it still holds after,
+#    both relative to its start; the fake node's threads are in the same process, so its request
+#    handling is counted too) and fills/sec, as one JSON document (stdout or --output), so runs can
+#    be compared across commits. The process peak RSS is only reported for the run as a whole: it
+#    never goes down, so per stage it would just repeat the largest stage so far.
+#    tracemalloc slows allocation-heavy stages (decode) down; --no-memory gives clean wall times.
+#    Usage: python3 bench_pipeline.py [--latency 0.02] [--fills-per-block 2] [--max-range 2000] [--output bench.json]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class StageTimer:
+    """Collects per-stage metrics from the fake node's counters"""
+
+    def __init__(self, rpc, trace_memory=True):
+        self.rpc = rpc
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    def _counters(self):
+        return {"calls": self.rpc.calls, "posts": self.rpc.posts, "gets": self.rpc.gets,
+                "bytes_in": self.rpc.bytes_in, "bytes_out": self.rpc.bytes_out}
+
+    def run(self, name, fn):
+        before = self._counters()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            memory_before, _ = tracemalloc.get_traced_memory()
+        started = time.perf_counter()
+        result, fills = fn()
+        elapsed = time.perf_counter() - started
+        after = self._counters()
+        stage = {"wall_s": round(elapsed, 4)}
+        stage.update({key: after[key] - before[key] for key in after})
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            stage["peak_alloc_mb"] = round((peak - memory_before) / (1 << 20), 1)
+            stage["retained_mb"] = round((current - memory_before) / (1 << 20), 1)
+        if fills is not None:
+            stage["fills"] = fills
+            stage["fills_per_s"] = round(fills / elapsed) if elapsed > 0 else None
+        self.stages[name] = stage
+        memory = ""
+        if self.trace_memory:
+            memory = f"  {stage['peak_alloc_mb']:8.1f} MB peak  {stage['retained_mb']:8.1f} MB kept"
+        print(f"⏱️ {name:<22} {elapsed:8.3f}s  {stage['calls']:6} calls  "
+              f"{stage['bytes_out'] / 1e6:8.2f} MB in{memory}", file=sys.stderr)
+        return result
+
+
+def run_stages(args, chain, rpc, url, workdir, start_ts, end_ts):
+    """Time every stage against the running fake node; its caches live in workdir"""
+    limiter = TokenBucket(rate=args.rate, burst=args.rate, max_rate=args.rate, min_rate=1)
+    client = RpcClient(url, limiter=limiter)
+    timer = StageTimer(rpc, trace_memory=not args.no_memory)
+
+    caches = []
+
+    def fresh_cache(name):
+        cache = BlockTimestampCache(os.path.join(workdir, name), client=client)
+        caches.append(cache)
+        return cache
+
+    if timer.trace_memory:
+        tracemalloc.start()
+    head = timer.run("head", lambda: (client.head(), None))
+
+    def etherscan():
+        cache = fresh_cache("etherscan.sqlite3")
+        blocks = []
+        for timestamp, closest in ((start_ts, "after"), (end_ts, "before")):
+            data = requests.get(url, params={"chainid": "137", "module": "block", "action": "getblocknobytime",
+                                             "timestamp": str(timestamp), "closest": closest}, timeout=10).json()
+            blocks.append(int(data["result"]))
+        # 2_get_blocks_24h.py verifies both boundary timestamps over RPC
+        cache.block_timestamps(blocks)
+        return tuple(blocks), None
+
+    def rpc_search():
+        resolver = BlockResolver(fresh_cache("search.sqlite3"), head=head)
+        window = resolver.window(start_ts, end_ts)
+        return (window.start_block, window.end_block), None
+
+    def indexed_search():
+        cache = fresh_cache("indexed.sqlite3")
+        cache.set_head(head[0])
+        index = AnchorIndex(os.path.join(workdir, "anchors.idx"), cache=cache)
+        # The feedback-loop script anchors from a generous estimate of the start block to the head
+        estimated_start = max(chain.first_block, head[0] - int((head[1] - start_ts) / 2.0 * 1.25))
+        index.extend(estimated_start, head[0])
+        window = BlockResolver(cache, head=head, index=index).window(start_ts, end_ts)
+        return (window.start_block, window.end_block), None
+
+    etherscan_blocks = timer.run("boundaries_etherscan", etherscan)
+    rpc_blocks = timer.run("boundaries_rpc", rpc_search)
+    indexed_blocks = timer.run("boundaries_indexed", indexed_search)
+    if not etherscan_blocks == rpc_blocks == indexed_blocks:
+        print(f"⚠️ Boundary mismatch: {etherscan_blocks} {rpc_blocks} {indexed_blocks}", file=sys.stderr)
+    start_block, end_block = rpc_blocks
+
+    def fetch():
+        logs = []
+        for chunk in fetch_logs(CONTRACT_ADDRESS, [FILL_ORDER_TOPIC], start_block, end_block, client=client,
+                                block_step=args.block_step, workers=args.workers):
+            logs.extend(chunk.logs)
+        return logs, len(logs)
+
+    logs = timer.run("fetch", fetch)
+    batch = timer.run("decode", lambda: (decode_fills(logs), len(logs)))
+
+    def aggregate():
+        breakdown = MarketBreakdown()
+        breakdown.add_batch(batch)
+        return (batch.total("taker_amount_filled"), len(breakdown.markets)), len(batch)
+
+    total_fill, markets = timer.run("aggregate", aggregate)
+    if timer.trace_memory:
+        tracemalloc.stop()
+    for cache in caches:
+        cache.close()
+    return timer, start_block, end_block, batch, total_fill, markets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every stage of a 24h run against a local fake node")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per POST at the fake node")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--fills-per-block", type=float, default=FILLS_PER_BLOCK)
+    parser.add_argument("--hours", type=int, default=24, help="window length")
+    parser.add_argument("--max-range", type=int, default=None, help="node eth_getLogs block range limit")
+    parser.add_argument("--max-results", type=int, default=None, help="node eth_getLogs result cap")
+    parser.add_argument("--block-step", type=int, default=BLOCK_STEP)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--rate", type=float, default=1000.0, help="client request rate limit (req/s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip per-stage tracemalloc measurement")
+    parser.add_argument("--output", default=None, help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    chain = FakeChain(seed=args.seed, fills_per_block=args.fills_per_block)
+    # Window: the last whole UTC day(s) that end at least an hour below the fake head
+    head_ts = chain.timestamp(chain.head_block)
+    day_end = datetime.fromtimestamp(head_ts - 3600, timezone.utc).replace(hour=0, minute=0, second=0)
+    start_ts = int((day_end - timedelta(hours=args.hours)).timestamp())
+    end_ts = int(day_end.timestamp())
+
+    rpc = FakePolygonRpc(chain, latency=args.latency, jitter=args.jitter, max_block_range=args.max_range,
+                         max_results=args.max_results, seed=args.seed)
+    url = rpc.start()
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as workdir:
+            timer, start_block, end_block, batch, total_fill, markets = run_stages(
+                args, chain, rpc, url, workdir, start_ts, end_ts)
+    finally:
+        rpc.stop()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": int(time.time()),
+        "python": sys.version.split()[0],
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "window": {"start_ts": start_ts, "end_ts": end_ts, "start_block": start_block, "end_block": end_block,
+                   "blocks": end_block - start_block + 1},
+        "result": {"fills": len(batch), "total_fill": str(total_fill), "markets": markets},
+        "stages": timer.stages,
+        "total": {
+            "wall_s": round(sum(stage["wall_s"] for stage in timer.stages.values()), 4),
+            "calls": rpc.calls,
+            "posts": rpc.posts,
+            "gets": rpc.gets,
+            "bytes_in": rpc.bytes_in,
+            "bytes_out": rpc.bytes_out,
+            "peak_rss_mb": peak_rss_mb(),
+        },
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"💾 Saved benchmark report to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Startup-time benchmark: the old web3 preamble of 2_get_24_hr_ctf-open_trades.py against the
+# lightweight ingestion path (stdlib + requests + eth_hex.py), each in a fresh interpreter.
+#    Usage: python3 bench_startup.py [runs]
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PATHS = {
+    "interpreter only": "pass",
+    "web3 preamble (old script)": """
+import json
+from web3 import Web3
+from web3.middleware import geth_poa_middleware
+from eth_utils import keccak
+abi = json.load(open("contractABI.json"))
+web3 = Web3(Web3.HTTPProvider("https://polygon-rpc.com"))
+contract = web3.eth.contract(address="0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E", abi=abi)
+contract.events.OrderFilled().abi
+keccak(text="OrderFilled(bytes32,address,address,uint256,uint256,uint256,uint256,uint256)").hex()
+w3 = Web3(Web3.HTTPProvider("https://polygon-rpc.com"))
+w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+""",
+    "lightweight path (pipeline.py)": """
+import json
+import pipeline
+from eth_hex import event_topic
+abi = json.load(open("contractABI.json"))
+next(e for e in abi if e.get("type") == "event" and e.get("name") == "OrderFilled")
+event_topic("OrderFilled(bytes32,address,address,uint256,uint256,uint256,uint256,uint256)")
+""",
+}
+
+
+def time_run(code):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    return elapsed, None
+
+
+if __name__ == "__main__":
+    report = {}
+    for label, code in PATHS.items():
+        times = []
+        error = None
+        for _ in range(RUNS):
+            elapsed, error = time_run(code)
+            if elapsed is None:
+                break
+            times.append(elapsed)
+        if not times:
+            print(f"⚠️ {label}: skipped ({error})", file=sys.stderr)
+            report[label] = {"error": error}
+            continue
+        report[label] = {"min_s": round(min(times), 4), "median_s": round(statistics.median(times), 4), "runs": len(times)}
+        print(f"⏱️ {label:<32} median {statistics.median(times) * 1000:8.1f} ms  min {min(times) * 1000:8.1f} ms",
+              file=sys.stderr)
+
+    old = report.get("web3 preamble (old script)", {}).get("median_s")
+    new = report.get("lightweight path (pipeline.py)", {}).get("median_s")
+    if old and new:
+        print(f"📊 Lightweight path starts {old / new:.1f}x faster", file=sys.stderr)
+    print(json.dumps(report, indent=2))
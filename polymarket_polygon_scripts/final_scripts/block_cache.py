@@ -0,0 +1,145 @@
+import sqlite3
+import threading
+
+from rpc_client import get_client
+
+# Persistent block -> timestamp cache shared by every block-search path.
+#    Block timestamps never change once a block is final, so anything resolved once is kept in a
+#    small SQLite file and repeat runs for nearby dates need almost no header fetches.
+#    Misses are fetched in batched eth_getBlockByNumber POSTs and written through to disk, or, with
+#    write_through=False, kept in memory and written back in one transaction by flush() / close().
+
+CACHE_FILE = "block_timestamps.sqlite3"
+FETCH_BATCH_SIZE = 50     # eth_getBlockByNumber calls per batched POST
+CONFIRMATIONS = 256       # blocks closer than this to the head are served but not stored
+SQL_CHUNK = 500           # block numbers per "IN (...)" lookup
+
+
+class BlockTimestampCache:
+    """SQLite-backed block timestamp cache with bulk lookups and hit-rate stats"""
+
+    def __init__(self, path=CACHE_FILE, client=None, write_through=True):
+        self.path = path
+        self.client = client or get_client()
+        self.write_through = write_through
+        self.head_block = None
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}
+        self._dirty = set()     # fetched but not yet on disk (write-back mode)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS block_timestamps ("
+            "block_number INTEGER PRIMARY KEY, timestamp INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        self._db.commit()
+
+    def set_head(self, head_block):
+        """Known chain head; blocks within CONFIRMATIONS of it are not persisted"""
+        self.head_block = head_block
+
+    def _is_final(self, block_number):
+        return self.head_block is None or block_number <= self.head_block - CONFIRMATIONS
+
+    def _lookup(self, block_numbers):
+        found = {}
+        missing = []
+        for n in block_numbers:
+            if n in self._memory:
+                found[n] = self._memory[n]
+            else:
+                missing.append(n)
+        for i in range(0, len(missing), SQL_CHUNK):
+            part = missing[i:i + SQL_CHUNK]
+            rows = self._db.execute(
+                f"SELECT block_number, timestamp FROM block_timestamps "
+                f"WHERE block_number IN ({','.join('?' * len(part))})", part
+            ).fetchall()
+            found.update(rows)
+        return found
+
+    def put_many(self, timestamps):
+        """Store {block_number: timestamp}; non-final blocks only go to the in-memory layer"""
+        with self._lock:
+            self._memory.update(timestamps)
+            rows = [(n, ts) for n, ts in timestamps.items() if self._is_final(n)]
+            if rows:
+                self._db.executemany("INSERT OR REPLACE INTO block_timestamps VALUES (?, ?)", rows)
+                self._db.commit()
+
+    def cached(self, block_numbers):
+        """Cache-only bulk lookup, no RPC calls"""
+        with self._lock:
+            return self._lookup(list(block_numbers))
+
+    def block_timestamps(self, block_numbers):
+        """{block_number: timestamp} for many blocks, fetching only the misses (batched)"""
+        block_numbers = list(dict.fromkeys(block_numbers))
+        with self._lock:
+            found = self._lookup(block_numbers)
+            missing = [n for n in block_numbers if n not in found]
+            self.hits += len(block_numbers) - len(missing)
+            self.misses += len(missing)
+
+        fetched = {}
+        for i in range(0, len(missing), FETCH_BATCH_SIZE):
+            fetched.update(self.client.get_block_timestamps(missing[i:i + FETCH_BATCH_SIZE]))
+        if fetched:
+            if self.write_through:
+                self.put_many(fetched)
+            else:
+                with self._lock:
+                    self._memory.update(fetched)
+                    self._dirty.update(fetched)
+        found.update(fetched)
+        return found
+
+    def block_timestamp(self, block_number):
+        """Timestamp of one block, or None if the node doesn't have it"""
+        return self.block_timestamps([block_number]).get(block_number)
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self):
+        return f"{self.hits} hits / {self.misses} misses ({self.hit_rate():.0%} hit rate)"
+
+    def flush(self):
+        """Write back every fetched block that is final by now; returns how many were written
+
+        Non-final ones stay pending, so a later flush (after set_head moved on) can still store them.
+        """
+        with self._lock:
+            rows = [(n, self._memory[n]) for n in sorted(self._dirty) if self._is_final(n)]
+            if rows:
+                self._db.executemany("INSERT OR REPLACE INTO block_timestamps VALUES (?, ?)", rows)
+                self._db.commit()
+                self._dirty.difference_update(n for n, _ in rows)
+        return len(rows)
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Shared cache for the default endpoint and cache file"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = BlockTimestampCache()
+        return _cache
+
+
+def block_timestamp(block_number):
+    return get_cache().block_timestamp(block_number)
+
+
+def block_timestamps(block_numbers):
+    return get_cache().block_timestamps(block_numbers)
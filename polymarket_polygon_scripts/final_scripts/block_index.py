@@ -0,0 +1,122 @@
+import json
+import os
+from array import array
+from bisect import bisect_left
+
+from block_cache import CONFIRMATIONS, get_cache
+from block_search import AVG_BLOCK_TIME
+
+# Sampled (block, timestamp) anchor index for offline timestamp -> block brackets.
+#    Anchors sit every ANCHOR_STEP blocks (block numbers that are multiples of the step) and are
+#    stored as one flat int64 array: [step, first_anchor_block, ts_0, ts_1, ...]. Any timestamp
+#    inside the covered span maps to a bracket of at most ANCHOR_STEP blocks with one in-memory
+#    bisect, so BlockResolver only needs one or two confirming header fetches per boundary.
+#    The index grows incrementally: extend() only fetches anchors it doesn't have yet, and never
+#    past the cache's head - CONFIRMATIONS, so no anchor in the file can still be reorged out.
+
+ANCHOR_FILE = "block_anchors.idx"
+ANCHOR_STEP = 1000
+HEAD_FILE = "current_polygon_block.json"
+ESTIMATE_MARGIN = 1.25    # anchor this much further back than AVG_BLOCK_TIME puts a target
+
+
+class AnchorIndex:
+    """Evenly spaced block timestamp anchors, persisted as a compact binary file"""
+
+    def __init__(self, path=ANCHOR_FILE, step=ANCHOR_STEP, cache=None):
+        self.path = path
+        self.step = step
+        self.cache = cache or get_cache()
+        self.first_block = None
+        self.timestamps = array("q")
+        self.fetched = 0
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        data = array("q")
+        with open(self.path, "rb") as f:
+            data.frombytes(f.read())
+        if len(data) < 2 or data[0] != self.step:
+            # Different anchor spacing: start over rather than mixing steps
+            return
+        self.first_block = data[1]
+        self.timestamps = data[2:]
+
+    def save(self):
+        if self.first_block is None:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            array("q", [self.step, self.first_block]).tofile(f)
+            self.timestamps.tofile(f)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def last_block(self):
+        if self.first_block is None:
+            return None
+        return self.first_block + (len(self.timestamps) - 1) * self.step
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def _fetch(self, anchor_blocks):
+        timestamps = self.cache.block_timestamps(anchor_blocks)
+        self.fetched += len(anchor_blocks)
+        missing = [n for n in anchor_blocks if n not in timestamps]
+        if missing:
+            raise LookupError(f"Anchor blocks not found: {missing[:5]}")
+        return [timestamps[n] for n in anchor_blocks]
+
+    def extend(self, low_block, high_block):
+        """Make sure anchors cover [low_block, high_block]; fetches only the missing anchors
+
+        high_block is capped at the cache's head - CONFIRMATIONS (when the head is known).
+        """
+        if self.cache.head_block is not None:
+            high_block = min(high_block, self.cache.head_block - CONFIRMATIONS)
+        low = (max(0, low_block) // self.step) * self.step
+        high = (high_block // self.step) * self.step
+        if high < low:
+            return
+        if self.first_block is None:
+            blocks = list(range(low, high + 1, self.step))
+            self.timestamps = array("q", self._fetch(blocks))
+            self.first_block = low
+        else:
+            if low < self.first_block:
+                before = list(range(low, self.first_block, self.step))
+                self.timestamps = array("q", self._fetch(before)) + self.timestamps
+                self.first_block = low
+            if high > self.last_block:
+                after = list(range(self.last_block + self.step, high + 1, self.step))
+                self.timestamps.extend(self._fetch(after))
+        self.save()
+
+    def extend_to_head(self, low_block=None, head_file=HEAD_FILE):
+        """Extend up to the head saved by script 1 (and down to low_block if given)"""
+        with open(head_file, "r") as f:
+            head_block = json.load(f)["current_polygon_block"]
+        self.cache.set_head(head_block)
+        if low_block is None:
+            low_block = self.first_block if self.first_block is not None else head_block
+        self.extend(low_block, head_block)
+        return head_block
+
+    def extend_back_to(self, target_ts, head):
+        """Cover a generous estimate of the block at target_ts up to head = (block, timestamp)"""
+        head_block, head_ts = head
+        self.cache.set_head(head_block)
+        estimated = head_block - int((head_ts - target_ts) / AVG_BLOCK_TIME * ESTIMATE_MARGIN)
+        self.extend(estimated, head_block)
+
+    def bracket(self, target_ts):
+        """((lo, lo_ts), (hi, hi_ts)) anchors with lo_ts < target_ts <= hi_ts, or None if not covered"""
+        if self.first_block is None:
+            return None
+        i = bisect_left(self.timestamps, target_ts)
+        if i == 0 or i == len(self.timestamps):
+            return None
+        lo = self.first_block + (i - 1) * self.step
+        return (lo, self.timestamps[i - 1]), (lo + self.step, self.timestamps[i])
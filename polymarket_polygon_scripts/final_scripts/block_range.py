@@ -0,0 +1,88 @@
+import json
+
+# Compact block-range handoff between the block search and log scripts.
+#    Instead of spelling out every block number (~550 KB per day), the file only holds the
+#    range descriptor; BlockRange serves the block numbers lazily as a range().
+#
+#    {
+#      "format": "block_range/v1",
+#      "chain_id": 137,
+#      "start_block": 73968568,
+#      "end_block": 74008089,
+#      "start_timestamp": 1752537601,
+#      "end_timestamp": 1752623999
+#    }
+
+BLOCK_RANGE_FILE = "block_numbers_target_range_24_hr_value_target.json"
+FORMAT = "block_range/v1"
+POLYGON_CHAIN_ID = 137
+
+
+class BlockRange:
+    """Inclusive block range [start_block, end_block] with optional boundary timestamps"""
+
+    __slots__ = ("start_block", "end_block", "start_timestamp", "end_timestamp", "chain_id")
+
+    def __init__(self, start_block, end_block, start_timestamp=None, end_timestamp=None,
+                 chain_id=POLYGON_CHAIN_ID):
+        if end_block < start_block:
+            raise ValueError(f"End block {end_block} is before start block {start_block}")
+        self.start_block = start_block
+        self.end_block = end_block
+        self.start_timestamp = start_timestamp
+        self.end_timestamp = end_timestamp
+        self.chain_id = chain_id
+
+    @property
+    def block_numbers(self):
+        """All block numbers in the range, lazily (a range object, not a list)"""
+        return range(self.start_block, self.end_block + 1)
+
+    def __iter__(self):
+        return iter(self.block_numbers)
+
+    def __len__(self):
+        return self.end_block - self.start_block + 1
+
+    def __contains__(self, block_number):
+        return self.start_block <= block_number <= self.end_block
+
+    def __repr__(self):
+        return f"BlockRange({self.start_block}, {self.end_block}, chain_id={self.chain_id})"
+
+    def to_dict(self):
+        return {
+            "format": FORMAT,
+            "chain_id": self.chain_id,
+            "start_block": self.start_block,
+            "end_block": self.end_block,
+            "start_timestamp": self.start_timestamp,
+            "end_timestamp": self.end_timestamp
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if "start_block" in data and "end_block" in data:
+            start_block, end_block = data["start_block"], data["end_block"]
+        else:
+            # Legacy file with only the spelled-out list
+            block_numbers = data["block_numbers"]
+            start_block, end_block = block_numbers[0], block_numbers[-1]
+        return cls(
+            start_block,
+            end_block,
+            data.get("start_timestamp"),
+            data.get("end_timestamp"),
+            data.get("chain_id", POLYGON_CHAIN_ID)
+        )
+
+
+def save_block_range(block_range, path=BLOCK_RANGE_FILE):
+    with open(path, "w") as f:
+        json.dump(block_range.to_dict(), f, indent=2)
+
+
+def load_block_range(path=BLOCK_RANGE_FILE):
+    """Load a range descriptor (also accepts the old format with a full "block_numbers" list)"""
+    with open(path, "r") as f:
+        return BlockRange.from_dict(json.load(f))
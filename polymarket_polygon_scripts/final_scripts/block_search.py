@@ -0,0 +1,199 @@
+from block_cache import get_cache
+from block_range import BlockRange
+
+# Timestamp -> block resolution over plain JSON-RPC (no Etherscan key needed).
+#    Keeps two anchors lo/hi with ts(lo) < target <= ts(hi) and probes where the target should be
+#    if block time were constant between them (interpolation / secant step). Each round fetches
+#    the guess plus a second block next to it in one batched POST, so a guess that lands right on
+#    the boundary settles it in a single round trip. Rounds that keep landing on the same side
+#    widen that second probe by a doubling margin to pull the other anchor in, and after a long
+#    streak the search falls back to bisection, so the worst case stays logarithmic.
+#    Every probe goes through the block timestamp cache.
+
+AVG_BLOCK_TIME = 2.0      # seconds, only used to place the first probe from the head (and anchor estimates)
+MAX_PROBES = 64           # search rounds before giving up
+
+
+class BlockNotFound(Exception):
+    """Target timestamp lies outside the chain (after the head or before genesis)"""
+
+
+class BlockResolver:
+    """Finds the first block at or after a timestamp; counts the header fetches and round trips it needed"""
+
+    def __init__(self, cache=None, head=None, index=None):
+        self.cache = cache or get_cache()
+        self.head = head        # (head_block, head_timestamp), fetched lazily when None
+        self.index = index      # optional AnchorIndex (block_index.py) for offline brackets
+        self.probes = 0         # header fetches (cache hits included)
+        self.round_trips = 0
+
+    def _timestamps(self, block_numbers):
+        self.probes += len(block_numbers)
+        self.round_trips += 1
+        timestamps = self.cache.block_timestamps(block_numbers)
+        missing = [n for n in block_numbers if n not in timestamps]
+        if missing:
+            raise BlockNotFound(f"Block {missing[0]} not found")
+        return timestamps
+
+    def _timestamp(self, block_number):
+        return self._timestamps([block_number])[block_number]
+
+    def _head(self):
+        if self.head is None:
+            head_block, head_ts = self.cache.client.head()
+            self.cache.set_head(head_block)
+            self.head = (head_block, head_ts)
+        return self.head
+
+    def _bracket(self, target_ts):
+        """Two anchors (lo, lo_ts), (hi, hi_ts) with lo_ts < target_ts <= hi_ts"""
+        head_block, head_ts = self._head()
+        if target_ts > head_ts:
+            raise BlockNotFound(f"Timestamp {target_ts} is after the chain head ({head_block} @ {head_ts})")
+        hi, hi_ts = head_block, head_ts
+        # First guess from the average block time, then widen the step until the target is behind us
+        step = max(1, int((head_ts - target_ts) / AVG_BLOCK_TIME))
+        while True:
+            lo = max(0, hi - step)
+            lo_ts = self._timestamp(lo)
+            if lo_ts < target_ts:
+                return (lo, lo_ts), (hi, hi_ts)
+            if lo == 0:
+                # Genesis is already at or after the target
+                return None, (0, lo_ts)
+            hi, hi_ts = lo, lo_ts
+            step *= 2
+
+    def _search(self, target_ts, low, high):
+        """Secant search between two anchors, as a generator
+
+        Yields the block numbers it wants to probe, is sent back their {block: timestamp} and
+        returns (StopIteration.value) the first block at or after target_ts. Driving it one step
+        at a time lets several searches share batched POSTs.
+        """
+        (lo, lo_ts), (hi, hi_ts) = low, high
+        last_side = None
+        streak = 0
+        for _ in range(MAX_PROBES):
+            if hi - lo <= 1:
+                return hi
+            # Secant step between the anchors
+            guess = lo + int((target_ts - lo_ts) * (hi - lo) / (hi_ts - lo_ts)) if hi_ts > lo_ts else (lo + hi) // 2
+            if streak >= 8:
+                guess = (lo + hi) // 2
+            guess = min(hi - 1, max(lo + 1, guess))
+            # Second probe: the block just before the guess, or past it by a growing margin
+            #    (1, 2, 4, ... blocks) when interpolation keeps landing on the same side
+            if last_side == "low":
+                partner = guess + (1 << streak)
+            elif last_side == "high":
+                partner = guess - (1 << streak)
+            else:
+                partner = guess - 1
+            candidates = sorted({guess, min(hi - 1, max(lo + 1, partner))})
+
+            timestamps = yield candidates
+            sides = set()
+            for block in candidates:
+                block_ts = timestamps[block]
+                if block_ts < target_ts:
+                    sides.add("low")
+                    if block > lo:
+                        lo, lo_ts = block, block_ts
+                else:
+                    sides.add("high")
+                    if block < hi:
+                        hi, hi_ts = block, block_ts
+            side = sides.pop() if len(sides) == 1 else None
+            streak = streak + 1 if side is not None and side == last_side else 0
+            last_side = side
+        raise BlockNotFound(f"No convergence for timestamp {target_ts} after {MAX_PROBES} rounds")
+
+    def _index_bracket(self, target_ts):
+        if self.index is None:
+            return None
+        return self.index.bracket(target_ts)
+
+    def first_block_at_or_after(self, target_ts, low=None, high=None):
+        """Exact first block whose timestamp is >= target_ts
+
+        `low`/`high` are optional (block, timestamp) anchors already known to bracket the target.
+        """
+        if low is None or high is None:
+            low, high = self._index_bracket(target_ts) or (None, None)
+        if low is None or high is None:
+            low, high = self._bracket(target_ts)
+            if low is None:
+                return high[0]
+
+        search = self._search(target_ts, low, high)
+        try:
+            candidates = next(search)
+            while True:
+                candidates = search.send(self._timestamps(candidates))
+        except StopIteration as done:
+            return done.value
+
+    def first_blocks_at_or_after(self, targets):
+        """first_block_at_or_after for many timestamps at once, as {timestamp: block}
+
+        All searches advance in lockstep and each round's probes for every target go out in one
+        batched POST, so N targets cost about as many round trips as one. Without an anchor index,
+        one bracket walk back to the earliest target serves them all.
+        """
+        targets = sorted(set(targets))
+        results = {}
+        brackets = {}
+        for target_ts in targets:
+            bracket = self._index_bracket(target_ts)
+            if bracket is not None:
+                brackets[target_ts] = bracket
+        unbracketed = [t for t in targets if t not in brackets]
+        if unbracketed:
+            low, high = self._bracket(unbracketed[0])
+            head = self._head()
+            for target_ts in unbracketed:
+                if low is None:
+                    # Genesis is at or after the earliest target
+                    if target_ts <= high[1]:
+                        results[target_ts] = high[0]
+                        continue
+                    brackets[target_ts] = ((0, high[1]), head)
+                elif target_ts > head[1]:
+                    raise BlockNotFound(f"Timestamp {target_ts} is after the chain head ({head[0]} @ {head[1]})")
+                else:
+                    # Anything between the earliest target and the head is bracketed by (low, head)
+                    brackets[target_ts] = (low, head if target_ts > high[1] else high)
+
+        searches = {}
+        pending = {}
+        for target_ts, (low, high) in brackets.items():
+            search = self._search(target_ts, low, high)
+            try:
+                pending[target_ts] = next(search)
+                searches[target_ts] = search
+            except StopIteration as done:
+                results[target_ts] = done.value
+
+        while pending:
+            timestamps = self._timestamps(sorted({n for blocks in pending.values() for n in blocks}))
+            for target_ts in list(pending):
+                try:
+                    pending[target_ts] = searches[target_ts].send(timestamps)
+                except StopIteration as done:
+                    results[target_ts] = done.value
+                    del pending[target_ts]
+        return results
+
+    def window(self, start_ts, end_ts):
+        """BlockRange covering blocks with start_ts <= timestamp < end_ts"""
+        start_block = self.first_block_at_or_after(start_ts)
+        end_block = self.first_block_at_or_after(end_ts) - 1
+        timestamps = self.cache.block_timestamps([start_block, end_block])
+        return BlockRange(start_block, end_block, timestamps.get(start_block), timestamps.get(end_block))
+
+
+def first_block_at_or_after(target_ts):
+    return BlockResolver().first_block_at_or_after(target_ts)
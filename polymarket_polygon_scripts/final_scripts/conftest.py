@@ -0,0 +1,43 @@
+import pytest
+
+from fake_polygon_rpc import FakeChain, FakePolygonRpc
+from rate_limiter import TokenBucket
+from rpc_client import RpcClient
+
+# Shared fixtures for the test_*.py modules: a small deterministic chain served by the local fake
+#    node (fake_polygon_rpc.py), and a client pointed at it with a limiter that never gets in the way.
+
+CHAIN_BLOCKS = 20000
+
+
+@pytest.fixture
+def chain():
+    fake = FakeChain(seed=5, fills_per_block=2)
+    fake.first_block = fake.head_block - CHAIN_BLOCKS
+    return fake
+
+
+@pytest.fixture
+def node(chain):
+    with FakePolygonRpc(chain) as rpc:
+        yield rpc
+
+
+@pytest.fixture
+def make_client():
+    """Factory for clients pointed at any URL; every client made is closed after the test"""
+    clients = []
+
+    def make(url):
+        client = RpcClient(url, limiter=TokenBucket(rate=10000, burst=10000, max_rate=10000, min_rate=1))
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def client(node, make_client):
+    return make_client(node.url)
@@ -0,0 +1,95 @@
+try:
+    from Crypto.Hash import keccak as _crypto_keccak   # pycryptodome, already pulled in by web3
+except ImportError:  # pure-Python Keccak below gives the same digests, just slower
+    _crypto_keccak = None
+
+# Minimal keccak/hex layer for the ingestion path, so it never has to import web3.
+#    keccak256 (Ethereum's Keccak, not hashlib's NIST sha3_256 padding), event topic0s from
+#    signatures, topic <-> address conversion and EIP-55 checksum addresses. Uses pycryptodome's
+#    Keccak when it is installed and a small pure-Python Keccak-f[1600] otherwise.
+
+_ROUND_CONSTANTS = (
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+)
+# Rotation offsets, indexed [x + 5 * y]
+_ROTATIONS = (
+    0, 1, 62, 28, 27,
+    36, 44, 6, 55, 20,
+    3, 10, 43, 25, 39,
+    41, 45, 15, 21, 8,
+    18, 2, 61, 56, 14,
+)
+_MASK = (1 << 64) - 1
+_RATE = 136     # bytes absorbed per permutation for Keccak-256
+
+
+def _keccak_f(a):
+    for rc in _ROUND_CONSTANTS:
+        # theta
+        c = [a[x] ^ a[x + 5] ^ a[x + 10] ^ a[x + 15] ^ a[x + 20] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ (((c[(x + 1) % 5] << 1) | (c[(x + 1) % 5] >> 63)) & _MASK) for x in range(5)]
+        a = [a[i] ^ d[i % 5] for i in range(25)]
+        # rho and pi
+        b = [0] * 25
+        for x in range(5):
+            for y in range(5):
+                i = x + 5 * y
+                r = _ROTATIONS[i]
+                b[y + 5 * ((2 * x + 3 * y) % 5)] = ((a[i] << r) | (a[i] >> (64 - r))) & _MASK if r else a[i]
+        # chi
+        a = [b[i] ^ (~b[(i % 5 + 1) % 5 + 5 * (i // 5)] & b[(i % 5 + 2) % 5 + 5 * (i // 5)]) for i in range(25)]
+        # iota
+        a[0] ^= rc
+    return a
+
+
+def _keccak256_python(data):
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(b"\x00" * (-len(padded) % _RATE))
+    padded[-1] |= 0x80
+    state = [0] * 25
+    for offset in range(0, len(padded), _RATE):
+        block = padded[offset:offset + _RATE]
+        for i in range(_RATE // 8):
+            state[i] ^= int.from_bytes(block[8 * i:8 * i + 8], "little")
+        state = _keccak_f(state)
+    return b"".join(lane.to_bytes(8, "little") for lane in state[:4])
+
+
+def keccak256(data):
+    """Keccak-256 digest of bytes (or of a str, UTF-8 encoded)"""
+    if isinstance(data, str):
+        data = data.encode()
+    if _crypto_keccak is not None:
+        return _crypto_keccak.new(digest_bits=256, data=data).digest()
+    return _keccak256_python(data)
+
+
+def event_topic(signature):
+    """topic0 for an event signature like "OrderFilled(bytes32,address,...)" as 0x-hex"""
+    return "0x" + keccak256(signature).hex()
+
+
+def topic_to_address(topic):
+    """Lower-case 0x address from a 32-byte indexed address topic"""
+    return "0x" + topic[-40:].lower()
+
+
+def address_to_topic(address):
+    return "0x" + "0" * 24 + address[-40:].lower()
+
+
+def to_checksum_address(address):
+    """EIP-55 mixed-case checksum form of a 20-byte hex address"""
+    hex_address = address[-40:].lower()
+    digest = keccak256(hex_address.encode()).hex()
+    return "0x" + "".join(
+        char.upper() if char.isalpha() and int(digest[i], 16) >= 8 else char
+        for i, char in enumerate(hex_address)
+    )
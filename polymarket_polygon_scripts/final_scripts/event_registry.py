@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import re
+
+from eth_hex import event_topic
+
+# Event registry built from contractABI.json: topic0, indexed/non-indexed layout and a precompiled
+#    decoder for every event, looked up by topic0 (or name) in one dict access.
+#    Topic hashes are no longer hardcoded per script. The ABI is walked and every signature is
+#    keccak'd once, then the result is cached next to the ABI keyed by the sha256 of its content,
+#    so later startups only hash the file and read the cache. Editing the ABI rebuilds the cache.
+#    Decoders work on the hex strings straight from eth_getLogs: a static word is one int(…, 16)
+#    on a fixed slice, with the slice offsets and converters worked out when the event is loaded.
+#    Events with dynamic (string/bytes/array) data fall back to eth_abi, imported only then.
+#    Consumers look their event up by topic0 instead of keeping their own type lists: the router's
+#    decode_events() (event_router.py) decodes any exchange event through its spec, and the
+#    OrderFilled batch decoder takes its column names and data length from the spec's data_fields.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ABI_FILE = os.path.join(HERE, "contractABI.json")
+CACHE_FORMAT = "event_registry/v1"
+WORD_HEX = 64   # hex chars per 32-byte word
+
+_STATIC_TYPE = re.compile(r"^(u?int\d*|address|bool|bytes\d+)$")
+_CAMEL_BOUNDARY = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+def cache_path_for(abi_path):
+    return os.path.splitext(abi_path)[0] + ".events.json"
+
+
+def snake_case(name):
+    """ABI field name -> column name, e.g. makerAmountFilled -> maker_amount_filled"""
+    return _CAMEL_BOUNDARY.sub("_", name).lower()
+
+
+def _converter(abi_type):
+    """Hex word (64 chars, no 0x) -> Python value for one static ABI type"""
+    if abi_type.startswith("uint"):
+        return lambda word: int(word, 16)
+    if abi_type.startswith("int"):
+        bits = int(abi_type[3:] or 256)
+
+        def signed(word):
+            value = int(word, 16) & ((1 << bits) - 1)
+            return value - (1 << bits) if value >> (bits - 1) else value
+        return signed
+    if abi_type == "address":
+        return lambda word: "0x" + word[-40:]
+    if abi_type == "bool":
+        return lambda word: int(word, 16) != 0
+    # bytesN: left-aligned in the word
+    size = int(abi_type[5:])
+    return lambda word: "0x" + word[:2 * size]
+
+
+class EventSpec:
+    """Layout and decoder of one ABI event"""
+
+    def __init__(self, name, signature, topic0, inputs):
+        self.name = name
+        self.signature = signature
+        self.topic0 = topic0
+        self.inputs = inputs    # [(name, type, indexed)] in ABI order
+        self.indexed = [(n, t) for n, t, indexed in inputs if indexed]
+        self.data_fields = [(n, t) for n, t, indexed in inputs if not indexed]
+        self.static = all(_STATIC_TYPE.match(t) for _, t in self.data_fields)
+        self.data_hex_len = 2 + WORD_HEX * len(self.data_fields) if self.static else None
+
+        # Precompiled: (name, topic position, converter); dynamic indexed values are hashes, kept as hex
+        self._topic_decoders = [
+            (n, i + 1, _converter(t) if _STATIC_TYPE.match(t) else (lambda word: "0x" + word))
+            for i, (n, t) in enumerate(self.indexed)
+        ]
+        # (name, start, stop, converter) into the data hex string, "0x" included
+        self._data_decoders = [
+            (n, 2 + i * WORD_HEX, 2 + (i + 1) * WORD_HEX, _converter(t))
+            for i, (n, t) in enumerate(self.data_fields)
+        ] if self.static else None
+
+    def __repr__(self):
+        return f"EventSpec({self.signature}, {self.topic0[:10]}…)"
+
+    def decode_data(self, data):
+        """Non-indexed fields of a log's data hex string, as {name: value}"""
+        if self._data_decoders is not None:
+            if len(data) != self.data_hex_len:
+                raise ValueError(f"{self.name}: expected {self.data_hex_len} hex chars of data, got {len(data)}")
+            return {n: convert(data[start:stop]) for n, start, stop, convert in self._data_decoders}
+        from eth_abi import decode   # only events with dynamic data need it
+        values = decode([t for _, t in self.data_fields], bytes.fromhex(data[2:]))
+        return dict(zip((n for n, _ in self.data_fields), values))
+
+    def decode(self, log):
+        """Every field of one log, indexed and non-indexed, as {name: value}"""
+        topics = log["topics"]
+        fields = {n: convert(topics[i][2:]) for n, i, convert in self._topic_decoders}
+        fields.update(self.decode_data(log.get("data", "0x")))
+        return fields
+
+    def to_dict(self):
+        return {"name": self.name, "signature": self.signature, "topic0": self.topic0,
+                "inputs": [[n, t, indexed] for n, t, indexed in self.inputs]}
+
+    @classmethod
+    def from_abi(cls, entry):
+        inputs = [(i.get("name", ""), i["type"], bool(i.get("indexed"))) for i in entry.get("inputs", [])]
+        signature = f"{entry['name']}({','.join(t for _, t, _ in inputs)})"
+        return cls(entry["name"], signature, event_topic(signature), inputs)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data["signature"], data["topic0"], [tuple(i) for i in data["inputs"]])
+
+
+class EventRegistry:
+    """topic0 -> EventSpec (and name -> EventSpec) for one ABI"""
+
+    def __init__(self, events, abi_sha256=None):
+        self.abi_sha256 = abi_sha256
+        self.by_topic = {spec.topic0: spec for spec in events}
+        self.by_name = {spec.name: spec for spec in events}
+
+    def __len__(self):
+        return len(self.by_topic)
+
+    def __contains__(self, topic0):
+        return topic0.lower() in self.by_topic
+
+    def get(self, topic0):
+        """EventSpec for a topic0, or None if the ABI has no such event"""
+        return self.by_topic.get(topic0.lower())
+
+    def topic(self, name):
+        return self.by_name[name].topic0
+
+    def name(self, topic0):
+        spec = self.get(topic0)
+        return spec.name if spec is not None else topic0
+
+    def decode(self, log):
+        """Decode a log by its own topic0; None when the event is unknown"""
+        spec = self.by_topic.get(log["topics"][0].lower()) if log.get("topics") else None
+        return spec.decode(log) if spec is not None else None
+
+    def to_dict(self):
+        return {"format": CACHE_FORMAT, "abi_sha256": self.abi_sha256,
+                "events": [spec.to_dict() for spec in self.by_topic.values()]}
+
+    @classmethod
+    def from_abi(cls, abi, abi_sha256=None):
+        return cls([EventSpec.from_abi(entry) for entry in abi if entry.get("type") == "event"], abi_sha256)
+
+
+def load_registry(abi_path=ABI_FILE, cache_path=None):
+    """Registry for an ABI file, from the on-disk cache when the ABI content hash matches"""
+    cache_path = cache_path or cache_path_for(abi_path)
+    with open(abi_path, "rb") as f:
+        raw = f.read()
+    abi_sha256 = hashlib.sha256(raw).hexdigest()
+
+    try:
+        with open(cache_path, "r") as f:
+            cached = json.load(f)
+        if cached.get("format") == CACHE_FORMAT and cached.get("abi_sha256") == abi_sha256:
+            return EventRegistry([EventSpec.from_dict(e) for e in cached["events"]], abi_sha256)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    registry = EventRegistry.from_abi(json.loads(raw), abi_sha256)
+    try:
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(registry.to_dict(), f, indent=2)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass    # read-only checkout: still works, just rebuilds next time
+    return registry
+
+
+_registries = {}
+
+
+def get_registry(abi_path=ABI_FILE):
+    """Process-wide registry per ABI file, loaded on first use"""
+    if abi_path not in _registries:
+        _registries[abi_path] = load_registry(abi_path)
+    return _registries[abi_path]
+
+
+if __name__ == "__main__":
+    import sys
+    registry = load_registry(sys.argv[1] if len(sys.argv) > 1 else ABI_FILE)
+    print(f"📜 {len(registry)} events (ABI sha256 {registry.abi_sha256[:16]}…)")
+    for spec in registry.by_topic.values():
+        layout = f"{len(spec.indexed)} indexed, {len(spec.data_fields)} data" + ("" if spec.static else " (dynamic)")
+        print(f"   {spec.topic0}  {spec.signature}  [{layout}]")
@@ -0,0 +1,87 @@
+from event_registry import get_registry
+from log_fetcher import BLOCK_STEP, WORKERS, fetch_logs
+from log_store import fetch_logs_cached
+
+# Single-pass multi-event fetch for the CTF exchange, demultiplexed by topic0.
+#    Every chunk goes out as one eth_getLogs with an OR-list of topic0s ([[t0, t1, ...]]), so
+#    collecting all exchange events costs the same number of RPC calls as OrderFilled alone.
+#    Logs come back in (block, logIndex) order and are split by topics[0] into per-event lists,
+#    each handed to that event's handler in one call (keeping the batch decoders batched). A
+#    topic0 registered without a handler is just fetched and returned for the caller to process.
+
+# topic0s come from the ABI registry (event_registry.py), not hardcoded hashes
+REGISTRY = get_registry()
+ORDER_FILLED = REGISTRY.topic("OrderFilled")
+ORDERS_MATCHED = REGISTRY.topic("OrdersMatched")
+FEE_CHARGED = REGISTRY.topic("FeeCharged")
+ORDER_CANCELLED = REGISTRY.topic("OrderCancelled")
+TOKEN_REGISTERED = REGISTRY.topic("TokenRegistered")
+
+EXCHANGE_EVENTS = {topic0: REGISTRY.name(topic0) for topic0 in
+                   (ORDER_FILLED, ORDERS_MATCHED, FEE_CHARGED, ORDER_CANCELLED, TOKEN_REGISTERED)}
+
+
+def decode_events(logs):
+    """(log, {field: value}) per log, decoded by the registry spec of its own topic0
+
+    Logs of events the ABI doesn't know, or whose topics/data don't match the spec, are skipped.
+    """
+    decoded = []
+    for log in logs:
+        try:
+            fields = REGISTRY.decode(log)
+        except (ValueError, IndexError):
+            continue
+        if fields is not None:
+            decoded.append((log, fields))
+    return decoded
+
+
+class EventRouter:
+    """Routes each page of logs to per-event handlers by topic0"""
+
+    def __init__(self, handlers=None):
+        self.handlers = {}      # topic0 -> callable(list of logs), or None
+        self.counts = {}        # topic0 -> logs routed
+        self.unknown = 0        # logs whose topic0 has no handler
+        for topic0, handler in (handlers or {}).items():
+            self.register(topic0, handler)
+
+    def register(self, topic0, handler=None):
+        self.handlers[topic0.lower()] = handler
+        self.counts.setdefault(topic0.lower(), 0)
+
+    def topic0s(self):
+        return list(self.handlers)
+
+    def route(self, logs):
+        """Split logs by topic0 (order kept within each event) and call the handlers"""
+        routed = {}
+        for log in logs:
+            topic0 = log["topics"][0].lower() if log["topics"] else None
+            if topic0 in self.handlers:
+                routed.setdefault(topic0, []).append(log)
+            else:
+                self.unknown += 1
+        for topic0, event_logs in routed.items():
+            self.counts[topic0] += len(event_logs)
+            if self.handlers[topic0] is not None:
+                self.handlers[topic0](event_logs)
+        return routed
+
+    def report(self):
+        return ", ".join(f"{REGISTRY.name(t)}: {n}" for t, n in self.counts.items())
+
+
+def fetch_events(router, address, start_block, end_block, client=None, store=None, final_block=None,
+                 block_step=BLOCK_STEP, workers=WORKERS, stats=None):
+    """Fetch every event the router handles in one pass; yields (chunk, {topic0: logs})"""
+    if store is not None:
+        chunks = fetch_logs_cached(store, address, router.topic0s(), start_block, end_block, client=client,
+                                   final_block=final_block, block_step=block_step, workers=workers, stats=stats)
+    else:
+        chunks = fetch_logs(address, [router.topic0s()], start_block, end_block, client=client,
+                            block_step=block_step, workers=workers)
+    for chunk in chunks:
+        yield chunk, router.route(chunk.logs)
+
@@ -0,0 +1,497 @@
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+from event_registry import get_registry
+
+# Local stand-in for a Polygon JSON-RPC endpoint, for offline runs, benchmarks and regression checks.
+#    Serves eth_blockNumber, eth_getBlockByNumber, eth_getLogs and eth_chainId, single or batched,
+#    from a deterministic synthetic chain: block times vary around ~2 s and every block carries a
+#    Poisson-distributed number of OrderFilled logs from the CTF exchange. Provider behaviour can
+#    be injected: latency, HTTP 429s (with Retry-After) or JSON -32005 rate limits, an eth_getLogs
+#    block range limit and a result cap, both answered with the error messages real nodes send.
+#    GET requests answer the Etherscan-style block lookup (module=block&action=getblocknobytime)
+#    from the same chain, so the Etherscan path in 2_get_blocks_24h.py can be exercised too.
+#
+#    Fixtures in the script folder calibrate the chain to recorded data:
+#      current_polygon_block.json                   pins the head block and its timestamp
+#      polymarket_24h_<date>_summary_tradefills_log.json
+#                                                   pins start_block to <date> 00:00 UTC and
+#                                                   end_block + 1 to the next midnight; inside that
+#                                                   window only recorded logs are served, so a run
+#                                                   over the day reproduces the recorded total_fill
+#      polymarket_24h_<date>_tradefills_log.json / .ndjson
+#                                                   recorded raw logs, served at their blocks
+#
+#    Usage: python3 fake_polygon_rpc.py [--port 8545] [--fixtures .] [--latency 0.05] [--max-range 2000]
+#    then point the scripts at it with POLYGON_RPC_URLS=http://127.0.0.1:8545 (see rpc_pool.py).
+
+CONTRACT_ADDRESS = "0x4bfb41d5b3570defd03c39a9a4d8de6bd8b8982e"
+FILL_ORDER_TOPIC = get_registry().topic("OrderFilled")
+CHAIN_ID = 137
+HEAD_BLOCK = 74077752
+HEAD_TIMESTAMP = 1752774434
+CHAIN_LENGTH = 200000         # blocks generated below the head when nothing pins an earlier block
+FIXTURE_MARGIN = 50000        # blocks generated below the earliest pinned block
+FILLS_PER_BLOCK = 2.0         # mean OrderFilled logs per block
+BLOCK_TIMES = (1, 2, 2, 2, 2, 3)   # seconds, drawn per block
+TRADERS = 5000
+TOKENS = 2000
+HEAD_FILE = "current_polygon_block.json"
+SUMMARY_GLOB = "polymarket_24h_*_summary_tradefills_log.json"
+LOG_GLOBS = ("polymarket_24h_*_tradefills_log.json", "polymarket_24h_*_tradefills_log.ndjson")
+
+
+def _hash(*parts):
+    return "0x" + hashlib.sha256(":".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def _word(value):
+    return f"{value:064x}"
+
+
+def _address_topic(value):
+    return "0x" + "00" * 12 + f"{value:040x}"
+
+
+class FakeChain:
+    """Deterministic synthetic chain: block timestamps, hashes and OrderFilled logs"""
+
+    def __init__(self, head_block=HEAD_BLOCK, head_timestamp=HEAD_TIMESTAMP, first_block=None, seed=1,
+                 fills_per_block=FILLS_PER_BLOCK):
+        self.head_block = head_block
+        self.seed = seed
+        self.fills_per_block = fills_per_block
+        self.pins = {head_block: head_timestamp}
+        self.first_block = first_block if first_block is not None else head_block - CHAIN_LENGTH
+        self.recorded = {}              # block -> recorded logs served instead of synthetic ones
+        self.replay_windows = []        # (start_block, end_block): only recorded logs in here
+        self.forks = []                 # (from_block, salt): hashes and logs change from from_block
+        self.timestamps = None
+
+    # === Calibration ===
+    def pin(self, block_number, timestamp):
+        """Force a block's timestamp; blocks between pins are spread to fit"""
+        self.pins[block_number] = timestamp
+        self.first_block = min(self.first_block, block_number - FIXTURE_MARGIN)
+        self.timestamps = None
+
+    def add_recorded_logs(self, logs):
+        for log in logs:
+            self.recorded.setdefault(int(log["blockNumber"], 16), []).append(log)
+
+    def add_replay_window(self, start_block, end_block):
+        self.replay_windows.append((start_block, end_block))
+
+    def load_fixtures(self, directory="."):
+        """Calibrate to the recorded files in `directory` (see the module comment)"""
+        head_path = os.path.join(directory, HEAD_FILE)
+        if os.path.exists(head_path):
+            with open(head_path, "r") as f:
+                head = json.load(f)
+            del self.pins[self.head_block]
+            self.head_block = head["current_polygon_block"]
+            self.pin(self.head_block, head["unix_timestamp"])
+        for path in sorted(glob.glob(os.path.join(directory, SUMMARY_GLOB))):
+            date = re.search(r"polymarket_24h_(\d{4}-\d{2}-\d{2})_", os.path.basename(path)).group(1)
+            with open(path, "r") as f:
+                summary = json.load(f)
+            day = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            self.pin(summary["start_block"], int(day.timestamp()))
+            self.pin(summary["end_block"] + 1, int((day + timedelta(days=1)).timestamp()))
+            self.add_replay_window(summary["start_block"], summary["end_block"])
+        for pattern in LOG_GLOBS:
+            for path in sorted(glob.glob(os.path.join(directory, pattern))):
+                with open(path, "r") as f:
+                    if path.endswith(".ndjson"):
+                        logs = [json.loads(line) for line in f if line.strip()]
+                    else:
+                        data = json.load(f)
+                        logs = data if isinstance(data, list) else [data]
+                # Decoded NDJSON records have no raw log fields; only raw logs can be replayed
+                self.add_recorded_logs(log for log in logs if "topics" in log and "data" in log)
+        return self
+
+    def _build(self):
+        """Block timestamps from first_block to head_block, honouring every pin"""
+        rng = random.Random(self.seed)
+        n_blocks = self.head_block - self.first_block + 1
+        steps = [rng.choice(BLOCK_TIMES) for _ in range(n_blocks)]
+        pins = sorted((b, ts) for b, ts in self.pins.items() if self.first_block <= b <= self.head_block)
+        timestamps = array("q", [0]) * n_blocks
+        # Below the first pin: walk backwards with the raw block times
+        first_pin_block, first_pin_ts = pins[0]
+        ts = first_pin_ts
+        for b in range(first_pin_block, self.first_block - 1, -1):
+            timestamps[b - self.first_block] = ts
+            ts -= steps[b - self.first_block]
+        # Between pins: raw block times scaled so both ends land exactly
+        for (lo, lo_ts), (hi, hi_ts) in zip(pins, pins[1:]):
+            raw = steps[lo - self.first_block + 1:hi - self.first_block + 1]
+            scale = (hi_ts - lo_ts) / sum(raw)
+            elapsed = 0
+            for i, step in enumerate(raw[:-1]):
+                elapsed += step
+                # Keep at least one second per block when there is room for it
+                ts = lo_ts + max(i + 1, min(round(elapsed * scale), hi_ts - lo_ts - (len(raw) - i - 1)))
+                timestamps[lo + i + 1 - self.first_block] = ts
+            timestamps[hi - self.first_block] = hi_ts
+        # Above the last pin (when the head itself isn't pinned)
+        last_pin_block, ts = pins[-1]
+        for b in range(last_pin_block + 1, self.head_block + 1):
+            ts += steps[b - self.first_block]
+            timestamps[b - self.first_block] = ts
+        self.timestamps = timestamps
+
+    # === Chain data ===
+    def timestamp(self, block_number):
+        if self.timestamps is None:
+            self._build()
+        if block_number < self.first_block:
+            # History below the generated span (down to genesis) is extrapolated at 2 s per block, without logs
+            return self.timestamps[0] - 2 * (self.first_block - block_number)
+        return self.timestamps[block_number - self.first_block]
+
+    def exists(self, block_number):
+        return 0 <= block_number <= self.head_block
+
+    def _salt(self, block_number):
+        salt = 0
+        for from_block, fork_salt in self.forks:
+            if block_number >= from_block:
+                salt = fork_salt
+        return salt
+
+    def block_hash(self, block_number):
+        return _hash("block", self.seed, self._salt(block_number), block_number)
+
+    def block(self, block_number):
+        return {
+            "number": hex(block_number),
+            "hash": self.block_hash(block_number),
+            "parentHash": self.block_hash(block_number - 1),
+            "timestamp": hex(self.timestamp(block_number)),
+            "miner": "0x0000000000000000000000000000000000000000",
+            "gasLimit": hex(30000000),
+            "transactions": [],
+        }
+
+    def reorg(self, from_block, salt=None):
+        """Replace every block from from_block up with a different fork (new hashes and fills)"""
+        self.forks.append((from_block, salt if salt is not None else len(self.forks) + 1))
+
+    def advance(self, blocks=1):
+        """Mine `blocks` new blocks on top of the head"""
+        if self.timestamps is None:
+            self._build()
+        rng = random.Random(f"{self.seed}:mined:{self.head_block}")
+        for _ in range(blocks):
+            self.head_block += 1
+            self.timestamps.append(self.timestamps[-1] + rng.choice(BLOCK_TIMES))
+
+    def _in_replay_window(self, block_number):
+        return any(start <= block_number <= end for start, end in self.replay_windows)
+
+    def logs(self, block_number):
+        """OrderFilled logs of one block"""
+        if block_number < self.first_block:
+            return []
+        if block_number in self.recorded:
+            return self.recorded[block_number]
+        if self._in_replay_window(block_number):
+            return []
+        salt = self._salt(block_number)
+        rng = random.Random(f"{self.seed}:{salt}:{block_number}")
+        # Poisson draw (Knuth) for the number of fills in this block
+        count, limit, p = 0, math.exp(-self.fills_per_block), rng.random()
+        while p > limit:
+            count += 1
+            p *= rng.random()
+        block_hash = self.block_hash(block_number)
+        logs = []
+        for i in range(count):
+            token = int(_hash("token", rng.randrange(TOKENS))[2:], 16)
+            shares = rng.randrange(1, 2000) * 10 ** 6
+            price = rng.randrange(1, 100)                      # cents
+            usdc = shares * price // 100
+            fee = rng.choice((0, 0, 0, usdc // 1000))
+            if rng.random() < 0.5:
+                words = (0, token, usdc, shares, fee)          # maker buys the token
+            else:
+                words = (token, 0, shares, usdc, fee)          # maker sells it
+            tx_hash = _hash("tx", self.seed, salt, block_number, i)
+            logs.append({
+                "address": CONTRACT_ADDRESS,
+                "topics": [
+                    FILL_ORDER_TOPIC,
+                    _hash("order", self.seed, salt, block_number, i),
+                    _address_topic(rng.randrange(1, TRADERS + 1)),
+                    _address_topic(rng.randrange(1, TRADERS + 1)),
+                ],
+                "data": "0x" + "".join(_word(w) for w in words),
+                "blockNumber": hex(block_number),
+                "transactionHash": tx_hash,
+                "transactionIndex": hex(i),
+                "blockHash": block_hash,
+                "logIndex": hex(i),
+                "removed": False,
+            })
+        return logs
+
+
+class FakePolygonRpc:
+    """Threaded HTTP JSON-RPC server over a FakeChain, with injectable provider behaviour"""
+
+    def __init__(self, chain=None, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, max_block_range=None,
+                 max_results=None, rate_limit=0.0, rate_limit_style="http", retry_after=None, seed=1):
+        self.chain = chain or FakeChain()
+        self.latency = latency              # seconds added to every POST
+        self.jitter = jitter                # plus up to this many seconds at random
+        self.max_block_range = max_block_range
+        self.max_results = max_results
+        self.rate_limit = rate_limit        # probability that a POST gets rate limited
+        self.rate_limit_style = rate_limit_style   # "http" (429) or "json" (-32005 error objects)
+        self.retry_after = retry_after
+        self.posts = 0
+        self.calls = 0
+        self.rate_limited = 0
+        self.gets = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    # === JSON-RPC ===
+    def _block_param(self, value):
+        if value in ("latest", "safe", "finalized", "pending"):
+            return self.chain.head_block
+        if value == "earliest":
+            return 0
+        return int(value, 16)
+
+    def _get_logs(self, params):
+        query = params[0] if params else {}
+        from_block = self._block_param(query.get("fromBlock", "latest"))
+        to_block = self._block_param(query.get("toBlock", "latest"))
+        if from_block > to_block:
+            return []
+        if self.max_block_range and to_block - from_block + 1 > self.max_block_range:
+            raise _JsonRpcError(-32005, f"block range is too wide, max {self.max_block_range} blocks")
+        address = query.get("address")
+        addresses = {a.lower() for a in ([address] if isinstance(address, str) else address or [])}
+        topics = query.get("topics") or []
+        topic0 = topics[0] if topics else None
+        topic0s = None if topic0 is None else {t.lower() for t in ([topic0] if isinstance(topic0, str) else topic0)}
+
+        results = []
+        for n in range(max(from_block, self.chain.first_block, 0), min(to_block, self.chain.head_block) + 1):
+            for log in self.chain.logs(n):
+                if addresses and log["address"].lower() not in addresses:
+                    continue
+                if topic0s is not None and log["topics"][0].lower() not in topic0s:
+                    continue
+                results.append(log)
+            if self.max_results and len(results) > self.max_results:
+                raise _JsonRpcError(-32005, f"query returned more than {self.max_results} results")
+        return results
+
+    def _dispatch(self, request):
+        method = request.get("method")
+        params = request.get("params") or []
+        if method == "eth_blockNumber":
+            return hex(self.chain.head_block)
+        if method == "eth_chainId":
+            return hex(CHAIN_ID)
+        if method == "eth_getBlockByNumber":
+            block_number = self._block_param(params[0])
+            return self.chain.block(block_number) if self.chain.exists(block_number) else None
+        if method == "eth_getLogs":
+            return self._get_logs(params)
+        raise _JsonRpcError(-32601, f"the method {method} does not exist/is not available")
+
+    def _answer(self, request):
+        reply = {"jsonrpc": "2.0", "id": request.get("id")}
+        try:
+            reply["result"] = self._dispatch(request)
+        except _JsonRpcError as e:
+            reply["error"] = {"code": e.code, "message": e.message}
+        return reply
+
+    def handle(self, body):
+        """(status, headers, reply body) for one POST"""
+        with self._lock:
+            self.posts += 1
+            self.calls += len(body) if isinstance(body, list) else 1
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+            limited = self.rate_limit and self._rng.random() < self.rate_limit
+            if limited:
+                self.rate_limited += 1
+        if delay:
+            time.sleep(delay)
+        headers = {}
+        if limited and self.retry_after is not None:
+            headers["Retry-After"] = str(self.retry_after)
+        if limited and self.rate_limit_style == "http":
+            return 429, headers, {"jsonrpc": "2.0", "error": {"code": 429, "message": "Too Many Requests"}}
+        if limited:
+            error = {"code": -32005, "message": "rate limit exceeded"}
+            if isinstance(body, list):
+                return 200, headers, [{"jsonrpc": "2.0", "id": r.get("id"), "error": error} for r in body]
+            return 200, headers, {"jsonrpc": "2.0", "id": body.get("id"), "error": error}
+        if isinstance(body, list):
+            return 200, headers, [self._answer(request) for request in body]
+        return 200, headers, self._answer(body)
+
+    def block_by_time(self, timestamp, closest="before"):
+        """Etherscan getblocknobytime: last block at or before / first block at or after timestamp"""
+        lo, hi = 0, self.chain.head_block
+        if closest == "after":
+            # First block with timestamp >= target
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self.chain.timestamp(mid) < timestamp:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return lo if self.chain.timestamp(lo) >= timestamp else None
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.chain.timestamp(mid) <= timestamp:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo if self.chain.timestamp(lo) <= timestamp else None
+
+    def handle_get(self, query):
+        """Etherscan-style JSON answer for a GET query string dict"""
+        with self._lock:
+            self.gets += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if query.get("module") != "block" or query.get("action") != "getblocknobytime":
+            return {"status": "0", "message": "NOTOK", "result": "Error! Unsupported action"}
+        try:
+            block_number = self.block_by_time(int(query["timestamp"]), query.get("closest", "before"))
+        except (KeyError, ValueError):
+            return {"status": "0", "message": "NOTOK", "result": "Error! Invalid timestamp"}
+        if block_number is None:
+            return {"status": "0", "message": "NOTOK", "result": "Error! No closest block found"}
+        return {"status": "1", "message": "OK", "result": str(block_number)}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; without TCP_NODELAY every keep-alive
+            #    reply waits out the client's delayed ACK (~40 ms)
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                try:
+                    status, headers, reply = server.handle(json.loads(raw))
+                except ValueError:
+                    status, headers, reply = 200, {}, {"jsonrpc": "2.0", "id": None,
+                                                       "error": {"code": -32700, "message": "parse error"}}
+                self._send(status, headers, reply, len(raw))
+
+            def do_GET(self):
+                query = dict(parse_qsl(urlparse(self.path).query))
+                self._send(200, {}, server.handle_get(query), len(self.path))
+
+            def _send(self, status, headers, reply, bytes_in):
+                data = json.dumps(reply).encode()
+                with server._lock:
+                    server.bytes_in += bytes_in
+                    server.bytes_out += len(data)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+class _JsonRpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local fake Polygon JSON-RPC server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--fixtures", default=".", help="folder with recorded polymarket_24h_* files ('' for none)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--fills-per-block", type=float, default=FILLS_PER_BLOCK)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every POST")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--max-range", type=int, default=None, help="eth_getLogs block range limit")
+    parser.add_argument("--max-results", type=int, default=None, help="eth_getLogs result cap")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="fraction of POSTs rate limited")
+    parser.add_argument("--rate-limit-style", choices=("http", "json"), default="http")
+    parser.add_argument("--retry-after", type=int, default=None)
+    parser.add_argument("--mine", type=float, default=0.0, help="mine a block every N seconds (0: static head)")
+    args = parser.parse_args()
+
+    chain = FakeChain(seed=args.seed, fills_per_block=args.fills_per_block)
+    if args.fixtures:
+        chain.load_fixtures(args.fixtures)
+    rpc = FakePolygonRpc(chain, args.host, args.port, args.latency, args.jitter, args.max_range,
+                         args.max_results, args.rate_limit, args.rate_limit_style, args.retry_after, args.seed)
+    rpc.start()
+    print(f"🚀 Fake Polygon RPC on {rpc.url}: blocks {chain.first_block} → {chain.head_block}")
+    print(f"   export POLYGON_RPC_URLS={rpc.url}")
+    try:
+        while True:
+            time.sleep(args.mine or 3600)
+            if args.mine:
+                chain.advance()
+    except KeyboardInterrupt:
+        print(f"\n📊 {rpc.posts} POSTs, {rpc.calls} calls, {rpc.rate_limited} rate limited, {rpc.bytes_out} bytes")
+        rpc.stop()
@@ -0,0 +1,153 @@
+from array import array
+
+from eth_hex import to_checksum_address
+from fill_decoder import FILL_FIELDS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Compact columnar store for decoded OrderFilled rows.
+#    Instead of one dict per fill (ten keys, Python ints, hex strings and two checksum strings,
+#    ~860 bytes each in bench_fill_store.py), every field is a column: array('Q') for amounts,
+#    array('I') for blocks and the maker/taker and asset ids, and the order/tx hashes packed 32
+#    bytes per row into one bytearray (~108 bytes per fill in all, 64 of them the two hashes).
+#    Addresses and token ids are dictionary-encoded through intern tables shared by every batch
+#    of a run: the same market makers and tokens come back thousands of times, so
+#    each distinct value is stored once, and the checksum (a keccak per call) is computed once
+#    per address and memoized. Lookups take the LogPage memoryviews from FillBatch directly
+#    (log_buffer.py), so no per-fill address string is built at all.
+#    Amounts are uint64 columns; a value that does not fit (never seen for USDC amounts or
+#    fees) switches that column to a list of Python ints, so totals stay exact.
+
+HASH_SIZE = 32
+
+
+class InternTable:
+    """value <-> small int id, each distinct value stored once"""
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def intern(self, value):
+        """id for value, adding it on first sight (memoryview keys are copied to bytes then)"""
+        id_ = self.ids.get(value)
+        if id_ is None:
+            if isinstance(value, memoryview):
+                value = bytes(value)
+            id_ = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return id_
+
+    def intern_all(self, values):
+        ids = self.ids
+        out = array("I")
+        for value in values:
+            id_ = ids.get(value)
+            out.append(id_ if id_ is not None else self.intern(value))
+        return out
+
+
+class AddressTable(InternTable):
+    """Interned 20-byte addresses with memoized EIP-55 formatting"""
+
+    def __init__(self):
+        super().__init__()
+        self._checksums = []
+
+    def checksum(self, id_):
+        checksums = self._checksums
+        if id_ >= len(checksums):
+            checksums.extend([None] * (len(self.values) - len(checksums)))
+        formatted = checksums[id_]
+        if formatted is None:
+            formatted = checksums[id_] = to_checksum_address(self.values[id_].hex())
+        return formatted
+
+
+def _extend(column, values):
+    """Append to a uint64 column; returns the column, switched to a list if a value is wider"""
+    if isinstance(column, array):
+        if np is not None and isinstance(values, np.ndarray):
+            column.frombytes(values.astype(np.uint64).tobytes())
+            return column
+        try:
+            # Built whole before appending: a failed extend() would leave a partial batch behind
+            column.extend(array("Q", values))
+            return column
+        except OverflowError:
+            column = column.tolist()
+    column.extend(values.tolist() if np is not None and isinstance(values, np.ndarray) else values)
+    return column
+
+
+class FillStore:
+    """Struct-of-arrays OrderFilled rows with interned addresses and token ids"""
+
+    def __init__(self, addresses=None, tokens=None):
+        self.addresses = addresses if addresses is not None else AddressTable()
+        self.tokens = tokens if tokens is not None else InternTable()
+        self.block = array("I")      # block numbers fit 32 bits
+        self.maker = array("I")
+        self.taker = array("I")
+        self.maker_asset = array("I")
+        self.taker_asset = array("I")
+        self.amounts = {field: array("Q") for field in FILL_FIELDS[2:]}
+        self.order_hashes = bytearray()
+        self.tx_hashes = bytearray()
+
+    def __len__(self):
+        return len(self.block)
+
+    def add_batch(self, batch):
+        """Append every row of a FillBatch; returns the index of its first row"""
+        first = len(self)
+        if not len(batch):
+            return first
+        self.maker.extend(self.addresses.intern_all(batch.makers()))
+        self.taker.extend(self.addresses.intern_all(batch.takers()))
+        for ids, field in ((self.maker_asset, "maker_asset_id"), (self.taker_asset, "taker_asset_id")):
+            column = batch.columns[field]
+            ids.extend(self.tokens.intern_all(column.tolist() if np is not None and isinstance(column, np.ndarray)
+                                              else column))
+        for field in FILL_FIELDS[2:]:
+            self.amounts[field] = _extend(self.amounts[field], batch.columns[field])
+        self.block.extend([int(log["blockNumber"], 16) for log in batch.logs])
+        self.order_hashes += bytes.fromhex("".join([log["topics"][1][2:] for log in batch.logs]))
+        self.tx_hashes += bytes.fromhex("".join([log["transactionHash"][2:] for log in batch.logs]))
+        return first
+
+    def total(self, field):
+        return sum(self.amounts[field])
+
+    def nbytes(self):
+        """Approximate bytes held by the columns (intern tables not included)"""
+        columns = [self.block, self.maker, self.taker, self.maker_asset, self.taker_asset]
+        size = sum(c.itemsize * len(c) for c in columns)
+        size += sum(c.itemsize * len(c) if isinstance(c, array) else 8 * len(c) for c in self.amounts.values())
+        return size + len(self.order_hashes) + len(self.tx_hashes)
+
+    def rows(self, start=0, stop=None):
+        """Fill records in the NDJSON layout of the trades script, rows [start, stop)"""
+        checksum = self.addresses.checksum
+        tokens = self.tokens.values
+        maker_amount, taker_amount, fee = (self.amounts[field] for field in FILL_FIELDS[2:])
+        for i in range(start, len(self) if stop is None else stop):
+            h = i * HASH_SIZE
+            yield {
+                "orderhash": "0x" + self.order_hashes[h:h + HASH_SIZE].hex(),
+                "maker": checksum(self.maker[i]),
+                "taker": checksum(self.taker[i]),
+                "makerAssetId": tokens[self.maker_asset[i]],
+                "takerAssetId": tokens[self.taker_asset[i]],
+                "makerAmountFilled": maker_amount[i],
+                "takerAmountFilled": taker_amount[i],
+                "fee": fee[i],
+                "txHash": "0x" + self.tx_hashes[h:h + HASH_SIZE].hex(),
+                "blockNumber": self.block[i]
+            }
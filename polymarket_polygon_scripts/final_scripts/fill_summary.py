@@ -0,0 +1,62 @@
+import json
+
+from event_router import FEE_CHARGED, ORDER_FILLED, REGISTRY, decode_events
+
+# Per-window summary saved as <prefix>_summary_tradefills_log.json.
+#    Same schema from every script that writes it (2_get_24_hr_ctf-open_trades.py, backfill.py,
+#    pipeline.py), so a reader of the file doesn't depend on which one ran last:
+#      start_block, end_block   the window's block range, inclusive
+#      partial                  window still open, end clamped to the confirmed head
+#      fills                    OrderFilled logs decoded
+#      total_fill               sum of OrderFilled takerAmountFilled
+#      total_fee                sum of the OrderFilled fee field
+#      total_fee_charged        sum of FeeCharged amounts (the separate event the exchange emits)
+#      events                   logs fetched per event name
+#    A total whose event was not fetched in that run is null, not 0.
+
+
+class FillSummary:
+    """Totals of one window, for the topics that were fetched"""
+
+    def __init__(self, start_block, end_block, topics=(ORDER_FILLED, FEE_CHARGED), partial=False):
+        topics = [t.lower() for t in topics]
+        self.start_block = start_block
+        self.end_block = end_block
+        self.partial = partial
+        has_fills = ORDER_FILLED in topics
+        self.fills = 0 if has_fills else None
+        self.total_fill = 0 if has_fills else None
+        self.total_fee = 0 if has_fills else None
+        self.total_fee_charged = 0 if FEE_CHARGED in topics else None
+        self.events = {REGISTRY.name(t): 0 for t in topics}
+
+    def add_fills(self, batch, start=0, stop=None):
+        """Add rows [start, stop) of a decoded FillBatch"""
+        stop = len(batch) if stop is None else stop
+        self.fills += stop - start
+        self.total_fill += batch.total("taker_amount_filled", start, stop)
+        self.total_fee += batch.total("fee", start, stop)
+
+    def add_fee_charged(self, logs):
+        self.total_fee_charged += sum(fields["amount"] for _, fields in decode_events(logs))
+
+    def count(self, topic0, n):
+        name = REGISTRY.name(topic0)
+        self.events[name] = self.events.get(name, 0) + n
+
+    def to_dict(self):
+        return {
+            "start_block": self.start_block,
+            "end_block": self.end_block,
+            "partial": self.partial,
+            "fills": self.fills,
+            "total_fill": self.total_fill,
+            "total_fee": self.total_fee,
+            "total_fee_charged": self.total_fee_charged,
+            "events": self.events,
+        }
+
+
+def save_summary(summary, path):
+    with open(path, "w") as f:
+        json.dump(summary.to_dict(), f, indent=2)
@@ -0,0 +1,62 @@
+import json
+import os
+
+# Streaming NDJSON writer for decoded fills.
+#    Each record is appended as one JSON line to "<path>.part" through a large write buffer, so
+#    memory stays flat however many fills a window has. finalize() flushes, fsyncs and renames the
+#    file into place atomically: readers only ever see a complete file or none at all.
+
+WRITE_BUFFER = 1 << 20   # bytes
+
+
+class NdjsonWriter:
+    """Append-only NDJSON file with an atomic finalize/rename"""
+
+    def __init__(self, path, buffer_size=WRITE_BUFFER):
+        self.path = path
+        self.tmp_path = path + ".part"
+        self.count = 0
+        self._f = open(self.tmp_path, "w", buffering=buffer_size)
+
+    def write(self, record):
+        self._f.write(json.dumps(record, separators=(",", ":")))
+        self._f.write("\n")
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def finalize(self):
+        """Flush everything to disk and move the file into place"""
+        if self._f.closed:
+            return
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """Drop the partial file, leaving any previous complete file untouched"""
+        if not self._f.closed:
+            self._f.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.abort()
+        return False
+
+
+def read_ndjson(path):
+    """Stream records back from an NDJSON file"""
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,224 @@
+import argparse
+import time
+from datetime import datetime, timezone
+
+from event_router import ORDER_FILLED
+from fill_decoder import decode_fills
+from log_fetcher import fetch_logs
+from rolling_window import CHECKPOINT_FILE, load_checkpoint, save_checkpoint
+from rpc_client import POLYGON_RPC, get_client
+
+# Live tail mode: follow the chain head instead of re-running a whole 24h scan.
+#    Polls eth_blockNumber (batched with the head block for its timestamp), fetches only the new
+#    blocks' OrderFilled logs once they are `confirmations` deep, decodes them in one batch and
+#    keeps running aggregates. Lag is a few seconds plus confirmations * ~2 s.
+#    Reorgs: the hash of every ingested block that had fills, and of each poll's last block, is
+#    kept for the last REORG_DEPTH blocks, next to that block's fill totals. Each poll checks the
+#    first new block's parentHash against the recorded tip; on a mismatch it finds the newest
+#    recorded block that is still canonical (one batched header fetch), subtracts the fills of
+#    every block above it from the aggregates and refetches only that span. Logs flagged
+#    "removed" are dropped.
+#    With --rolling, fills also feed a trailing-24h RollingAggregator that is checkpointed after
+#    every poll, and a restart resumes from the checkpoint's last block (or from --from-block, if
+#    that is later).
+#    A node (or one endpoint of an rpc_pool) can report a head whose headers it doesn't serve yet:
+#    a poll missing a header or timestamp it needs changes nothing and counts as "no new blocks",
+#    so the same range is retried on the next poll.
+#    Usage: python3 follow_head.py [--confirmations 5] [--poll 2] [--from-block N] [--rolling]
+
+CONTRACT_ADDRESS = "0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E"
+FILL_ORDER_TOPIC = ORDER_FILLED
+CONFIRMATIONS = 5
+POLL_INTERVAL = 2.0       # seconds
+MAX_CATCH_UP = 2000       # blocks fetched per poll when far behind the head
+REORG_DEPTH = 256         # blocks of hashes and per-block totals kept for rollback
+
+
+class HeadFollower:
+    """Incrementally fetches and decodes OrderFilled logs up to head - confirmations"""
+
+    def __init__(self, address=CONTRACT_ADDRESS, topic0=FILL_ORDER_TOPIC, client=None,
+                 confirmations=CONFIRMATIONS, start_block=None, rolling=None):
+        self.address = address
+        self.topic0 = topic0
+        self.client = client or get_client()
+        self.confirmations = confirmations
+        self.last_block = None if start_block is None else start_block - 1
+        self.head_block = None
+        self.head_timestamp = None
+        self.block_hashes = {}      # block -> hash, for recent ingested blocks
+        self.block_totals = {}      # block -> [fills, volume, fee, timestamp]
+        self.reorgs = 0
+        self.rolled_back_blocks = 0
+        self.rolling = rolling
+        # The checkpoint already holds every fill up to its last block, so never start below it
+        #    (a --from-block before it would add those fills to the restored aggregate again)
+        if rolling is not None and rolling.last_block is not None:
+            if self.last_block is None or self.last_block < rolling.last_block:
+                self.last_block = rolling.last_block
+
+        # Running aggregates
+        self.fills = 0
+        self.total_fill = 0
+        self.total_fee = 0
+
+    def poll(self):
+        """Process every newly confirmed block; returns (from_block, to_block, batches) or None"""
+        self.head_block, self.head_timestamp = self.client.head()
+        safe_block = self.head_block - self.confirmations
+        if self.last_block is None:
+            self.last_block = safe_block - 1
+        if safe_block <= self.last_block:
+            return None
+
+        from_block = self.last_block + 1
+        to_block = min(safe_block, from_block + MAX_CATCH_UP - 1)
+        headers = self.client.get_blocks([from_block, to_block])
+        if from_block not in headers or to_block not in headers:
+            return None
+        tip_hash = self.block_hashes.get(self.last_block)
+        if tip_hash is not None and headers[from_block]["parentHash"] != tip_hash:
+            self._rollback(self._find_fork())
+            from_block = self.last_block + 1
+
+        batches = [decode_fills([log for log in chunk.logs if not log.get("removed")])
+                   for chunk in fetch_logs(self.address, [self.topic0], from_block, to_block, client=self.client)]
+        # Timestamps first, so a poll that can't get them leaves the aggregates untouched
+        timestamps = self._missing_timestamps(batches)
+        if timestamps is None:
+            return None
+        for batch in batches:
+            self._add_blocks(batch, timestamps)
+        self.block_hashes[to_block] = headers[to_block]["hash"]
+        self.last_block = to_block
+        self._prune()
+        if self.rolling is not None:
+            self.rolling.last_block = to_block
+            self.rolling.advance(self.head_timestamp)
+        return from_block, to_block, batches
+
+    def _missing_timestamps(self, batches):
+        """{block: timestamp} for fill blocks whose logs don't carry one; None if the node has no header yet"""
+        if self.rolling is None:
+            return {}
+        # Fills of a block share its timestamp; nodes that don't put it on the log cost one batched POST
+        missing = {int(log["blockNumber"], 16) for batch in batches for log in batch.logs
+                   if log.get("blockTimestamp") is None}
+        timestamps = self.client.get_block_timestamps(sorted(missing)) if missing else {}
+        return timestamps if missing.issubset(timestamps) else None
+
+    def _add_blocks(self, batch, timestamps):
+        # Per-block sums: one aggregate update per block, and what a rollback has to subtract
+        per_block = {}
+        for log, _, _, _, taker_amount, fee in batch.rows():
+            block = int(log["blockNumber"], 16)
+            sums = per_block.get(block)
+            if sums is None:
+                sums = per_block[block] = [0, 0, 0, log.get("blockTimestamp")]
+                self.block_hashes[block] = log["blockHash"]
+            sums[0] += 1
+            sums[1] += taker_amount
+            sums[2] += fee
+        for n in sorted(per_block):
+            sums = per_block[n]
+            if self.rolling is not None:
+                sums[3] = timestamps[n] if sums[3] is None else int(sums[3], 16)
+                self.rolling.add(sums[3], sums[1], sums[2], sums[0])
+            self.fills += sums[0]
+            self.total_fill += sums[1]
+            self.total_fee += sums[2]
+            self.block_totals[n] = sums
+
+    def _find_fork(self):
+        """Newest recorded block whose hash is still on the canonical chain"""
+        recorded = sorted(self.block_hashes, reverse=True)
+        headers = self.client.get_blocks(recorded)
+        for block in recorded:
+            if block in headers and headers[block]["hash"] == self.block_hashes[block]:
+                return block
+        # Deeper than anything recorded: roll back all of it
+        print(f"⚠️ Reorg deeper than {REORG_DEPTH} blocks, rolling back everything still tracked")
+        return recorded[-1] - 1
+
+    def _rollback(self, fork_block):
+        """Undo every ingested block above fork_block so it gets refetched"""
+        for block in [b for b in self.block_totals if b > fork_block]:
+            fills, volume, fee, timestamp = self.block_totals.pop(block)
+            self.fills -= fills
+            self.total_fill -= volume
+            self.total_fee -= fee
+            if self.rolling is not None:
+                self.rolling.remove(timestamp, volume, fee, fills)
+        for block in [b for b in self.block_hashes if b > fork_block]:
+            del self.block_hashes[block]
+        self.reorgs += 1
+        self.rolled_back_blocks += self.last_block - fork_block
+        print(f"🔀 Reorg: rolled back blocks {fork_block + 1} → {self.last_block}, refetching")
+        self.last_block = fork_block
+        if self.rolling is not None:
+            self.rolling.last_block = fork_block
+
+    def _prune(self):
+        oldest = self.last_block - REORG_DEPTH
+        for table in (self.block_hashes, self.block_totals):
+            for block in [b for b in table if b < oldest]:
+                del table[block]
+
+    def lag(self):
+        """Seconds between now and the head block's timestamp"""
+        if self.head_timestamp is None:
+            return None
+        return time.time() - self.head_timestamp
+
+    def run(self, on_poll=None, poll_interval=POLL_INTERVAL, should_stop=None):
+        """Poll forever (or until should_stop() is true), calling on_poll(result) for each new range"""
+        while should_stop is None or not should_stop():
+            started = time.monotonic()
+            result = self.poll()
+            if result is not None and on_poll is not None:
+                on_poll(result)
+            # Catching up: go again straight away, otherwise wait for the next block
+            if result is None or result[1] >= self.head_block - self.confirmations:
+                time.sleep(max(0.0, poll_interval - (time.monotonic() - started)))
+
+
+def print_poll(follower, result):
+    from_block, to_block, batches = result
+    new_fills = sum(len(batch) for batch in batches)
+    new_volume = sum(batch.total("taker_amount_filled") for batch in batches)
+    now = datetime.now(timezone.utc).strftime("%H:%M:%S")
+    print(f"🧱 {now} blocks {from_block} → {to_block}: {new_fills} fills, +{new_volume} "
+          f"| total {follower.fills} fills, {follower.total_fill} volume, {follower.total_fee} fees "
+          f"| head {follower.head_block}, lag {follower.lag():.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Follow the Polygon head and aggregate OrderFilled logs live")
+    parser.add_argument("--rpc", default=POLYGON_RPC)
+    parser.add_argument("--address", default=CONTRACT_ADDRESS)
+    parser.add_argument("--topic", default=FILL_ORDER_TOPIC)
+    parser.add_argument("--confirmations", type=int, default=CONFIRMATIONS)
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL, help="seconds between polls")
+    parser.add_argument("--from-block", type=int, default=None, help="start here instead of at the head")
+    parser.add_argument("--rolling", action="store_true", help="keep a checkpointed trailing-24h aggregate")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE)
+    args = parser.parse_args()
+
+    rolling = load_checkpoint(args.checkpoint) if args.rolling else None
+    follower = HeadFollower(args.address, args.topic, get_client(args.rpc), args.confirmations,
+                            args.from_block, rolling)
+    print(f"🚀 Following {args.address} with {args.confirmations} confirmations (Ctrl+C to stop)...")
+
+    def on_poll(result):
+        print_poll(follower, result)
+        if rolling is not None:
+            save_checkpoint(rolling, args.checkpoint)
+            totals = rolling.totals()
+            print(f"📈 Trailing 24h: {totals['fills']} fills, {totals['volume']} volume, {totals['fee']} fees")
+
+    try:
+        follower.run(on_poll, args.poll)
+    except KeyboardInterrupt:
+        print(f"\n📊 Stopped at block {follower.last_block}: {follower.fills} fills, "
+              f"{follower.total_fill} volume, {follower.total_fee} fees")
+        print(f"⏱️ RPC rate: {follower.client.limiter.report()}")
@@ -0,0 +1,143 @@
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from rpc_client import RateLimitError, RpcError, get_client, is_result_limit_error
+
+# Concurrent chunked eth_getLogs fetcher.
+#    Keeps `workers` block-range requests in flight on a thread pool (each one still paced by the
+#    client's token bucket) and yields chunks strictly in block order, logs sorted by
+#    (blockNumber, logIndex), whichever response comes back first.
+#
+# Adaptive chunk sizing:
+#    A range the provider rejects as too big ("more than 10000 results", response size, timeout)
+#    is bisected and both halves are fetched, so no range is ever skipped. Every rejection lowers
+#    the block step; a run of small or empty responses grows it again (doubling, or bisecting
+#    towards the smallest rejected size), so it converges on the largest size the provider accepts.
+
+BLOCK_STEP = 2000
+WORKERS = 4
+MIN_BLOCK_STEP = 1
+MAX_BLOCK_STEP = 50000
+GROW_AFTER = 5           # small responses in a row before the block step doubles
+SMALL_RESULT = 2000      # a response with fewer logs than this counts as "small"
+MAX_ATTEMPTS = 4         # attempts for errors that splitting won't fix (connection resets, bad JSON)
+
+Chunk = namedtuple("Chunk", ["from_block", "to_block", "logs"])
+
+
+class LogFetchError(RpcError):
+    """A block range that could not be fetched even after retrying and splitting"""
+
+    def __init__(self, message, from_block, to_block, cause=None):
+        super().__init__(message, getattr(cause, "code", None))
+        self.from_block = from_block
+        self.to_block = to_block
+        self.cause = cause
+
+
+class ChunkSizer:
+    """Shared, thread-safe block step that converges on the largest range the provider accepts"""
+
+    def __init__(self, block_step=BLOCK_STEP, min_step=MIN_BLOCK_STEP, max_step=MAX_BLOCK_STEP,
+                 grow_after=GROW_AFTER, small_result=SMALL_RESULT):
+        self.step = block_step
+        self.min_step = min_step
+        self.max_step = max_step
+        self.ceiling = max_step      # largest size not yet rejected
+        self.grow_after = grow_after
+        self.small_result = small_result
+        self.splits = 0
+        self._small_streak = 0
+        self._lock = threading.Lock()
+
+    def shrink(self, rejected_size):
+        with self._lock:
+            self.splits += 1
+            self._small_streak = 0
+            self.ceiling = max(self.min_step, min(self.ceiling, rejected_size - 1))
+            self.step = max(self.min_step, min(self.step, rejected_size // 2))
+
+    def record(self, size, log_count):
+        with self._lock:
+            # Only full-size ranges say anything about whether the step can grow
+            if size < self.step or log_count >= self.small_result:
+                self._small_streak = 0
+                return
+            self._small_streak += 1
+            if self._small_streak >= self.grow_after:
+                self._small_streak = 0
+                if self.ceiling < self.max_step:
+                    # A size was rejected before: bisect towards it instead of doubling past it
+                    self.step = max(self.step, (self.step + self.ceiling + 1) // 2)
+                else:
+                    self.step = min(self.max_step, self.step * 2)
+
+
+def log_sort_key(log):
+    return int(log["blockNumber"], 16), int(log["logIndex"], 16)
+
+
+def _should_split(error):
+    if isinstance(error, RateLimitError):
+        return False
+    if isinstance(error, OSError):
+        # requests' Timeout / ReadTimeout are OSErrors too
+        return "timed out" in str(error).lower() or "timeout" in type(error).__name__.lower()
+    return is_result_limit_error(error)
+
+
+def fetch_range(client, address, topics, from_block, to_block, sizer):
+    """All logs in [from_block, to_block], bisecting the range as often as the provider needs"""
+    attempts = 0
+    while True:
+        try:
+            logs = client.get_logs(from_block, to_block, address, topics)
+            break
+        except (RpcError, OSError) as e:
+            if _should_split(e) and to_block > from_block:
+                sizer.shrink(to_block - from_block + 1)
+                mid = (from_block + to_block) // 2
+                return (fetch_range(client, address, topics, from_block, mid, sizer)
+                        + fetch_range(client, address, topics, mid + 1, to_block, sizer))
+            attempts += 1
+            if attempts >= MAX_ATTEMPTS:
+                raise LogFetchError(f"Could not fetch logs for blocks {from_block}–{to_block}: {e}",
+                                    from_block, to_block, e)
+    sizer.record(to_block - from_block + 1, len(logs))
+    logs.sort(key=log_sort_key)
+    return logs
+
+
+def fetch_logs(address, topics, start_block, end_block, client=None, block_step=BLOCK_STEP, workers=WORKERS,
+               sizer=None):
+    """Yield a Chunk per block range, in block order, with up to `workers` requests in flight
+
+    Every block in [start_block, end_block] is covered; a range that still fails after
+    retries and splitting raises LogFetchError instead of being skipped.
+    """
+    client = client or get_client()
+    sizer = sizer or ChunkSizer(block_step)
+    next_block = start_block
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+
+        def submit_next():
+            nonlocal next_block
+            if next_block > end_block:
+                return
+            # The step is read at submission time, so it adapts while the run progresses
+            to_block = min(next_block + sizer.step - 1, end_block)
+            future = pool.submit(fetch_range, client, address, topics, next_block, to_block, sizer)
+            in_flight.append((next_block, to_block, future))
+            next_block = to_block + 1
+
+        for _ in range(workers):
+            submit_next()
+        while in_flight:
+            from_block, to_block, future = in_flight.popleft()
+            logs = future.result()
+            # Top the window back up before handing the chunk downstream
+            submit_next()
+            yield Chunk(from_block, to_block, logs)
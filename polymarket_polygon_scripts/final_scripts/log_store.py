@@ -0,0 +1,153 @@
+import json
+import sqlite3
+import threading
+
+from log_fetcher import BLOCK_STEP, WORKERS, Chunk, fetch_logs, log_sort_key
+
+# Persistent local log store with gap-aware incremental fetching.
+#    Logs are kept in SQLite keyed by (contract address, topic0, block, logIndex), next to a
+#    coverage table of block ranges already fetched for each (address, topic0). A request for any
+#    window only goes to the RPC for the gaps in that coverage and serves the rest from disk, so
+#    re-running a day, or a window overlapping one already run, costs (almost) no RPC calls.
+
+LOG_STORE_FILE = "polygon_logs.sqlite3"
+
+
+class LogStore:
+    """SQLite store of raw logs plus the block ranges they are complete for"""
+
+    def __init__(self, path=LOG_STORE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS logs (
+                address TEXT NOT NULL,
+                topic0 TEXT NOT NULL,
+                block_number INTEGER NOT NULL,
+                log_index INTEGER NOT NULL,
+                log TEXT NOT NULL,
+                PRIMARY KEY (address, topic0, block_number, log_index)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS coverage (
+                address TEXT NOT NULL,
+                topic0 TEXT NOT NULL,
+                from_block INTEGER NOT NULL,
+                to_block INTEGER NOT NULL,
+                PRIMARY KEY (address, topic0, from_block)
+            ) WITHOUT ROWID;
+        """)
+        self._db.commit()
+
+    def _covered(self, address, topic0, start_block, end_block):
+        return self._db.execute(
+            "SELECT from_block, to_block FROM coverage WHERE address = ? AND topic0 = ? "
+            "AND to_block >= ? AND from_block <= ? ORDER BY from_block",
+            (address.lower(), topic0.lower(), start_block, end_block)
+        ).fetchall()
+
+    def gaps(self, address, topic0, start_block, end_block):
+        """Block ranges inside [start_block, end_block] that have not been fetched yet"""
+        with self._lock:
+            covered = self._covered(address, topic0, start_block, end_block)
+        gaps = []
+        next_block = start_block
+        for from_block, to_block in covered:
+            if from_block > next_block:
+                gaps.append((next_block, from_block - 1))
+            next_block = max(next_block, to_block + 1)
+        if next_block <= end_block:
+            gaps.append((next_block, end_block))
+        return gaps
+
+    def add_logs(self, address, topic0, from_block, to_block, logs):
+        """Store all logs of [from_block, to_block] for (address, topic0) and mark the range covered"""
+        address, topic0 = address.lower(), topic0.lower()
+        rows = [
+            (address, topic0, int(log["blockNumber"], 16), int(log["logIndex"], 16), json.dumps(log))
+            for log in logs if log["topics"] and log["topics"][0].lower() == topic0
+        ]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO logs VALUES (?, ?, ?, ?, ?)", rows)
+            # Merge with overlapping or adjacent coverage so the table stays one row per span
+            touching = self._covered(address, topic0, from_block - 1, to_block + 1)
+            if touching:
+                from_block = min(from_block, touching[0][0])
+                to_block = max(to_block, max(row[1] for row in touching))
+                self._db.executemany(
+                    "DELETE FROM coverage WHERE address = ? AND topic0 = ? AND from_block = ?",
+                    [(address, topic0, row[0]) for row in touching]
+                )
+            self._db.execute("INSERT INTO coverage VALUES (?, ?, ?, ?)", (address, topic0, from_block, to_block))
+
+    def logs(self, address, topic0, from_block, to_block):
+        """Stored logs in [from_block, to_block], in (block, logIndex) order"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT log FROM logs WHERE address = ? AND topic0 = ? AND block_number BETWEEN ? AND ? "
+                "ORDER BY block_number, log_index",
+                (address.lower(), topic0.lower(), from_block, to_block)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        self._db.close()
+
+
+def _merge_gaps(gap_lists):
+    merged = []
+    for from_block, to_block in sorted(gap for gaps in gap_lists for gap in gaps):
+        if merged and from_block <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], to_block))
+        else:
+            merged.append((from_block, to_block))
+    return merged
+
+
+def fetch_logs_cached(store, address, topic0, start_block, end_block, client=None, final_block=None,
+                      block_step=BLOCK_STEP, workers=WORKERS, stats=None):
+    """Like log_fetcher.fetch_logs, but only the gaps in the store's coverage hit the RPC
+
+    `topic0` is one topic0 or a list of them; with a list, each chunk goes out as a single
+    OR-filter eth_getLogs and a block range is fetched if any of the topics is missing it.
+    Yields Chunks in block order. Blocks above `final_block` (still reorg-able near the head)
+    are fetched every time and never marked covered. `stats`, if given, is a dict that gets
+    "stored_blocks" and "fetched_blocks" counts.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault("stored_blocks", 0)
+    stats.setdefault("fetched_blocks", 0)
+    topic0s = [topic0] if isinstance(topic0, str) else list(topic0)
+    topics = [topic0s[0]] if len(topic0s) == 1 else [topic0s]
+
+    segments = []
+    next_block = start_block
+    for gap_from, gap_to in _merge_gaps(store.gaps(address, t, start_block, end_block) for t in topic0s):
+        if gap_from > next_block:
+            segments.append((next_block, gap_from - 1, True))
+        segments.append((gap_from, gap_to, False))
+        next_block = gap_to + 1
+    if next_block <= end_block:
+        segments.append((next_block, end_block, True))
+
+    for from_block, to_block, stored in segments:
+        if stored:
+            stats["stored_blocks"] += to_block - from_block + 1
+            # Served in block_step pieces so a long covered span never sits in memory at once
+            for piece_from in range(from_block, to_block + 1, block_step):
+                piece_to = min(piece_from + block_step - 1, to_block)
+                logs = [log for t in topic0s for log in store.logs(address, t, piece_from, piece_to)]
+                if len(topic0s) > 1:
+                    logs.sort(key=log_sort_key)
+                yield Chunk(piece_from, piece_to, logs)
+            continue
+        stats["fetched_blocks"] += to_block - from_block + 1
+        for chunk in fetch_logs(address, topics, from_block, to_block, client=client,
+                                block_step=block_step, workers=workers):
+            storable_to = chunk.to_block if final_block is None else min(chunk.to_block, final_block)
+            if storable_to >= chunk.from_block:
+                storable = [log for log in chunk.logs if int(log["blockNumber"], 16) <= storable_to]
+                # add_logs keeps only the logs of the topic it is given
+                for t in topic0s:
+                    store.add_logs(address, t, chunk.from_block, storable_to, storable)
+            yield chunk
@@ -0,0 +1,70 @@
+import heapq
+import json
+
+# Per-market (outcome token) and per-side breakdown of decoded OrderFilled batches.
+#    Every fill swaps USDC (asset id 0) for one outcome token, so the non-zero asset id names the
+#    market and the side follows from which leg is USDC: makerAssetId == 0 means the maker order
+#    is a BUY of the token, otherwise a SELL. Accumulators are plain dicts keyed by token id, filled
+#    in the same pass that decodes the batch; token ids are 256-bit, so they stay Python ints
+#    rather than going through NumPy grouping. Distinct traders are kept per token as sets of
+#    address ints (maker and taker topics), which stays cheap with tens of thousands of tokens.
+
+SIDES = ("buy", "sell")
+TOP_N = 100
+
+
+class MarketBreakdown:
+    """Volume (USDC leg), shares, fees, fill count and distinct traders per token and side"""
+
+    def __init__(self):
+        # token_id -> [buy_volume, buy_shares, buy_fee, buy_fills, sell_volume, sell_shares, sell_fee, sell_fills]
+        self.markets = {}
+        self.traders = {}       # token_id -> set of trader address ints
+        self.fills = 0
+        self.skipped = 0        # token-for-token fills with no USDC leg
+
+    def add_batch(self, batch, start=0, stop=None):
+        """Add rows [start, stop) of a decoded FillBatch"""
+        markets = self.markets
+        traders = self.traders
+        for log, maker_asset, taker_asset, maker_amount, taker_amount, fee in batch.rows(start, stop):
+            if maker_asset == 0:
+                token, offset, volume, shares = taker_asset, 0, maker_amount, taker_amount
+            elif taker_asset == 0:
+                token, offset, volume, shares = maker_asset, 4, taker_amount, maker_amount
+            else:
+                self.skipped += 1
+                continue
+            acc = markets.get(token)
+            if acc is None:
+                acc = markets[token] = [0] * 8
+                traders[token] = set()
+            acc[offset] += volume
+            acc[offset + 1] += shares
+            acc[offset + 2] += fee
+            acc[offset + 3] += 1
+            topics = log["topics"]
+            traders[token].add(int(topics[2], 16))
+            traders[token].add(int(topics[3], 16))
+            self.fills += 1
+
+    def summary(self, top_n=TOP_N):
+        """Markets sorted by total volume, largest first (all of them when top_n is None)"""
+        keys = self.markets.keys()
+        volume = lambda token: self.markets[token][0] + self.markets[token][4]
+        top = sorted(keys, key=volume, reverse=True) if top_n is None else heapq.nlargest(top_n, keys, key=volume)
+        rows = []
+        for token in top:
+            acc = self.markets[token]
+            row = {"token_id": str(token), "volume": acc[0] + acc[4], "fills": acc[3] + acc[7],
+                   "distinct_traders": len(self.traders[token])}
+            for i, side in enumerate(SIDES):
+                row[side] = {"volume": acc[4 * i], "shares": acc[4 * i + 1], "fee": acc[4 * i + 2],
+                             "fills": acc[4 * i + 3]}
+            rows.append(row)
+        return {"markets": len(self.markets), "fills": self.fills, "skipped": self.skipped, "top": rows}
+
+
+def save_breakdown(breakdown, path, top_n=TOP_N):
+    with open(path, "w") as f:
+        json.dump(breakdown.summary(top_n), f, indent=2)
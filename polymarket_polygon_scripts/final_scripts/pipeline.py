@@ -0,0 +1,251 @@
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+
+from backfill import backfill, day_starts, resolve_boundaries
+from block_cache import CONFIRMATIONS, BlockTimestampCache
+from block_index import AnchorIndex
+from block_range import BlockRange
+from block_search import BlockNotFound, BlockResolver
+from event_router import ORDER_FILLED
+from fill_store import AddressTable, FillStore, InternTable
+from fill_summary import save_summary
+from fill_writer import NdjsonWriter
+from log_store import LogStore
+from market_breakdown import TOP_N, MarketBreakdown, save_breakdown
+from rpc_client import POLYGON_RPC, get_client
+
+# Non-interactive pipeline: head -> boundaries -> fetch -> decode -> aggregate in one process.
+#    Replaces the script 1 -> 2 -> 3 hand-off through input() prompts and JSON files: the head,
+#    block ranges, logs and decoded batches are passed in memory, so one invocation can run many
+#    windows and it can be scheduled from cron (no prompts, exit status 1 if any window failed).
+#    All window boundaries are resolved together in one batched search, bracketed by the anchor
+#    index (block_index.py), which each run extends back to its earliest window; runs of adjacent
+#    windows (consecutive days) are fetched as one union range split per window, both through
+#    the backfill.py code. Fetched logs go through the local log store, so overlapping or repeated
+#    windows cost (almost) no RPC calls. Output files keep the names and, for the summary, the
+#    schema of the interactive scripts (fill_summary.py).
+#    Usage: python3 pipeline.py 2025-07-15 2025-07-16            (whole UTC days)
+#           python3 pipeline.py --from 2025-07-01 --to 2025-07-31
+#           python3 pipeline.py --start 1752537600 --hours 6     (any window, unix seconds)
+
+CONTRACT_ADDRESS = "0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E"
+FILL_ORDER_TOPIC = ORDER_FILLED
+
+
+class Window:
+    """One [start_ts, end_ts) window to run, with the file prefix its outputs use"""
+
+    def __init__(self, start_ts, end_ts, label):
+        self.start_ts = start_ts
+        self.end_ts = end_ts
+        self.label = label
+        self.block_range = None
+        self.partial = False    # end clamped to the confirmed head (the window isn't over yet)
+        self.error = None       # why the window could not be resolved
+
+    @classmethod
+    def days(cls, first_date, last_date):
+        """One window per UTC day, from backfill's shared day boundaries"""
+        starts = day_starts(first_date, last_date)
+        return [cls(start_ts, end_ts, f"polymarket_24h_{datetime.fromtimestamp(start_ts, timezone.utc):%Y-%m-%d}")
+                for start_ts, end_ts in zip(starts, starts[1:])]
+
+    @classmethod
+    def span(cls, start_ts, hours):
+        start = datetime.fromtimestamp(start_ts, timezone.utc)
+        return cls(start_ts, start_ts + hours * 3600, f"polymarket_{hours}h_{start.strftime('%Y-%m-%dT%H%M')}")
+
+
+def adjacent_runs(windows):
+    """Resolved windows in block order, grouped into runs that each start right after the previous"""
+    runs = []
+    for window in sorted(windows, key=lambda w: (w.block_range.start_block, w.block_range.end_block)):
+        if runs and window.block_range.start_block == runs[-1][-1].block_range.end_block + 1:
+            runs[-1].append(window)
+        else:
+            runs.append([window])
+    return runs
+
+
+class Pipeline:
+    """Shared client, caches and stores for running any number of windows"""
+
+    def __init__(self, address=CONTRACT_ADDRESS, topics=(FILL_ORDER_TOPIC,), rpc_url=POLYGON_RPC, client=None,
+                 out_dir=".", store=None, cache=None, index=None, write_fills=False, top_n=TOP_N, verbose=True):
+        self.address = address
+        self.topics = [t.lower() for t in topics]
+        # Only OrderFilled logs go through the fill decoder; without it the run just counts events
+        self.fill_topic = FILL_ORDER_TOPIC if FILL_ORDER_TOPIC in self.topics else None
+        self.client = client or get_client(rpc_url)
+        self.out_dir = out_dir
+        self.store = store if store is not None else LogStore()
+        self.write_fills = write_fills
+        self.top_n = top_n
+        self.verbose = verbose
+        self.cache = cache if cache is not None else BlockTimestampCache(client=self.client)
+        self.index = index if index is not None else AnchorIndex(cache=self.cache)
+        self.head = None
+        self.addresses = AddressTable()     # interned across windows, checksums memoized
+        self.tokens = InternTable()
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
+    def _path(self, name):
+        return os.path.join(self.out_dir, name)
+
+    def resolve(self, windows):
+        """Head lookup, then every window's boundary blocks in one batched search
+
+        A window that ends after the head is clamped to the confirmed head (head - CONFIRMATIONS)
+        and marked partial; one that cannot be resolved at all gets `error` set instead of
+        failing the other windows.
+        """
+        self.head = self.client.head()
+        head_block, head_ts = self.head
+        confirmed_block = head_block - CONFIRMATIONS
+        self.cache.set_head(head_block)
+        # Anchors from (an estimate of) the earliest window start to the confirmed head; only
+        #    the ones earlier runs didn't fetch cost header fetches
+        starts = [w.start_ts for w in windows if w.start_ts <= head_ts]
+        if starts:
+            try:
+                self.index.extend_back_to(min(starts), self.head)
+            except LookupError as e:
+                print(f"⚠️ Anchor index not extended: {e}", file=sys.stderr)
+        resolver = BlockResolver(self.cache, head=self.head, index=self.index)
+
+        targets = set()
+        for window in windows:
+            if window.start_ts > head_ts:
+                window.error = f"starts after the chain head ({head_block} @ {head_ts})"
+                continue
+            window.partial = window.end_ts > head_ts
+            targets.update((window.start_ts,) if window.partial else (window.start_ts, window.end_ts))
+        # A boundary that can't be found only takes its own window down
+        blocks = resolve_boundaries(resolver, targets)
+
+        for window in windows:
+            start_block = blocks.get(window.start_ts)
+            end_block = confirmed_block if window.partial else blocks.get(window.end_ts, 0) - 1
+            if window.error is not None:
+                pass
+            elif start_block is None or end_block < 0:
+                window.error = "boundary blocks not found"
+            elif end_block < start_block:
+                window.error = f"no confirmed blocks yet (confirmed head {confirmed_block})"
+            else:
+                window.block_range = BlockRange(start_block, end_block, window.start_ts,
+                                                None if window.partial else window.end_ts)
+                if window.partial:
+                    self.log(f"⏳ {window.label} is still open: clamped to the confirmed head {confirmed_block}")
+                continue
+            print(f"⚠️ Skipping {window.label}: {window.error}", file=sys.stderr)
+        self.log(f"📦 Head {head_block}; {sum(w.block_range is not None for w in windows)}/{len(windows)} "
+                 f"window(s) resolved with {resolver.probes} header fetches in {resolver.round_trips} round trips "
+                 f"({self.index.fetched} anchors fetched)")
+
+    def run_windows(self, windows):
+        """Fetch, decode and aggregate adjacent resolved windows in one pass; returns their summaries"""
+        breakdowns = [MarketBreakdown() for _ in windows]
+        writers = [None] * len(windows)
+        if self.write_fills and self.fill_topic is not None:
+            writers = [NdjsonWriter(self._path(f"{w.label}_tradefills_log.ndjson")) for w in windows]
+        stats = {}
+
+        def on_fills(i, batch, start, stop):
+            breakdowns[i].add_batch(batch, start, stop)
+            if writers[i] is not None:
+                fills = FillStore(self.addresses, self.tokens)
+                first = fills.add_batch(batch)
+                writers[i].write_many(fills.rows(first + start, first + stop))
+
+        try:
+            summaries = backfill([w.block_range for w in windows], self.address, self.topics, client=self.client,
+                                 store=self.store, final_block=self.head[0] - CONFIRMATIONS, stats=stats,
+                                 on_fills=on_fills)
+        except BaseException:
+            for writer in writers:
+                if writer is not None:
+                    writer.abort()
+            raise
+        for writer in writers:
+            if writer is not None:
+                writer.finalize()
+
+        for window, summary, breakdown in zip(windows, summaries, breakdowns):
+            summary.partial = window.partial
+            save_summary(summary, self._path(f"{window.label}_summary_tradefills_log.json"))
+            if self.fill_topic is not None:
+                save_breakdown(breakdown, self._path(f"{window.label}_markets_tradefills_log.json"), self.top_n)
+                fills = f"{summary.fills} fills, total_fill {summary.total_fill}"
+            else:
+                fills = "OrderFilled not requested"
+            self.log(f"📊 {window.label}: blocks {summary.start_block} → {summary.end_block}"
+                     f"{' (partial)' if window.partial else ''}, {fills}")
+        self.log(f"🗄️ {stats['stored_blocks']} blocks from the store, {stats['fetched_blocks']} fetched")
+        return [summary.to_dict() for summary in summaries]
+
+    def run(self, windows):
+        """Resolve and run every window; returns ({label: summary}, {label: error})"""
+        self.resolve(windows)
+        summaries = {}
+        errors = {}
+        for window in windows:
+            if window.block_range is None:
+                errors[window.label] = window.error
+        for run in adjacent_runs([w for w in windows if w.block_range is not None]):
+            try:
+                for window, summary in zip(run, self.run_windows(run)):
+                    summaries[window.label] = summary
+            except Exception as e:
+                for window in run:
+                    errors[window.label] = str(e)
+                print(f"❌ {', '.join(w.label for w in run)}: {e}", file=sys.stderr)
+        return summaries, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the 24h trade volume pipeline for one or more windows")
+    parser.add_argument("dates", nargs="*", help="UTC days, YYYY-MM-DD")
+    parser.add_argument("--from", dest="first_date", help="first UTC day of a range, YYYY-MM-DD")
+    parser.add_argument("--to", dest="last_date", help="last UTC day of the range (inclusive)")
+    parser.add_argument("--start", type=int, action="append", default=[], help="window start, unix seconds")
+    parser.add_argument("--hours", type=int, default=24, help="length of --start windows")
+    parser.add_argument("--address", default=CONTRACT_ADDRESS)
+    parser.add_argument("--topic", action="append", default=None,
+                        help="topic0 to collect (repeatable); default OrderFilled")
+    parser.add_argument("--rpc", default=POLYGON_RPC)
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--fills", action="store_true", help="also write every decoded fill as NDJSON")
+    parser.add_argument("--top", type=int, default=TOP_N, help="markets kept in the breakdown file")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    windows = {}
+    for first_date, last_date in [(date, date) for date in args.dates] + (
+            [(args.first_date, args.last_date or args.first_date)] if args.first_date else []):
+        windows.update((w.label, w) for w in Window.days(first_date, last_date))
+    windows = [windows[label] for label in sorted(windows)]
+    windows += [Window.span(start, args.hours) for start in args.start]
+    if not windows:
+        parser.error("give at least one date, --from/--to range or --start")
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    pipeline = Pipeline(args.address, args.topic or [FILL_ORDER_TOPIC], args.rpc, out_dir=args.out_dir,
+                        write_fills=args.fills, top_n=args.top, verbose=not args.quiet)
+    try:
+        summaries, errors = pipeline.run(windows)
+    except BlockNotFound as e:
+        print(f"❌ Could not resolve the windows: {e}", file=sys.stderr)
+        return 1
+    pipeline.log(f"✅ {len(summaries)} window(s) done, {len(errors)} failed")
+    pipeline.log(f"⏱️ RPC rate: {pipeline.client.limiter.report()}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
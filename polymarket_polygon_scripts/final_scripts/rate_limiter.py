@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Adaptive token bucket, one per RPC endpoint.
+#    Tokens refill at `rate` per second up to `burst`; every request takes one token per call.
+#    A batch costs its full call count: it waits until the bucket is full (or holds enough), takes
+#    everything and leaves the bucket in debt, so the calls after it wait for the rest to refill.
+#    AIMD: the rate grows by a fixed step per successful call and is cut in half on
+#    429 / -32005 (limit exceeded) replies, honouring Retry-After when the provider sends it.
+#    A burst of throttle replies counts as one decrease: the rate is halved at most once per
+#    BACKOFF_COOLDOWN seconds. (A multiplicative ramp-up against halving on every 429 sank to
+#    min_rate and stayed there under random throttling.)
+
+# Override per run with e.g. POLYGON_RPC_RATE=20 POLYGON_RPC_MAX_RATE=100 for a paid endpoint
+DEFAULT_RATE = float(os.environ.get("POLYGON_RPC_RATE", 5.0))          # requests per second to start with
+DEFAULT_MIN_RATE = float(os.environ.get("POLYGON_RPC_MIN_RATE", 0.5))
+DEFAULT_MAX_RATE = float(os.environ.get("POLYGON_RPC_MAX_RATE", 50.0))
+RAMP_UP_STEP = 0.5       # req/s added after every `RAMP_UP_EVERY` successes in a row
+RAMP_UP_EVERY = 1
+BACKOFF_FACTOR = 0.5     # rate (and burst) multiplier on a throttle reply
+BACKOFF_COOLDOWN = 1.0   # seconds after a decrease during which further throttles don't cut again
+
+
+class TokenBucket:
+    """Thread-safe adaptive token bucket"""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=None, min_rate=DEFAULT_MIN_RATE, max_rate=DEFAULT_MAX_RATE,
+                 ramp_up_step=RAMP_UP_STEP, ramp_up_every=RAMP_UP_EVERY, backoff_factor=BACKOFF_FACTOR,
+                 backoff_cooldown=BACKOFF_COOLDOWN):
+        self.rate = min(float(max_rate), max(float(min_rate), float(rate)))
+        self.burst = float(burst) if burst is not None else max(1.0, self.rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.ramp_up_step = ramp_up_step
+        self.ramp_up_every = ramp_up_every
+        self.backoff_factor = backoff_factor
+        self.backoff_cooldown = backoff_cooldown
+
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_backoff = None
+        self._success_streak = 0
+        self._lock = threading.Lock()
+
+        # Stats for the end-of-run report
+        self.started = None
+        self.acquired = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, cost=1):
+        """Block until `cost` tokens are available (a full bucket for a bigger batch), then take them"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self.started is None:
+                    self.started = now
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    need = min(cost, self.burst)
+                    if self._tokens >= need:
+                        # May go negative: the debt holds back whoever comes next
+                        self._tokens -= cost
+                        self.acquired += cost
+                        return
+                    wait = (need - self._tokens) / self.rate
+                self.waited += wait
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self._success_streak += 1
+            if self._success_streak >= self.ramp_up_every:
+                self._success_streak = 0
+                self.rate = min(self.max_rate, self.rate + self.ramp_up_step)
+                self.burst = max(self.burst, self.rate)
+
+    def on_throttle(self, retry_after=None):
+        """Provider said slow down: cut the rate, drain the bucket, respect Retry-After"""
+        with self._lock:
+            now = time.monotonic()
+            self.throttled += 1
+            self._success_streak = 0
+            # Replies to requests already in flight, or the rest of a burst, don't cut the rate again
+            if self._last_backoff is None or now - self._last_backoff >= self.backoff_cooldown:
+                self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+                # Burst grew with the rate; an idle bucket must not refill to the old one
+                self.burst = max(1.0, self.burst * self.backoff_factor)
+                self._last_backoff = now
+            self._tokens = min(self._tokens, 0.0)
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self._blocked_until = max(self._blocked_until, now + pause)
+
+    def achieved_rate(self):
+        if self.started is None:
+            return 0.0
+        elapsed = time.monotonic() - self.started
+        return self.acquired / elapsed if elapsed > 0 else float(self.acquired)
+
+    def report(self):
+        return (f"{self.acquired} requests at {self.achieved_rate():.2f} req/s "
+                f"(current limit {self.rate:.2f} req/s, {self.throttled} throttled, {self.waited:.1f}s waiting)")
+
+
+def parse_retry_after(value):
+    """Retry-After header value (seconds or HTTP date) -> seconds, or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(url, **kwargs):
+    """Shared limiter per endpoint; kwargs only apply when the limiter is first created"""
+    with _limiters_lock:
+        if url not in _limiters:
+            _limiters[url] = TokenBucket(**kwargs)
+        return _limiters[url]
+
+
+def report_all():
+    """One line per endpoint with the achieved request rate"""
+    with _limiters_lock:
+        return [f"{url}: {limiter.report()}" for url, limiter in _limiters.items()]
@@ -0,0 +1,139 @@
+import json
+import os
+
+# Rolling trailing-window (default 24h) aggregator for OrderFilled volume.
+#    Fills are added into fixed-width time buckets (default one minute) held in a ring buffer of
+#    window / bucket slots. Running totals are kept next to the ring, so adding a fill is O(1) and
+#    expiring old buckets costs O(1) per bucket that falls out of the window. The whole state
+#    (ring, totals, last block processed) is checkpointed to a small JSON file, so a restart picks
+#    up where it stopped instead of rescanning 24h of logs.
+
+WINDOW_SECONDS = 24 * 60 * 60
+BUCKET_SECONDS = 60
+CHECKPOINT_FILE = "rolling_24h_checkpoint.json"
+FORMAT = "rolling_window/v1"
+
+
+class RollingAggregator:
+    """Trailing-window sums of takerAmountFilled, fee and fill count in a ring of time buckets"""
+
+    def __init__(self, window_seconds=WINDOW_SECONDS, bucket_seconds=BUCKET_SECONDS):
+        if window_seconds % bucket_seconds:
+            raise ValueError("window_seconds must be a multiple of bucket_seconds")
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.size = window_seconds // bucket_seconds
+        self.slot_bucket = [None] * self.size   # which bucket id each slot currently holds
+        self.volume = [0] * self.size
+        self.fees = [0] * self.size
+        self.counts = [0] * self.size
+        self.current_bucket = None              # newest bucket id seen (timestamp // bucket_seconds)
+        self.last_block = None                  # last block fully added, for resuming
+        self.total_volume = 0
+        self.total_fee = 0
+        self.total_count = 0
+
+    def _expire_slot(self, slot):
+        self.total_volume -= self.volume[slot]
+        self.total_fee -= self.fees[slot]
+        self.total_count -= self.counts[slot]
+        self.volume[slot] = self.fees[slot] = self.counts[slot] = 0
+        self.slot_bucket[slot] = None
+
+    def advance(self, timestamp):
+        """Move the window's end to `timestamp`, expiring buckets that fell out of it"""
+        bucket = timestamp // self.bucket_seconds
+        if self.current_bucket is None:
+            self.current_bucket = bucket
+            return
+        if bucket <= self.current_bucket:
+            return
+        # Only the slots between the old and new end need clearing, and never more than the ring
+        for b in range(max(self.current_bucket + 1, bucket - self.size + 1), bucket + 1):
+            slot = b % self.size
+            if self.slot_bucket[slot] is not None:
+                self._expire_slot(slot)
+        self.current_bucket = bucket
+
+    def add(self, timestamp, volume, fee=0, count=1):
+        """Add fills at `timestamp`; fills older than the window are ignored"""
+        self.advance(timestamp)
+        bucket = timestamp // self.bucket_seconds
+        if bucket <= self.current_bucket - self.size:
+            return False
+        slot = bucket % self.size
+        if self.slot_bucket[slot] != bucket:
+            if self.slot_bucket[slot] is not None:
+                self._expire_slot(slot)
+            self.slot_bucket[slot] = bucket
+        self.volume[slot] += volume
+        self.fees[slot] += fee
+        self.counts[slot] += count
+        self.total_volume += volume
+        self.total_fee += fee
+        self.total_count += count
+        return True
+
+    def remove(self, timestamp, volume, fee=0, count=1):
+        """Take back fills added at `timestamp` (e.g. from a reorged block), if still in the window"""
+        bucket = timestamp // self.bucket_seconds
+        slot = bucket % self.size
+        if self.current_bucket is None or bucket <= self.current_bucket - self.size or self.slot_bucket[slot] != bucket:
+            return False
+        self.volume[slot] -= volume
+        self.fees[slot] -= fee
+        self.counts[slot] -= count
+        self.total_volume -= volume
+        self.total_fee -= fee
+        self.total_count -= count
+        return True
+
+    def totals(self):
+        return {
+            "window_end": None if self.current_bucket is None else (self.current_bucket + 1) * self.bucket_seconds,
+            "window_seconds": self.window_seconds,
+            "volume": self.total_volume,
+            "fee": self.total_fee,
+            "fills": self.total_count,
+        }
+
+    def to_dict(self):
+        # Only the live slots are stored, as [bucket, volume, fee, count]
+        buckets = [
+            [self.slot_bucket[slot], self.volume[slot], self.fees[slot], self.counts[slot]]
+            for slot in range(self.size) if self.slot_bucket[slot] is not None
+        ]
+        buckets.sort()
+        return {
+            "format": FORMAT,
+            "window_seconds": self.window_seconds,
+            "bucket_seconds": self.bucket_seconds,
+            "current_bucket": self.current_bucket,
+            "last_block": self.last_block,
+            # Amounts are uint256: kept as strings so no JSON reader rounds them
+            "buckets": [[b, str(v), str(f), c] for b, v, f, c in buckets],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregator = cls(data["window_seconds"], data["bucket_seconds"])
+        aggregator.current_bucket = data["current_bucket"]
+        aggregator.last_block = data.get("last_block")
+        for bucket, volume, fee, count in data["buckets"]:
+            aggregator.add(bucket * aggregator.bucket_seconds, int(volume), int(fee), count)
+        return aggregator
+
+
+def save_checkpoint(aggregator, path=CHECKPOINT_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(aggregator.to_dict(), f)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path=CHECKPOINT_FILE, window_seconds=WINDOW_SECONDS, bucket_seconds=BUCKET_SECONDS):
+    """Restore a checkpoint, or a fresh aggregator if there is none"""
+    if not os.path.exists(path):
+        return RollingAggregator(window_seconds, bucket_seconds)
+    with open(path, "r") as f:
+        return RollingAggregator.from_dict(json.load(f))
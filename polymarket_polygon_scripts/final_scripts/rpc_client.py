@@ -0,0 +1,197 @@
+import itertools
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import get_limiter, parse_retry_after
+
+# Shared JSON-RPC client for the Polygon scripts.
+#    One requests.Session per endpoint keeps the TCP/TLS connection alive between calls,
+#    and batch() packs several methods into a single POST (JSON-RPC batch array).
+
+POLYGON_RPC = "https://polygon-rpc.com"
+DEFAULT_TIMEOUT = 30
+POOL_SIZE = 16
+MAX_RETRIES = 6             # retries of a call the provider rate-limited
+RATE_LIMIT_CODES = {-32005, -32029}
+# -32005 is also used for "query returned more than 10000 results"; those are not rate limits
+RESULT_LIMIT_HINTS = ("more than", "too many results", "response size", "range is too", "block range",
+                      "too large", "exceed max results", "query timeout", "timed out")
+
+
+class RpcError(Exception):
+    """JSON-RPC error object returned by the node (or a malformed response)"""
+
+    def __init__(self, message, code=None, data=None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+class RateLimitError(RpcError):
+    """Still rate limited after MAX_RETRIES backoffs"""
+
+
+def is_result_limit_error(message):
+    """True if an error message says the query was too big (range or result count), not too fast"""
+    message = str(message).lower()
+    return any(hint in message for hint in RESULT_LIMIT_HINTS)
+
+
+def _is_rate_limited(reply):
+    replies = reply if isinstance(reply, list) else [reply]
+    for item in replies:
+        error = item.get("error") if isinstance(item, dict) else None
+        if not error:
+            continue
+        message = str(error.get("message", "")).lower()
+        if is_result_limit_error(message):
+            continue
+        if error.get("code") in RATE_LIMIT_CODES or "rate limit" in message or "too many requests" in message:
+            return True
+    return False
+
+
+class RpcClient:
+    """Keep-alive JSON-RPC client with batch support"""
+
+    def __init__(self, url=POLYGON_RPC, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE, limiter=None,
+                 max_retries=MAX_RETRIES):
+        self.url = url
+        self.timeout = timeout
+        self.limiter = limiter if limiter is not None else get_limiter(url)
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._ids = itertools.count(1)
+        self._id_lock = threading.Lock()
+        self.calls = 0
+        self.posts = 0
+
+    def _next_id(self):
+        with self._id_lock:
+            return next(self._ids)
+
+    def _post(self, body):
+        """POST through the endpoint's token bucket, backing off and retrying on rate limits"""
+        cost = len(body) if isinstance(body, list) else 1
+        for _ in range(self.max_retries + 1):
+            self.limiter.acquire(cost)
+            self.posts += 1
+            response = self.session.post(self.url, json=body, timeout=self.timeout)
+            if response.status_code == 429:
+                self.limiter.on_throttle(parse_retry_after(response.headers.get("Retry-After")))
+                continue
+            try:
+                reply = response.json()
+            except ValueError:
+                raise RpcError(f"Failed to parse JSON response (HTTP {response.status_code}): {response.text[:200]}")
+            if _is_rate_limited(reply):
+                self.limiter.on_throttle(parse_retry_after(response.headers.get("Retry-After")))
+                continue
+            self.limiter.on_success()
+            return reply
+        raise RateLimitError(f"Rate limited by {self.url} after {self.max_retries} retries", code=429)
+
+    @staticmethod
+    def _unwrap(reply):
+        if "error" in reply and reply["error"] is not None:
+            error = reply["error"]
+            raise RpcError(error.get("message", "Unknown error"), error.get("code"), error.get("data"))
+        if "result" not in reply:
+            raise RpcError(f"Response without result: {reply}")
+        return reply["result"]
+
+    def call(self, method, params=None):
+        """Send a single JSON-RPC call and return its result"""
+        self.calls += 1
+        reply = self._post({"jsonrpc": "2.0", "method": method, "params": params or [], "id": self._next_id()})
+        if isinstance(reply, list):
+            reply = reply[0]
+        return self._unwrap(reply)
+
+    def batch(self, calls):
+        """Send [(method, params), ...] in one POST, results returned in the same order
+
+        Replies are matched back by id, so the node may answer in any order.
+        A failed call raises RpcError; use batch_raw() to handle errors per call.
+        """
+        return [self._unwrap(reply) for reply in self.batch_raw(calls)]
+
+    def batch_raw(self, calls):
+        """Like batch() but returns the raw reply objects (with result or error)"""
+        calls = list(calls)
+        if not calls:
+            return []
+        self.calls += len(calls)
+        ids = [self._next_id() for _ in calls]
+        body = [
+            {"jsonrpc": "2.0", "method": method, "params": params or [], "id": call_id}
+            for call_id, (method, params) in zip(ids, calls)
+        ]
+        replies = self._post(body)
+        if not isinstance(replies, list):
+            # Some providers answer a whole batch with one error object
+            raise RpcError(f"Batch rejected: {replies.get('error', replies)}")
+        by_id = {reply.get("id"): reply for reply in replies}
+        missing = {"error": {"message": "No reply for batch id"}}
+        return [by_id.get(call_id, missing) for call_id in ids]
+
+    # === Convenience wrappers ===
+    def block_number(self):
+        return int(self.call("eth_blockNumber"), 16)
+
+    def get_block(self, block_number, full_transactions=False):
+        return self.call("eth_getBlockByNumber", [hex(block_number), full_transactions])
+
+    def get_blocks(self, block_numbers):
+        """Block headers for many blocks in one batched POST, as {block_number: block}; unknown blocks are left out"""
+        block_numbers = list(block_numbers)
+        replies = self.batch_raw([("eth_getBlockByNumber", [hex(n), False]) for n in block_numbers])
+        return {n: reply["result"] for n, reply in zip(block_numbers, replies) if reply.get("result")}
+
+    def get_block_timestamps(self, block_numbers):
+        """Timestamps for many blocks in one batched POST, as {block_number: timestamp}"""
+        return {
+            n: int(block["timestamp"], 16)
+            for n, block in self.get_blocks(block_numbers).items() if block.get("timestamp")
+        }
+
+    def head(self):
+        """Current block number and its timestamp in a single round trip"""
+        _, block = self.batch([
+            ("eth_blockNumber", []),
+            ("eth_getBlockByNumber", ["latest", False]),
+        ])
+        # "latest" may already be one block ahead of eth_blockNumber; report the block we got
+        return int(block["number"], 16), int(block["timestamp"], 16)
+
+    def get_logs(self, from_block, to_block, address, topics):
+        return self.call("eth_getLogs", [{
+            "fromBlock": hex(from_block),
+            "toBlock": hex(to_block),
+            "address": address,
+            "topics": topics
+        }])
+
+    def close(self):
+        self.session.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(url=POLYGON_RPC):
+    """Shared client per endpoint, so every script reuses the same pooled connections
+
+    With POLYGON_RPC_URLS set, the default endpoint becomes a multi-endpoint pool (rpc_pool.py).
+    """
+    with _clients_lock:
+        if url not in _clients:
+            from rpc_pool import get_pool, pool_urls
+            _clients[url] = get_pool() if url == POLYGON_RPC and pool_urls() else RpcClient(url)
+        return _clients[url]
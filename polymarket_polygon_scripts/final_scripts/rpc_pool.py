@@ -0,0 +1,220 @@
+import itertools
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from rpc_client import DEFAULT_TIMEOUT, POLYGON_RPC, RateLimitError, RpcClient, RpcError
+
+# Multi-endpoint JSON-RPC pool with health scoring, hedged requests and temporary ejection.
+#    Drop-in for RpcClient (same call/batch/get_logs/... methods, since those all go through
+#    _post). Each POST goes to the healthiest endpoint: lowest recent latency, weighted up by its
+#    error rate and by how many requests it already has in flight. If no answer has come back
+#    after that endpoint's p95 latency, the same POST is also sent to the next best endpoint and
+#    whichever answers first wins (reads only, so a duplicate is harmless). An endpoint that
+#    fails EJECT_AFTER times in a row sits out for EJECT_SECONDS, doubling on each repeat.
+#    An endpoint without latency samples (new, or back from an ejection, which clears them) is
+#    scored optimistically so it gets probed, one request at a time, and EXPLORE_SHARE of POSTs
+#    go to a random other endpoint so a slower one keeps being measured instead of starving.
+#    Configure with POLYGON_RPC_URLS="https://a,https://b,..."; get_client() then returns a pool.
+
+RPC_URLS_ENV = "POLYGON_RPC_URLS"
+LATENCY_WINDOW = 50       # recent latencies kept per endpoint
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_DELAY = 0.05    # seconds; never hedge sooner than this
+HEDGE_DEFAULT_DELAY = 1.0 # seconds, before an endpoint has latency samples
+ERROR_DECAY = 0.9         # weight of the previous error rate in the moving average
+EJECT_AFTER = 3           # consecutive failures before an endpoint is ejected
+EJECT_SECONDS = 30
+MAX_EJECT_SECONDS = 600
+MEMBER_RETRIES = 1        # rate-limit retries on one endpoint before failing over
+EXPLORE_SHARE = 0.05      # share of POSTs sent to a random endpoint other than the best
+
+
+class Endpoint:
+    """One pool member and its health statistics"""
+
+    def __init__(self, client):
+        self.client = client
+        self.url = client.url
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.error_rate = 0.0
+        self.failures = 0           # consecutive
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.hedges_won = 0
+
+    def available(self, now):
+        return now >= self.ejected_until
+
+    def latency(self):
+        if not self.latencies:
+            return HEDGE_DEFAULT_DELAY / 2
+        return sum(self.latencies) / len(self.latencies)
+
+    def p95(self):
+        if not self.latencies:
+            return HEDGE_DEFAULT_DELAY
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * HEDGE_PERCENTILE))]
+
+    def score(self):
+        """Lower is better; an endpoint with no samples yet is tried first, one request at a time"""
+        if not self.latencies and not self.in_flight:
+            return 0.0
+        return self.latency() * (1 + 10 * self.error_rate) * (1 + self.in_flight)
+
+    def record_success(self, elapsed):
+        self.latencies.append(elapsed)
+        self.error_rate *= ERROR_DECAY
+        self.failures = 0
+        self.ejections = 0
+
+    def record_failure(self):
+        self.error_rate = self.error_rate * ERROR_DECAY + (1 - ERROR_DECAY)
+        self.failures += 1
+        if self.failures >= EJECT_AFTER:
+            self.ejections += 1
+            self.ejected_until = time.monotonic() + min(MAX_EJECT_SECONDS, EJECT_SECONDS * 2 ** (self.ejections - 1))
+            self.failures = 0
+            # Old latencies say nothing about it once it's back: probe it afresh then
+            self.latencies.clear()
+
+    def report(self):
+        state = "ejected" if not self.available(time.monotonic()) else "up"
+        return (f"{self.url}: {state}, {self.requests} requests, {self.latency() * 1000:.0f} ms avg, "
+                f"p95 {self.p95() * 1000:.0f} ms, error rate {self.error_rate:.2f}, {self.hedges_won} hedges won")
+
+
+class _PoolLimiter:
+    """Stands in for RpcClient.limiter so scripts can keep printing client.limiter.report()"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def report(self):
+        return self.pool.report()
+
+
+class RpcPool(RpcClient):
+    """RpcClient that spreads POSTs over several endpoints"""
+
+    def __init__(self, urls, timeout=DEFAULT_TIMEOUT, hedge=True, clients=None, explore=EXPLORE_SHARE):
+        if not urls and not clients:
+            raise ValueError("RpcPool needs at least one endpoint")
+        clients = clients or [RpcClient(url, timeout=timeout, max_retries=MEMBER_RETRIES) for url in urls]
+        self.endpoints = [Endpoint(client) for client in clients]
+        self.url = ",".join(endpoint.url for endpoint in self.endpoints)
+        self.timeout = timeout
+        self.hedge = hedge and len(self.endpoints) > 1
+        self.explore = explore
+        self.limiter = _PoolLimiter(self)
+        self.calls = 0
+        self.posts = 0
+        self.hedged = 0
+        self.failovers = 0
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._id_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4 * len(self.endpoints) + 4)
+
+    def _ranked(self, exclude=()):
+        """Available endpoints, best first; if all are ejected, the one back soonest"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude]
+            available = [e for e in candidates if e.available(now)]
+            if available:
+                ranked = sorted(available, key=Endpoint.score)
+                if len(ranked) > 1 and random.random() < self.explore:
+                    ranked.insert(0, ranked.pop(random.randrange(1, len(ranked))))
+                return ranked
+            return sorted(candidates, key=lambda e: e.ejected_until)[:1]
+
+    def _send(self, endpoint, body):
+        with self._lock:
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+        started = time.monotonic()
+        try:
+            reply = endpoint.client._post(body)
+        except (requests.RequestException, RpcError):
+            with self._lock:
+                endpoint.in_flight -= 1
+                endpoint.record_failure()
+            raise
+        with self._lock:
+            endpoint.in_flight -= 1
+            endpoint.record_success(time.monotonic() - started)
+        return reply
+
+    def _post(self, body):
+        """POST to the best endpoint, hedge to the next one after its p95, fail over on errors"""
+        with self._lock:
+            self.posts += 1
+        tried = []
+        last_error = None
+        while True:
+            ranked = self._ranked(exclude=tried)
+            if not ranked:
+                break
+            primary = ranked[0]
+            tried.append(primary)
+            futures = {self._executor.submit(self._send, primary, body): primary}
+            pending = set(futures)
+            if self.hedge and len(ranked) > 1:
+                done, pending = wait(pending, timeout=max(HEDGE_MIN_DELAY, primary.p95()))
+                if not done:
+                    backup = ranked[1]
+                    tried.append(backup)
+                    with self._lock:
+                        self.hedged += 1
+                    future = self._executor.submit(self._send, backup, body)
+                    futures[future] = backup
+                    pending.add(future)
+                pending |= done
+            # First successful answer wins; the other request finishes in the background
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        reply = future.result()
+                    except (requests.RequestException, RpcError) as e:
+                        last_error = e
+                        continue
+                    if futures[future] is not primary:
+                        with self._lock:
+                            futures[future].hedges_won += 1
+                    return reply
+            with self._lock:
+                self.failovers += 1
+        if isinstance(last_error, RateLimitError):
+            raise last_error
+        raise RpcError(f"All RPC endpoints failed, last error: {last_error}")
+
+    def report(self):
+        lines = [f"{self.posts} POSTs, {self.hedged} hedged, {self.failovers} failovers"]
+        lines += [endpoint.report() for endpoint in self.endpoints]
+        return "\n    ".join(lines)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        for endpoint in self.endpoints:
+            endpoint.client.close()
+
+
+def pool_urls():
+    """Endpoints from POLYGON_RPC_URLS, or None if it isn't set"""
+    value = os.environ.get(RPC_URLS_ENV, "")
+    urls = [url.strip() for url in value.split(",") if url.strip()]
+    return urls or None
+
+
+def get_pool(urls=None):
+    return RpcPool(urls or pool_urls() or [POLYGON_RPC])
@@ -0,0 +1,30 @@
+from backfill import backfill
+from block_range import BlockRange
+from event_router import ORDER_FILLED
+from log_store import LogStore
+
+
+def test_per_day_split(tmp_path, chain, client):
+    # Uneven "days" whose boundaries fall inside fetch chunks
+    edges = [chain.head_block - 3000, chain.head_block - 2317, chain.head_block - 2316, chain.head_block - 1100,
+             chain.head_block - 400]
+    days = [BlockRange(edges[i], edges[i + 1] - 1) for i in range(len(edges) - 1)]
+    store = LogStore(str(tmp_path / "logs.sqlite3"))
+    seen = []
+    summaries = backfill(days, client=client, store=store, block_step=500, workers=3,
+                         on_fills=lambda i, batch, start, stop: seen.append((i, stop - start)))
+
+    for i, (day, summary) in enumerate(zip(days, summaries)):
+        logs = [log for n in range(day.start_block, day.end_block + 1) for log in chain.logs(n)]
+        assert (summary.start_block, summary.end_block) == (day.start_block, day.end_block)
+        assert summary.fills == len(logs) == sum(n for j, n in seen if j == i)
+        assert summary.total_fill == sum(int(log["data"][2 + 3 * 64:2 + 4 * 64], 16) for log in logs)
+        assert summary.total_fee == sum(int(log["data"][2 + 4 * 64:], 16) for log in logs)
+        assert summary.events == {"OrderFilled": len(logs), "FeeCharged": 0} and summary.total_fee_charged == 0
+    assert summaries[1].fills == len(chain.logs(edges[1]))
+
+    # Only OrderFilled asked for: FeeCharged totals are not known, rather than 0
+    only_fills = backfill(days, topics=[ORDER_FILLED], client=client, store=store, block_step=500)
+    assert [s.total_fill for s in only_fills] == [s.total_fill for s in summaries]
+    assert only_fills[0].total_fee_charged is None
+    store.close()
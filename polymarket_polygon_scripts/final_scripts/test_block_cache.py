@@ -0,0 +1,42 @@
+from block_cache import CONFIRMATIONS, BlockTimestampCache
+
+
+def test_hits_misses_and_non_final_blocks(tmp_path, chain, node, client):
+    path = str(tmp_path / "timestamps.sqlite3")
+    cache = BlockTimestampCache(path, client=client)
+    cache.set_head(chain.head_block)
+    final = [chain.head_block - CONFIRMATIONS - n for n in (0, 10, 20)]
+    recent = [chain.head_block - n for n in (0, 5)]
+    expected = {n: chain.timestamp(n) for n in final + recent}
+
+    calls = node.calls
+    assert cache.block_timestamps(final + recent) == expected
+    assert (cache.hits, cache.misses) == (0, 5) and node.calls == calls + 5
+    assert cache.block_timestamps(final + recent + final[:1]) == expected
+    assert (cache.hits, cache.misses) == (5, 5) and node.calls == calls + 5
+    assert cache.block_timestamp(chain.head_block + 100) is None
+    cache.close()
+
+    # A new process only finds the final blocks on disk; the recent ones are fetched again
+    reopened = BlockTimestampCache(path, client=client)
+    assert reopened.cached(final + recent) == {n: expected[n] for n in final}
+    calls = node.calls
+    assert reopened.block_timestamps(final + recent) == expected
+    assert node.calls == calls + len(recent) and reopened.report() == "3 hits / 2 misses (60% hit rate)"
+    reopened.close()
+
+
+def test_write_back_persists_on_flush_and_close(tmp_path, chain, client):
+    path = str(tmp_path / "timestamps.sqlite3")
+    cache = BlockTimestampCache(path, client=client, write_through=False)
+    cache.set_head(chain.head_block)
+    blocks = [chain.head_block - CONFIRMATIONS - 10, chain.head_block - CONFIRMATIONS + 10]
+    cache.block_timestamps(blocks)
+    assert BlockTimestampCache(path, client=client).cached(blocks) == {}
+
+    assert cache.flush() == 1
+    assert BlockTimestampCache(path, client=client).cached(blocks) == {blocks[0]: chain.timestamp(blocks[0])}
+    # The other block is final once the head moves on, and close() writes it back
+    cache.set_head(chain.head_block + 20)
+    cache.close()
+    assert BlockTimestampCache(path, client=client).cached(blocks) == {n: chain.timestamp(n) for n in blocks}
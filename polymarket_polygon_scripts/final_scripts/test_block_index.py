@@ -0,0 +1,51 @@
+from block_cache import CONFIRMATIONS, BlockTimestampCache
+from block_index import AnchorIndex
+from block_search import BlockResolver
+
+
+def test_bracket(tmp_path, chain, client):
+    cache = BlockTimestampCache(str(tmp_path / "timestamps.sqlite3"), client=client)
+    path = str(tmp_path / "anchors.idx")
+    index = AnchorIndex(path, step=500, cache=cache)
+    low, high = chain.head_block - 6000, chain.head_block - 1000
+    index.extend(low, high)
+    assert index.first_block == low // 500 * 500 and index.last_block == high // 500 * 500
+
+    for block in range(index.first_block + 1, index.last_block + 1, 777):
+        target_ts = chain.timestamp(block)
+        (lo, lo_ts), (hi, hi_ts) = index.bracket(target_ts)
+        assert hi == lo + 500 and lo % 500 == 0
+        assert lo_ts == chain.timestamp(lo) < target_ts <= hi_ts == chain.timestamp(hi)
+        assert lo < block <= hi
+    # Outside the covered span: no bracket
+    assert index.bracket(chain.timestamp(index.first_block)) is None
+    assert index.bracket(chain.timestamp(index.last_block) + 1) is None
+
+    # Reloaded from disk, and grown by only the anchors it lacks
+    reloaded = AnchorIndex(path, step=500, cache=cache)
+    assert list(reloaded.timestamps) == list(index.timestamps)
+    reloaded.extend(low, high + 1000)
+    assert reloaded.fetched == 2
+    assert AnchorIndex(path, step=1000, cache=cache).first_block is None    # other spacing: not mixed in
+
+    # The resolver starts from the bracket instead of the head
+    target_ts = chain.timestamp(chain.head_block - 3333)
+    with_index = BlockResolver(cache, head=(chain.head_block, chain.timestamp(chain.head_block)), index=reloaded)
+    assert with_index.first_block_at_or_after(target_ts) == chain.head_block - 3333
+    cache.close()
+
+
+def test_anchors_stop_short_of_unconfirmed_blocks(tmp_path, chain, client):
+    cache = BlockTimestampCache(str(tmp_path / "timestamps.sqlite3"), client=client)
+    head = (chain.head_block, chain.timestamp(chain.head_block))
+    index = AnchorIndex(str(tmp_path / "anchors.idx"), step=100, cache=cache)
+    index.extend_back_to(chain.timestamp(chain.head_block - 3000), head)
+    assert index.first_block <= chain.head_block - 3000
+    assert chain.head_block - CONFIRMATIONS - 100 < index.last_block <= chain.head_block - CONFIRMATIONS
+    assert AnchorIndex(str(tmp_path / "anchors.idx"), step=100, cache=cache).last_block == index.last_block
+
+    # Nothing confirmed in range: no anchors, and no empty index saved
+    empty = AnchorIndex(str(tmp_path / "empty.idx"), step=100, cache=cache)
+    empty.extend(chain.head_block - 10, chain.head_block)
+    assert empty.first_block is None and empty.fetched == 0
+    cache.close()
@@ -0,0 +1,26 @@
+import json
+
+from block_range import POLYGON_CHAIN_ID, BlockRange, load_block_range, save_block_range
+
+
+def test_load_legacy_block_list(tmp_path):
+    # Written by the old script 2: both ends plus every block number spelled out
+    path = tmp_path / "legacy.json"
+    path.write_text(json.dumps({"start_block": 100, "end_block": 104, "block_numbers": list(range(100, 105))}))
+    block_range = load_block_range(str(path))
+    assert (block_range.start_block, block_range.end_block) == (100, 104)
+    assert list(block_range) == list(range(100, 105)) and len(block_range) == 5
+    assert block_range.start_timestamp is None and block_range.chain_id == POLYGON_CHAIN_ID
+
+    # Only the list, no ends
+    path.write_text(json.dumps({"block_numbers": [7, 8, 9]}))
+    assert list(load_block_range(str(path))) == [7, 8, 9]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "range.json")
+    save_block_range(BlockRange(10, 20, 1000, 1022), path)
+    block_range = load_block_range(path)
+    assert (block_range.start_block, block_range.end_block, block_range.start_timestamp,
+            block_range.end_timestamp) == (10, 20, 1000, 1022)
+    assert 15 in block_range and 21 not in block_range
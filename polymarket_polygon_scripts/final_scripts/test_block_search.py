@@ -0,0 +1,32 @@
+from bisect import bisect_left
+
+from block_cache import BlockTimestampCache
+from block_search import BlockResolver
+
+
+def brute_force(chain, target_ts):
+    blocks = range(chain.first_block, chain.head_block + 1)
+    timestamps = [chain.timestamp(n) for n in blocks]
+    return blocks[bisect_left(timestamps, target_ts)]
+
+
+def targets(chain):
+    head_ts = chain.timestamp(chain.head_block)
+    first_ts = chain.timestamp(chain.first_block + 1)
+    picks = [first_ts, head_ts, head_ts - 1, head_ts - 86400 // 3]
+    picks += [chain.timestamp(n) for n in (chain.first_block + 7, chain.head_block - 1234)]
+    picks += [first_ts + (head_ts - first_ts) * i // 13 + 1 for i in range(13)]
+    return picks
+
+
+def test_first_block_at_or_after_matches_brute_force(tmp_path, chain, client):
+    head = (chain.head_block, chain.timestamp(chain.head_block))
+    for target_ts in targets(chain):
+        resolver = BlockResolver(BlockTimestampCache(str(tmp_path / f"{target_ts}.sqlite3"), client=client), head=head)
+        assert resolver.first_block_at_or_after(target_ts) == brute_force(chain, target_ts), target_ts
+
+
+def test_first_blocks_at_or_after_batched(tmp_path, chain, client):
+    resolver = BlockResolver(BlockTimestampCache(str(tmp_path / "cache.sqlite3"), client=client))
+    picks = targets(chain)
+    assert resolver.first_blocks_at_or_after(picks) == {ts: brute_force(chain, ts) for ts in picks}
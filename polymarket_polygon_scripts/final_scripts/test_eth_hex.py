@@ -0,0 +1,40 @@
+import pytest
+
+import eth_hex
+from eth_hex import address_to_topic, event_topic, keccak256, to_checksum_address, topic_to_address
+
+# Known Keccak-256 digests (not NIST SHA3-256) and the EIP-55 test vectors
+KECCAK_VECTORS = {
+    b"": "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470",
+    b"abc": "4e03657aea45a94fc7d47ba826c8d667c0d1e6e33a64a036ec44f58fa12d6c45",
+    b"a" * 200: None,   # spans two 136-byte blocks: checked against the other implementation
+}
+EIP55_VECTORS = [
+    "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed",
+    "0xfB6916095ca1df60bB79Ce92cE3Ea74c37c5d359",
+    "0xdbF03B407c01E7cD3CBea99509d93f8DDDC8C6FB",
+    "0xD1220A0cf47c7B9Be7A2E6BA89F429762e7b9aDb",
+    "0x52908400098527886E0F7030069857D2E4169EE7",
+    "0xde709f2102306220921060314715629080e2fb77",
+]
+
+
+@pytest.mark.parametrize("data", list(KECCAK_VECTORS))
+def test_keccak256(data):
+    expected = KECCAK_VECTORS[data]
+    pure = eth_hex._keccak256_python(data)
+    if expected is not None:
+        assert pure.hex() == expected
+    assert keccak256(data) == pure
+
+
+def test_event_topic():
+    signature = "OrderFilled(bytes32,address,address,uint256,uint256,uint256,uint256,uint256)"
+    assert event_topic(signature) == "0xd0a08e8c493f9c94f29311604c9de1b4e8c8d4c06bd0c789af57f2d65bfec0f6"
+
+
+@pytest.mark.parametrize("address", EIP55_VECTORS)
+def test_to_checksum_address(address):
+    assert to_checksum_address(address.lower()) == address
+    assert to_checksum_address(address_to_topic(address)) == address
+    assert topic_to_address(address_to_topic(address)) == address.lower()
@@ -0,0 +1,26 @@
+from event_registry import snake_case
+from event_router import FEE_CHARGED, ORDER_FILLED, decode_events
+from fill_decoder import DATA_HEX_LEN, FILL_FIELDS, decode_fills
+
+
+def word(value):
+    return f"{value:064x}"
+
+
+def test_decode_events_by_topic0():
+    fee = {"topics": [FEE_CHARGED, "0x" + word(0xAB)], "data": "0x" + word(7) + word(250)}
+    fill = {"topics": [ORDER_FILLED, "0x" + word(1), "0x" + word(0x11), "0x" + word(0x22)],
+            "data": "0x" + "".join(word(v) for v in (0, 7, 100, 40, 3))}
+    short = {"topics": [FEE_CHARGED, "0x" + word(0xAB)], "data": "0x" + word(7)}
+    unknown = {"topics": ["0x" + word(0xDEAD)], "data": "0x"}
+    decoded = decode_events([fee, fill, short, unknown])
+    assert [log for log, _ in decoded] == [fee, fill]
+    assert decoded[0][1] == {"receiver": "0x" + "0" * 38 + "ab", "tokenId": 7, "amount": 250}
+    assert decoded[1][1]["takerAmountFilled"] == 40 and decoded[1][1]["fee"] == 3
+
+    # The batch decoder's columns are the spec's data fields under their snake_case names
+    batch = decode_fills([fill])
+    for name, value in decoded[1][1].items():
+        if snake_case(name) in FILL_FIELDS:
+            assert batch.total(snake_case(name)) == value
+    assert len(FILL_FIELDS) == 5 and DATA_HEX_LEN == len(fill["data"])
@@ -0,0 +1,47 @@
+from event_router import FEE_CHARGED, ORDER_CANCELLED, ORDER_FILLED, EventRouter, fetch_events
+from fake_polygon_rpc import CONTRACT_ADDRESS
+from log_store import LogStore
+
+
+def log(topic0, block, index):
+    return {"topics": [topic0], "blockNumber": hex(block), "logIndex": hex(index), "data": "0x"}
+
+
+def test_routing_by_topic0():
+    fees = []
+    # Registered topics are matched case-insensitively
+    router = EventRouter({FEE_CHARGED: fees.extend, "0x" + ORDER_FILLED[2:].upper(): None})
+    logs = [log(ORDER_FILLED, 1, 0), log(FEE_CHARGED, 1, 1), log(ORDER_CANCELLED, 1, 2), log(FEE_CHARGED, 2, 0),
+            log(ORDER_FILLED, 2, 1), {"topics": [], "blockNumber": "0x2", "logIndex": "0x2"}]
+    routed = router.route(logs)
+    assert routed == {ORDER_FILLED: [logs[0], logs[4]], FEE_CHARGED: [logs[1], logs[3]]}
+    assert fees == [logs[1], logs[3]]
+    assert router.counts == {FEE_CHARGED: 2, ORDER_FILLED: 2} and router.unknown == 2
+    assert router.report() == "FeeCharged: 2, OrderFilled: 2"
+
+
+def test_multi_topic_store_coverage(tmp_path, chain, node, client):
+    store = LogStore(str(tmp_path / "logs.sqlite3"))
+    start_block, end_block = chain.head_block - 1500, chain.head_block - 500
+    expected = [entry for n in range(start_block, end_block + 1) for entry in chain.logs(n)]
+
+    # OrderFilled alone first: FeeCharged is still a gap over the whole range
+    fills_only = EventRouter({ORDER_FILLED: None})
+    logs = [entry for chunk, _ in fetch_events(fills_only, CONTRACT_ADDRESS, start_block, end_block, client=client,
+                                               store=store) for entry in chunk.logs]
+    assert logs == expected
+    assert store.gaps(CONTRACT_ADDRESS, FEE_CHARGED, start_block, end_block) == [(start_block, end_block)]
+
+    # Both together: one OR-filter pass covers both topics, and a rerun needs no RPC at all
+    both = EventRouter({ORDER_FILLED: None, FEE_CHARGED: None})
+    for _ in range(2):
+        calls = node.calls
+        stats = {}
+        routed_fills = [entry for _, routed in fetch_events(both, CONTRACT_ADDRESS, start_block, end_block,
+                                                            client=client, store=store, stats=stats)
+                        for entry in routed.get(ORDER_FILLED, [])]
+        assert routed_fills == expected
+        for topic0 in (ORDER_FILLED, FEE_CHARGED):
+            assert store.gaps(CONTRACT_ADDRESS, topic0, start_block, end_block) == []
+    assert node.calls == calls and stats["fetched_blocks"] == 0
+    store.close()
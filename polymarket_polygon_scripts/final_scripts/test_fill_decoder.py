@@ -0,0 +1,19 @@
+import pytest
+
+from fill_decoder import decode_fills
+from test_fill_store import make_fill
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_bad_hex_is_set_aside(use_numpy):
+    logs = [make_fill(i, [0, 7, 10 + i, 20 + i, i]) for i in range(5)]
+    good_data = logs[1]["data"]
+    logs[1]["data"] = good_data[:-2] + "zz"                     # right length, not hex
+    logs[3]["data"] = good_data[:10] + "  " + good_data[12:]    # whitespace, fromhex would skip it
+    logs[4]["data"] = "0x12"                                    # too short
+    batch = decode_fills(logs, use_numpy=use_numpy)
+    assert [log["topics"][1] for log in batch.logs] == [logs[0]["topics"][1], logs[2]["topics"][1]]
+    assert batch.total("taker_amount_filled") == 20 + 22
+    assert len(batch.malformed) == 3
+
+    assert len(decode_fills([logs[1]], use_numpy=use_numpy).malformed) == 1
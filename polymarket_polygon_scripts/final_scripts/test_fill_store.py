@@ -0,0 +1,36 @@
+from array import array
+
+from event_router import ORDER_FILLED
+from fill_decoder import decode_fills
+from fill_store import FillStore, _extend
+
+
+def make_fill(i, words, maker=0x11, taker=0x22):
+    return {
+        "topics": [ORDER_FILLED, f"0x{i:064x}", f"0x{maker:064x}", f"0x{taker:064x}"],
+        "data": "0x" + "".join(f"{word:064x}" for word in words),
+        "transactionHash": f"0x{i + 1000:064x}",
+        "blockNumber": hex(100 + i),
+    }
+
+
+def test_extend_overflow_keeps_rows_aligned():
+    assert _extend(array("Q", [1, 2]), [3, 4, 1 << 70, 5]) == [1, 2, 3, 4, 1 << 70, 5]
+    assert _extend(array("Q", [1, 2]), [3, 4]) == array("Q", [1, 2, 3, 4])
+
+
+def test_wide_amount_in_batch():
+    words = [[0, 7, 10 + i, 20 + i, i] for i in range(6)]
+    words[3][2] = 1 << 70
+    logs = [make_fill(i, w, maker=0x11 + i % 2) for i, w in enumerate(words)]
+    for use_numpy in (True, False):
+        store = FillStore()
+        store.add_batch(decode_fills(logs[:2], use_numpy=use_numpy))
+        store.add_batch(decode_fills(logs[2:], use_numpy=use_numpy))
+        rows = list(store.rows())
+        assert len(rows) == len(store) == 6
+        assert [r["makerAmountFilled"] for r in rows] == [w[2] for w in words]
+        assert [r["takerAmountFilled"] for r in rows] == [w[3] for w in words]
+        assert [r["blockNumber"] for r in rows] == [100 + i for i in range(6)]
+        assert store.total("maker_amount_filled") == sum(w[2] for w in words)
+        assert len(store.addresses) == 3 and len(store.tokens) == 2
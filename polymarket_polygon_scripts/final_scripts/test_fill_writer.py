@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from fill_writer import NdjsonWriter, read_ndjson
+
+
+def test_finalize_and_abort(tmp_path):
+    path = str(tmp_path / "fills.ndjson")
+    with NdjsonWriter(path) as writer:
+        writer.write_many({"n": n, "amount": 10 ** 30 + n} for n in range(3))
+        # Nothing visible under the final name until finalize
+        assert not os.path.exists(path) and os.path.exists(writer.tmp_path)
+    assert writer.count == 3 and not os.path.exists(writer.tmp_path)
+    assert list(read_ndjson(path)) == [{"n": n, "amount": 10 ** 30 + n} for n in range(3)]
+
+    # A failed run leaves the previous complete file alone and no .part behind
+    with pytest.raises(RuntimeError):
+        with NdjsonWriter(path) as writer:
+            writer.write({"n": 99})
+            raise RuntimeError("fetch failed")
+    assert not os.path.exists(writer.tmp_path)
+    assert [record["n"] for record in read_ndjson(path)] == [0, 1, 2]
+
+    # finalize/abort are idempotent
+    writer = NdjsonWriter(path)
+    writer.write({"n": 5})
+    writer.finalize()
+    writer.finalize()
+    writer.abort()
+    assert list(read_ndjson(path)) == [{"n": 5}]
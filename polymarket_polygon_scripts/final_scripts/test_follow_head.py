@@ -0,0 +1,75 @@
+from follow_head import HeadFollower
+from rolling_window import RollingAggregator, load_checkpoint, save_checkpoint
+
+
+def follower(chain, client, start_block):
+    return HeadFollower(client=client, confirmations=5, start_block=start_block, rolling=RollingAggregator())
+
+
+def catch_up(head_follower):
+    while head_follower.poll() is not None:
+        pass
+
+
+def state(head_follower):
+    return (head_follower.fills, head_follower.total_fill, head_follower.total_fee,
+            head_follower.rolling.totals(), head_follower.last_block)
+
+
+def test_rollback_matches_fresh_recompute(chain, client):
+    start_block = chain.head_block - 400
+    live = follower(chain, client, start_block)
+    catch_up(live)
+    assert live.last_block == chain.head_block - 5
+
+    # Replace the last 30 ingested blocks with another fork, and mine on top of it
+    chain.reorg(chain.head_block - 35)
+    chain.advance(20)
+    catch_up(live)
+    assert live.reorgs == 1
+    assert live.rolled_back_blocks > 0
+
+    fresh = follower(chain, client, start_block)
+    catch_up(fresh)
+    assert fresh.reorgs == 0
+    assert state(live) == state(fresh)
+    assert live.fills > 0
+
+
+def test_restart_with_from_block_does_not_recount_checkpoint(chain, client, tmp_path):
+    checkpoint = str(tmp_path / "rolling.json")
+    start_block = chain.head_block - 300
+    for _ in range(3):
+        restarted = HeadFollower(client=client, confirmations=5, start_block=start_block,
+                                 rolling=load_checkpoint(checkpoint))
+        catch_up(restarted)
+        save_checkpoint(restarted.rolling, checkpoint)
+        chain.advance(10)
+    catch_up(restarted)
+
+    fresh = follower(chain, client, start_block)
+    catch_up(fresh)
+    assert restarted.rolling.totals() == fresh.rolling.totals()
+    assert fresh.rolling.totals()["fills"] == fresh.fills > 0
+
+
+def test_unserved_headers_leave_the_poll_for_a_retry(chain, client, monkeypatch):
+    start_block = chain.head_block - 300
+    live = follower(chain, client, start_block)
+    get_blocks = client.get_blocks
+    unserved = set()
+    monkeypatch.setattr(client, "get_blocks",
+                        lambda block_numbers: {n: h for n, h in get_blocks(block_numbers).items() if n not in unserved})
+
+    # Timestamps of fill blocks, then the poll's last header, not served yet
+    for blocks in (range(chain.head_block - 200, chain.head_block - 150), {chain.head_block - 5}):
+        unserved = set(blocks)
+        assert live.poll() is None
+        assert (live.fills, live.last_block, live.rolling.totals()["fills"]) == (0, start_block - 1, 0)
+
+    unserved = set()
+    catch_up(live)
+    fresh = follower(chain, client, start_block)
+    catch_up(fresh)
+    assert state(live) == state(fresh)
+    assert live.fills > 0
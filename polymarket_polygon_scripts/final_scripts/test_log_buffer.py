@@ -0,0 +1,43 @@
+import pytest
+
+from log_buffer import WORD_SIZE, LogPage
+
+
+def word(value):
+    return f"{value:064x}"
+
+
+def make_log(i):
+    return {"topics": ["0x" + word(0xeeee), "0x" + word(i), "0x" + word(0xaa00 + i), "0x" + word(0xbb00 + i)],
+            "data": "0x" + "".join(word(i * 10 + j) for j in range(3))}
+
+
+def test_fields_land_at_their_row_offsets():
+    logs = [make_log(i) for i in range(4)]
+    page = LogPage(logs, n_words=3, topics=(2, 3))
+    assert len(page) == 4 and page.row_size == 5 * WORD_SIZE and len(page.buffer) == 4 * page.row_size
+    for i in range(4):
+        assert [page.uint(i, j) for j in range(3)] == [i * 10 + j for j in range(3)]
+        assert int.from_bytes(page.topic(i, 3), "big") == 0xbb00 + i
+        assert bytes(page.address(i, 2)) == (0xaa00 + i).to_bytes(20, "big")
+    assert page.word_column(2) == [i * 10 + 2 for i in range(4)]
+    assert page.address_int_column(3) == [0xbb00 + i for i in range(4)]
+    # Topics only and data only use the same layout without the other part
+    assert LogPage(logs, topics=(1,)).row_size == WORD_SIZE
+    assert LogPage(logs, topics=(1,)).address_int_column(1) == [0, 1, 2, 3]
+    assert LogPage(logs, n_words=3).word_column(0) == [0, 10, 20, 30]
+
+
+def test_hashable_pages_serve_views_as_dict_keys():
+    logs = [make_log(i) for i in range(2)]
+    ids = {(0xaa01).to_bytes(20, "big"): 7}
+    assert ids[LogPage(logs, topics=(2,), hashable=True).address(1, 2)] == 7
+    with pytest.raises(ValueError):
+        hash(LogPage(logs, topics=(2,)).address(1, 2))
+
+
+@pytest.mark.parametrize("data", ["0x" + "zz" * 96, "0x" + "00" * 95, "0x" + "00" * 97, "0x" + " 0" * 96])
+def test_bad_hex_or_wrong_size_raises(data):
+    logs = [make_log(0), dict(make_log(1), data=data)]
+    with pytest.raises(ValueError):
+        LogPage(logs, n_words=3)
@@ -0,0 +1,29 @@
+import threading
+import time
+
+from log_fetcher import fetch_logs, log_sort_key
+
+
+class SlowFirstClient:
+    """get_logs that answers earlier ranges last, with each range's logs in reverse order"""
+
+    def __init__(self, start_block):
+        self.start_block = start_block
+        self.finished = []
+        self._lock = threading.Lock()
+
+    def get_logs(self, from_block, to_block, address, topics):
+        time.sleep(max(0.0, 0.01 * (4 - (from_block - self.start_block) // 10)))
+        with self._lock:
+            self.finished.append(from_block)
+        return [{"blockNumber": hex(n), "logIndex": hex(i)} for n in range(to_block, from_block - 1, -1)
+                for i in (1, 0)]
+
+
+def test_chunks_come_out_in_block_order():
+    client = SlowFirstClient(100)
+    chunks = list(fetch_logs("0x0", [], 100, 159, client=client, block_step=10, workers=4))
+    assert client.finished[:4] != sorted(client.finished[:4])     # responses did arrive out of order
+    assert [(c.from_block, c.to_block) for c in chunks] == [(b, b + 9) for b in range(100, 160, 10)]
+    logs = [log for chunk in chunks for log in chunk.logs]
+    assert logs == sorted(logs, key=log_sort_key) and len(logs) == 120
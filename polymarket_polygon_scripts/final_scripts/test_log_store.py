@@ -0,0 +1,55 @@
+from fake_polygon_rpc import CONTRACT_ADDRESS, FILL_ORDER_TOPIC, FakePolygonRpc
+from log_fetcher import fetch_logs
+from log_store import LogStore, fetch_logs_cached
+
+
+def direct(chain, start_block, end_block):
+    return [log for n in range(start_block, end_block + 1) for log in chain.logs(n)]
+
+
+def collect(chunks):
+    logs = []
+    for chunk in chunks:
+        logs.extend(chunk.logs)
+    return logs
+
+
+def test_fetch_logs_cached_matches_direct_fetch(tmp_path, chain, make_client):
+    end_block = chain.head_block - 300
+    start_block = end_block - 3000
+    expected = direct(chain, start_block, end_block)
+    # The node caps results, so the fetcher has to bisect ranges along the way
+    with FakePolygonRpc(chain, max_results=200) as rpc:
+        client = make_client(rpc.url)
+        assert collect(fetch_logs(CONTRACT_ADDRESS, [FILL_ORDER_TOPIC], start_block, end_block,
+                                  client=client, block_step=500)) == expected
+
+        store = LogStore(str(tmp_path / "logs.sqlite3"))
+        stats = {}
+        # Part of the range first, then the whole of it: only the gaps are fetched
+        middle = collect(fetch_logs_cached(store, CONTRACT_ADDRESS, FILL_ORDER_TOPIC, start_block + 1000,
+                                           start_block + 1999, client=client, block_step=500, stats=stats))
+        assert middle == direct(chain, start_block + 1000, start_block + 1999)
+        stats = {}
+        logs = collect(fetch_logs_cached(store, CONTRACT_ADDRESS, FILL_ORDER_TOPIC, start_block, end_block,
+                                         client=client, block_step=500, stats=stats))
+        assert logs == expected
+        assert stats == {"stored_blocks": 1000, "fetched_blocks": 2001}
+
+        # Fully covered now: no RPC at all
+        calls = rpc.calls
+        stats = {}
+        assert collect(fetch_logs_cached(store, CONTRACT_ADDRESS, FILL_ORDER_TOPIC, start_block, end_block,
+                                         client=client, block_step=500, stats=stats)) == expected
+        assert rpc.calls == calls and stats["fetched_blocks"] == 0
+        store.close()
+
+
+def test_final_block_is_not_stored(tmp_path, chain, client):
+    store = LogStore(str(tmp_path / "logs.sqlite3"))
+    start_block, end_block = chain.head_block - 100, chain.head_block
+    final_block = end_block - 50
+    collect(fetch_logs_cached(store, CONTRACT_ADDRESS, FILL_ORDER_TOPIC, start_block, end_block,
+                              client=client, final_block=final_block))
+    assert store.gaps(CONTRACT_ADDRESS, FILL_ORDER_TOPIC, start_block, end_block) == [(final_block + 1, end_block)]
+    store.close()
@@ -0,0 +1,35 @@
+from event_router import ORDER_FILLED
+from fill_decoder import decode_fills
+from market_breakdown import MarketBreakdown
+
+TOKEN_A = 1 << 200
+TOKEN_B = 7
+
+
+def fill(i, maker_asset, taker_asset, maker_amount, taker_amount, fee=0, maker=0x11, taker=0x22):
+    words = (maker_asset, taker_asset, maker_amount, taker_amount, fee)
+    return {"topics": [ORDER_FILLED, f"0x{i:064x}", f"0x{maker:064x}", f"0x{taker:064x}"],
+            "data": "0x" + "".join(f"{word:064x}" for word in words),
+            "transactionHash": f"0x{i:064x}", "blockNumber": hex(100 + i)}
+
+
+def test_sides():
+    logs = [
+        fill(0, 0, TOKEN_A, 600, 1000, fee=3),                # maker pays USDC: buys TOKEN_A
+        fill(1, TOKEN_A, 0, 500, 250, fee=1, maker=0x33),     # maker gives TOKEN_A for USDC: sells
+        fill(2, 0, TOKEN_B, 40, 100),
+        fill(3, TOKEN_A, TOKEN_B, 5, 5),                      # no USDC leg: skipped
+    ]
+    breakdown = MarketBreakdown()
+    breakdown.add_batch(decode_fills(logs[:2]))
+    breakdown.add_batch(decode_fills(logs), 2)
+    summary = breakdown.summary()
+    assert (summary["markets"], summary["fills"], summary["skipped"]) == (2, 3, 1)
+
+    top, second = summary["top"]
+    assert top["token_id"] == str(TOKEN_A) and second["token_id"] == str(TOKEN_B)
+    assert top["buy"] == {"volume": 600, "shares": 1000, "fee": 3, "fills": 1}
+    assert top["sell"] == {"volume": 250, "shares": 500, "fee": 1, "fills": 1}
+    assert top["volume"] == 850 and top["fills"] == 2 and top["distinct_traders"] == 3
+    assert second["sell"]["fills"] == 0 and second["buy"]["volume"] == 40
+    assert [row["token_id"] for row in breakdown.summary(top_n=1)["top"]] == [str(TOKEN_A)]
@@ -0,0 +1,83 @@
+import json
+import os
+
+from block_cache import CONFIRMATIONS, BlockTimestampCache
+from block_index import AnchorIndex
+from event_router import FEE_CHARGED, ORDER_FILLED
+from fill_writer import read_ndjson
+from log_store import LogStore
+from pipeline import Pipeline, Window
+
+
+def make_pipeline(tmp_path, client, topics=(ORDER_FILLED,), write_fills=False):
+    cache = BlockTimestampCache(str(tmp_path / "timestamps.sqlite3"), client=client)
+    return Pipeline(topics=topics, client=client, out_dir=str(tmp_path), store=LogStore(str(tmp_path / "logs.sqlite3")),
+                    cache=cache, index=AnchorIndex(str(tmp_path / "anchors.idx"), cache=cache),
+                    write_fills=write_fills, verbose=False)
+
+
+def chain_fills(chain, summary):
+    return [log for n in range(summary["start_block"], summary["end_block"] + 1) for log in chain.logs(n)]
+
+
+def test_open_and_future_windows_do_not_fail_the_run(tmp_path, chain, client):
+    head_ts = chain.timestamp(chain.head_block)
+    done = Window(head_ts - 7200, head_ts - 3600, "done")
+    still_open = Window(head_ts - 1800, head_ts + 1800, "open")
+    future = Window(head_ts + 3600, head_ts + 7200, "future")
+    pipeline = make_pipeline(tmp_path, client)
+
+    summaries, errors = pipeline.run([done, still_open, future])
+    assert set(summaries) == {"done", "open"} and set(errors) == {"future"}
+    assert not summaries["done"]["partial"] and summaries["open"]["partial"]
+    assert summaries["open"]["end_block"] == chain.head_block - CONFIRMATIONS
+    expected = sum(int(log["data"][2 + 3 * 64:2 + 4 * 64], 16)
+                   for n in range(summaries["done"]["start_block"], summaries["done"]["end_block"] + 1)
+                   for log in chain.logs(n))
+    assert summaries["done"]["total_fill"] == expected > 0
+
+
+def test_fills_only_decoded_for_order_filled(tmp_path, chain, client):
+    head_ts = chain.timestamp(chain.head_block)
+    window = Window(head_ts - 7200, head_ts - 3600, "fees")
+    summaries, errors = make_pipeline(tmp_path, client, topics=(FEE_CHARGED,)).run([window])
+    assert not errors
+    assert summaries["fees"]["total_fill"] is None and summaries["fees"]["fills"] is None
+    assert summaries["fees"]["total_fee_charged"] == 0
+    assert not os.path.exists(tmp_path / "fees_markets_tradefills_log.json")
+    with open(tmp_path / "fees_summary_tradefills_log.json") as f:
+        assert json.load(f)["events"] == {"FeeCharged": 0}
+
+
+def test_adjacent_windows_split_from_one_fetch(tmp_path, chain, client):
+    head_ts = chain.timestamp(chain.head_block)
+    windows = [Window(head_ts - 3600 * (i + 1), head_ts - 3600 * i, f"hour{i}") for i in (3, 2, 1)]
+    summaries, errors = make_pipeline(tmp_path, client, write_fills=True).run(windows)
+    assert not errors
+    ordered = [summaries[f"hour{i}"] for i in (3, 2, 1)]
+    assert [s["end_block"] + 1 for s in ordered[:-1]] == [s["start_block"] for s in ordered[1:]]
+    for i, summary in zip((3, 2, 1), ordered):
+        logs = chain_fills(chain, summary)
+        assert summary["fills"] == len(logs) > 0
+        assert summary["total_fill"] == sum(int(log["data"][2 + 3 * 64:2 + 4 * 64], 16) for log in logs)
+        rows = list(read_ndjson(str(tmp_path / f"hour{i}_tradefills_log.ndjson")))
+        assert [row["txHash"] for row in rows] == [log["transactionHash"] for log in logs]
+        with open(tmp_path / f"hour{i}_summary_tradefills_log.json") as f:
+            assert set(json.load(f)) == {"start_block", "end_block", "partial", "fills", "total_fill", "total_fee",
+                                         "total_fee_charged", "events"}
+
+
+def test_windows_are_resolved_from_the_extended_anchor_index(tmp_path, chain, client):
+    head_ts = chain.timestamp(chain.head_block)
+    windows = [Window(head_ts - 7200, head_ts - 3600, "done")]
+    pipeline = make_pipeline(tmp_path, client)
+    pipeline.run(windows)
+    index = pipeline.index
+    assert index.first_block <= windows[0].block_range.start_block
+    assert index.last_block <= chain.head_block - CONFIRMATIONS
+    assert index.bracket(windows[0].start_ts) is not None
+
+    # A later run over the same windows finds every anchor on disk already
+    again = make_pipeline(tmp_path, client)
+    again.run([Window(head_ts - 7200, head_ts - 3600, "done")])
+    assert again.index.fetched == 0 and len(again.index) == len(index)
@@ -0,0 +1,81 @@
+import random
+
+import rate_limiter
+from rate_limiter import TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        # A real sleep always lets some time pass, even when rounding left a tiny wait
+        self.now += max(seconds, 1e-6)
+
+
+def test_rate_recovers_under_random_throttling(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    bucket = TokenBucket(rate=5, min_rate=0.5, max_rate=50)
+    rng = random.Random(3)
+    rates = []
+    for _ in range(5000):
+        clock.now += 1.0 / bucket.rate
+        if rng.random() < 0.2:
+            bucket.on_throttle()
+        else:
+            bucket.on_success()
+        rates.append(bucket.rate)
+    settled = rates[1000:]
+    # Multiplicative ramp-up against halving on every 429 averaged ~0.6 req/s here, at the floor 18% of the time
+    assert sum(settled) / len(settled) > 4
+    assert sum(1 for rate in settled if rate <= bucket.min_rate) < len(settled) / 100
+
+
+def test_burst_of_throttles_is_one_decrease(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    bucket = TokenBucket(rate=20, min_rate=0.5, max_rate=50)
+    for _ in range(10):
+        bucket.on_throttle()
+        clock.now += 0.01
+    assert bucket.rate == 10
+    clock.now += rate_limiter.BACKOFF_COOLDOWN
+    bucket.on_throttle()
+    assert bucket.rate == 5
+    bucket.on_success()
+    assert bucket.rate == 5 + rate_limiter.RAMP_UP_STEP
+
+
+def test_batch_pays_full_cost(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleep)
+    bucket = TokenBucket(rate=5, max_rate=5)
+    started = clock.now
+    for _ in range(4):
+        bucket.acquire(50)
+    # Each batch after the first waits for the previous one's 50 calls to be paid back at 5 req/s
+    assert clock.now - started >= 3 * 50 / 5 - 1e-3
+    assert bucket.acquired == 200
+
+
+def test_throttle_lowers_burst(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleep)
+    bucket = TokenBucket(rate=5, max_rate=50)
+    for _ in range(200):
+        bucket.on_success()
+    assert bucket.rate == bucket.burst == 50
+    bucket.on_throttle()
+    assert bucket.rate == bucket.burst == 25
+    # Idle for a minute: the next second may only carry the halved burst
+    clock.now += 60
+    started = clock.now
+    for _ in range(50):
+        bucket.acquire()
+    assert clock.now - started >= (50 - 25) / 25 - 1e-3
@@ -0,0 +1,40 @@
+from rolling_window import RollingAggregator, load_checkpoint, save_checkpoint
+
+
+def test_expiry():
+    rolling = RollingAggregator(window_seconds=600, bucket_seconds=60)
+    t0 = 60_000
+    for i in range(10):
+        rolling.add(t0 + 60 * i, 100 + i, fee=i)
+    assert rolling.totals()["fills"] == 10 and rolling.total_volume == sum(100 + i for i in range(10))
+
+    # Three minutes on: the three oldest buckets fall out
+    rolling.advance(t0 + 60 * 12)
+    assert rolling.total_count == 7 and rolling.total_volume == sum(100 + i for i in range(3, 10))
+    assert rolling.total_fee == sum(range(3, 10))
+    # Too old to count any more
+    assert not rolling.add(t0, 1)
+    # A fill can be taken back while its bucket is still live
+    assert rolling.remove(t0 + 60 * 9, 109, 9)
+    assert rolling.total_count == 6
+
+    # Idle for longer than the window: everything expires
+    rolling.advance(t0 + 60 * 100)
+    assert rolling.totals() == {"window_end": t0 + 60 * 101, "window_seconds": 600, "volume": 0, "fee": 0,
+                                "fills": 0}
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / "rolling.json")
+    assert load_checkpoint(path).last_block is None
+    rolling = RollingAggregator(window_seconds=600, bucket_seconds=60)
+    for i in range(20):
+        rolling.add(60_000 + 45 * i, 10 ** 40 + i, fee=i, count=2)
+    rolling.last_block = 1234
+    save_checkpoint(rolling, path)
+
+    restored = load_checkpoint(path)
+    assert restored.totals() == rolling.totals() and restored.last_block == 1234
+    for aggregator in (rolling, restored):
+        aggregator.advance(60_000 + 45 * 30)
+    assert restored.totals() == rolling.totals()
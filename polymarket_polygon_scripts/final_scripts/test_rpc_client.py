@@ -0,0 +1,27 @@
+import pytest
+
+from rpc_client import RpcError
+
+
+def test_batch_replies_matched_by_id(make_client):
+    client = make_client("http://127.0.0.1:1")
+
+    def post(body):
+        # Out of order, and the last call gets no reply at all
+        return [{"jsonrpc": "2.0", "id": call["id"], "result": call["params"][0]} for call in reversed(body[:-1])]
+
+    client._post = post
+    calls = [("eth_getBlockByNumber", [hex(n), False]) for n in range(5)]
+    replies = client.batch_raw(calls)
+    assert [reply.get("result") for reply in replies] == [hex(n) for n in range(4)] + [None]
+    assert "error" in replies[-1]
+    with pytest.raises(RpcError):
+        client.batch(calls)
+
+
+def test_batch_against_node(client, chain):
+    blocks = [chain.head_block - n for n in (5, 300, 1)]
+    headers = client.get_blocks(blocks + [chain.head_block + 10])
+    assert sorted(headers) == sorted(blocks)
+    assert all(int(headers[n]["number"], 16) == n for n in blocks)
+    assert client.head() == (chain.head_block, chain.timestamp(chain.head_block))
@@ -0,0 +1,32 @@
+import time
+
+from fake_polygon_rpc import FakePolygonRpc
+from rpc_pool import EJECT_AFTER, Endpoint, RpcPool
+
+
+def test_slower_endpoint_still_gets_requests(chain, make_client):
+    with FakePolygonRpc(chain) as fast, FakePolygonRpc(chain, latency=0.01) as slow:
+        pool = RpcPool(None, clients=[make_client(fast.url), make_client(slow.url)], hedge=False, explore=0.1)
+        for _ in range(200):
+            assert pool.block_number() == chain.head_block
+        fast_endpoint, slow_endpoint = pool.endpoints
+        assert fast_endpoint.requests > slow_endpoint.requests > 1
+        assert pool.posts == 200
+        pool.close()
+
+
+def test_returning_endpoint_is_probed_first(make_client):
+    endpoint = Endpoint(make_client("http://127.0.0.1:1"))
+    other = Endpoint(make_client("http://127.0.0.1:2"))
+    for elapsed in (0.2, 0.3):
+        endpoint.record_success(elapsed)
+        other.record_success(0.01)
+    assert other.score() < endpoint.score()
+    for _ in range(EJECT_AFTER):
+        endpoint.record_failure()
+    assert not endpoint.available(time.monotonic())
+    # Back from the ejection with no samples: optimistic, but only for one request at a time
+    endpoint.ejected_until = 0.0
+    assert endpoint.score() == 0.0 < other.score()
+    endpoint.in_flight = 1
+    assert endpoint.score() > other.score()